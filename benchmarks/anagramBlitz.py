@@ -0,0 +1,85 @@
+"""
+Benchmarks the anagram blitz letter index on the full anagram corpus: building
+the index, generating racks, and checking guesses. A plain Python scan of the
+corpus is timed alongside for comparison.
+
+Run from the repository root:
+
+    python -m benchmarks.anagramBlitz
+"""
+
+import os
+import random
+import tempfile
+import time
+from collections import Counter
+
+from utils.configManager import AnagramConfig
+from utils.letterIndex import LetterCountIndex
+from utils.wordCorpus import WordCorpus
+
+RACKS = 200
+GUESSES = 100000
+
+
+def timeit(function, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    config = AnagramConfig()
+    random.seed(0)
+    with tempfile.TemporaryDirectory() as directory:
+        corpus = WordCorpus(
+            os.path.join(directory, "corpus.bin"),
+            sourcePath=config.getCorpus("default")["Source"],
+        )
+        print(f"Corpus: {corpus.wordCount} words")
+
+        buildTime, index = timeit(lambda: LetterCountIndex(corpus), 5)
+        print(f"Index build:            {buildTime * 1000:8.2f} ms")
+
+        rackTime, _ = timeit(
+            lambda: index.makeRack(
+                config.blitzRackSize,
+                minLength=config.blitzMinWordLength,
+                minAnswers=config.blitzMinAnswers,
+            ),
+            RACKS,
+        )
+        print(f"Rack generation:        {rackTime * 1000:8.2f} ms per rack")
+
+        rack, answers = index.makeRack(config.blitzRackSize, minAnswers=1)
+        searchTime, _ = timeit(lambda: index.subWords(rack, 3), RACKS)
+        print(f"Sub-word search:        {searchTime * 1000:8.2f} ms per rack")
+
+        words = list(corpus.liveWords())
+        rackCounts = Counter(rack)
+
+        def scan():
+            return [
+                word
+                for word in words
+                if len(word) >= 3 and not Counter(word) - rackCounts
+            ]
+
+        scanTime, _ = timeit(scan, 3)
+        print(f"Python scan (baseline): {scanTime * 1000:8.2f} ms per rack")
+
+        guesses = [random.choice(words) for _ in range(GUESSES // 2)]
+        guesses += random.sample(sorted(answers), min(len(answers), 10)) * (
+            GUESSES // 20
+        )
+        start = time.perf_counter()
+        for guess in guesses:
+            guess.casefold() in answers
+        guessTime = (time.perf_counter() - start) / len(guesses)
+        print(f"Guess check:            {guessTime * 1e6:8.3f} us per guess")
+        corpus.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Benchmarks encoding the images the Pokemon, Garlic and Bullshit cogs send:
+a default PNG, as they used to save, against each cog's configured
+utils.imageEncoder.ImageEncoder. Reports the bytes, the encode time and the
+end-to-end latency of drawing, encoding and uploading the image at a given
+upload speed.
+
+Run from the repository root:
+
+    python -m benchmarks.imageEncoding [--uplink 10]
+"""
+
+import argparse
+import random
+import time
+from io import BytesIO
+
+from PIL import Image, ImageDraw, ImageFilter, ImageFont
+from tools.stubPokeApi import makeSprite
+from utils.configManager import BullshitConfig, GarlicConfig, PokemonConfig
+from utils.imageEncoder import ImageEncoder, extensionOf, psnr
+from utils.silhouette import SilhouetteRenderer
+
+SAMPLES = 5
+TEXT = (
+    "WE ARE IN THE MIDST OF A HIGH-FREQUENCY BLOSSOMING OF INTERCONNECTEDNESS "
+    "THAT WILL GIVE US ACCESS TO THE QUANTUM SOUP ITSELF"
+)
+
+
+def drawText(image, font, colour, **options):
+    draw = ImageDraw.Draw(image)
+    draw.multiline_text(
+        (image.width * 0.1, image.height * 0.3),
+        "\n".join(TEXT[i : i + 30] for i in range(0, len(TEXT), 30)),
+        colour,
+        font=ImageFont.truetype(font, image.width // 20),
+        spacing=50,
+        **options,
+    )
+    return image
+
+
+def pokemonImages():
+    config = PokemonConfig()
+    renderer = SilhouetteRenderer(config.backgroundImage)
+    return [
+        lambda id=id: renderer.render(BytesIO(makeSprite(id)))
+        for id in range(1, SAMPLES + 1)
+    ]
+
+
+def garlicImages():
+    config = GarlicConfig()
+    return [
+        lambda: drawText(Image.open(config.template), config.font, "black"),
+        lambda: drawText(Image.open(config.darkTemplate), config.font, "white"),
+    ]
+
+
+def photo(seed):
+    """
+    A stand-in for the 640x480 nature photos Bullshit draws on: smooth
+    colours with grain.
+    """
+    random.seed(seed)
+    image = Image.new("RGB", (8, 6))
+    image.putdata([tuple(random.randrange(256) for _ in range(3)) for _ in range(48)])
+    image = image.resize((640, 480), Image.BICUBIC)
+    grain = Image.effect_noise((640, 480), 24).convert("RGB")
+    return Image.blend(image, grain, 0.15).filter(ImageFilter.GaussianBlur(0.6))
+
+
+def bullshitImages():
+    config = BullshitConfig()
+    return [
+        lambda seed=seed: drawText(
+            photo(seed), config.font, "yellow", stroke_width=5, stroke_fill="black"
+        )
+        for seed in range(SAMPLES)
+    ]
+
+
+def measure(makeImages, encode, uplink):
+    """
+    Returns:
+    tuple: Mean (draw time, encode time, bytes, end-to-end latency, PSNR).
+    """
+    totals = [0.0] * 5
+    for makeImage in makeImages:
+        start = time.perf_counter()
+        image = makeImage()
+        drawTime = time.perf_counter() - start
+        start = time.perf_counter()
+        data = encode(image)
+        encodeTime = time.perf_counter() - start
+        uploadTime = len(data) * 8 / (uplink * 1e6)
+        with Image.open(BytesIO(data)) as decoded:
+            quality = psnr(image.convert("RGB"), decoded.convert("RGB"))
+        for i, value in enumerate(
+            (
+                drawTime,
+                encodeTime,
+                len(data),
+                drawTime + encodeTime + uploadTime,
+                min(quality, 99),
+            )
+        ):
+            totals[i] += value
+    return [total / len(makeImages) for total in totals]
+
+
+def defaultPng(image):
+    output = BytesIO()
+    image.save(output, "PNG")
+    return output.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument(
+        "--uplink", type=float, default=10, help="upload speed in Mbit/s"
+    )
+    args = parser.parse_args()
+
+    cogs = [
+        ("Pokemon", pokemonImages(), PokemonConfig().imageEncoding),
+        ("Garlic", garlicImages(), GarlicConfig().imageEncoding),
+        ("Bullshit", bullshitImages(), BullshitConfig().imageEncoding),
+    ]
+    print(f"Upload at {args.uplink:g} Mbit/s")
+    for name, images, settings in cogs:
+        encoder = ImageEncoder.fromConfig(settings)
+        sample = encoder.encode(images[0]())
+        print(f"{name} ({len(images)} images, encoded as {extensionOf(sample)}):")
+        for variant, encode in (("before", defaultPng), ("after", encoder.encode)):
+            drawTime, encodeTime, size, latency, quality = measure(
+                images, encode, args.uplink
+            )
+            print(
+                f"  {variant:>6}: {size / 1024:7.1f} KB, encode "
+                f"{encodeTime * 1000:6.1f} ms, end to end {latency * 1000:7.1f} ms, "
+                f"PSNR {quality:4.1f} dB"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+Benchmarks the throughput of the Reddit cog's message listener, in messages
+per second, on a stream of chat where a few messages link to Reddit and the
+same popular posts come up again and again. The listener as it was, which
+made a URLExtract for every message, is compared with the prefiltered one
+and its submission cache. Reddit's API is replaced by an in-memory one that
+counts calls.
+
+The old listener needs urlextract, which the bot no longer depends on:
+
+    pip install urlextract==1.2.0
+
+Run from the repository root:
+
+    python -m benchmarks.redditUnfurl [--messages 20000]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import time
+import urllib
+from collections import defaultdict
+from types import SimpleNamespace
+
+import urlextract
+
+os.environ.setdefault("REDDIT_CLIENT_ID", "benchmark")
+os.environ.setdefault("REDDIT_SECRET", "benchmark")
+
+from cogs.reddit import Reddit  # noqa: E402
+
+WORDS = (
+    "lol did anyone see the match last night i think we should play again "
+    "tomorrow what time works for everyone brb food is here gg wp"
+).split()
+POPULAR = [f"{n:x}abc" for n in range(20)]
+LINKS = [
+    "https://www.reddit.com/r/aww/comments/{id}/a_very_good_dog/",
+    "https://old.reddit.com/r/aww/comments/{id}/",
+    "https://redd.it/{id}",
+    "reddit.com/comments/{id}",
+]
+
+
+class FakeReddit(object):
+    """
+    Answers submission requests from memory, counting them.
+    """
+
+    def __init__(self):
+        self.calls = 0
+
+    async def submission(self, id=None, url=None):
+        self.calls += 1
+        await asyncio.sleep(0)
+        if id is None:
+            id = url.rstrip("/").split("/")[6]
+        return SimpleNamespace(
+            over_18=False, is_self=False, selftext="", url=f"https://i.redd.it/{id}"
+        )
+
+
+class Collection(object):
+    """
+    A Mongo collection with nothing in it.
+    """
+
+    def find_one(self, *args, **kwargs):
+        return None
+
+    def update_one(self, *args, **kwargs):
+        pass
+
+
+class Channel(object):
+    id = 1
+
+    def __init__(self):
+        self.sent = 0
+
+    async def send(self, content):
+        self.sent += 1
+
+
+def makeMessages(count, linkShare):
+    random.seed(0)
+    channel = Channel()
+    messages = []
+    for _ in range(count):
+        words = random.choices(WORDS, k=random.randint(3, 15))
+        roll = random.random()
+        if roll < linkShare:
+            # Viral posts are linked far more often than others.
+            id = POPULAR[min(int(random.expovariate(0.5)), len(POPULAR) - 1)]
+            words.append(random.choice(LINKS).format(id=id))
+        elif roll < linkShare * 3:
+            words.append("https://example.com/some/page")
+        messages.append(
+            SimpleNamespace(content=" ".join(words), channel=channel, author=None)
+        )
+    return messages
+
+
+async def oldListener(cog, message):
+    """
+    The listener before the prefilter.
+    """
+    url = message.content
+    extractor = urlextract.URLExtract()
+    if not extractor.has_urls(url):
+        return
+    parse_result = urllib.parse.urlparse(url)
+    if parse_result[1] != "www.reddit.com":
+        return
+    try:
+        post = await cog.reddit_instance.submission(url=url)
+    except Exception:
+        return
+    await message.channel.send(post.url)
+
+
+async def run(listener, cog, messages):
+    start = time.perf_counter()
+    for message in messages:
+        await listener(message)
+    return len(messages) / (time.perf_counter() - start)
+
+
+async def benchmark(args):
+    bot = SimpleNamespace(
+        user=object(), db_client=defaultdict(lambda: defaultdict(Collection))
+    )
+    cog = Reddit(bot)
+    cog.listings.stop()
+    await cog.reddit_instance.close()
+    messages = makeMessages(args.messages, args.link_share)
+    print(
+        f"{len(messages)} messages, "
+        f"{sum('redd' in m.content for m in messages)} with Reddit links"
+    )
+
+    # The old listener is slow enough that a slice of the stream will do.
+    cog.reddit_instance = FakeReddit()
+    sample = messages[: max(1, len(messages) // 20)]
+    rate = await run(lambda m: oldListener(cog, m), cog, sample)
+    print(
+        f"  before: {rate:10.0f} messages/s, "
+        f"{cog.reddit_instance.calls} API calls for {len(sample)} messages"
+    )
+
+    cog.reddit_instance = FakeReddit()
+    rate = await run(cog.on_message, cog, messages)
+    print(
+        f"   after: {rate:10.0f} messages/s, "
+        f"{cog.reddit_instance.calls} API calls for {len(messages)} messages, "
+        f"{cog.submissions.stats}"
+    )
+
+    chatter = [m for m in messages if "redd" not in m.content]
+    rate = await run(cog.on_message, cog, chatter)
+    print(f"prefilter: {rate:10.0f} messages/s without Reddit links")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument(
+        "--link-share",
+        type=float,
+        default=0.02,
+        help="share of messages with a Reddit link",
+    )
+    asyncio.run(benchmark(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmarks making the stages of a reveal question: drawing every stage in one
+pass into a strip with utils.reveal, against drawing each stage separately
+from the sprite and saving it as its own image. Cutting stages out of the
+strip, which happens when a question is prepared, is timed too.
+
+Run from the repository root:
+
+    python -m benchmarks.reveal
+"""
+
+import os
+import tempfile
+import time
+from io import BytesIO
+
+from PIL import Image
+from tools.stubPokeApi import makeSprite
+from utils.configManager import PokemonConfig
+from utils.reveal import RevealRenderer
+
+SPRITES = 20
+
+
+def renderSeparately(renderer, sprite, directory, id):
+    """
+    Draws each stage on its own: fits the sprite, shrinks it to a pixel per
+    block and scales it back up.
+
+    Returns:
+    int: Bytes saved.
+    """
+    size = 0
+    for stage, block in enumerate(renderer.blockSizes):
+        square = renderer.fit(BytesIO(sprite))
+        side = renderer.size // block
+        image = square.resize((side, side), Image.BOX).resize(
+            (renderer.size, renderer.size), Image.NEAREST
+        )
+        fileName = os.path.join(directory, f"{id}-{stage}.png")
+        image.save(fileName, "PNG")
+        size += os.path.getsize(fileName)
+    return size
+
+
+def renderStrip(renderer, sprite, directory, id):
+    """
+    Returns:
+    int: Bytes saved.
+    """
+    fileName = os.path.join(directory, f"{id}.png")
+    renderer.renderToFile(BytesIO(sprite), fileName)
+    return os.path.getsize(fileName)
+
+
+def main():
+    config = PokemonConfig()
+    renderer = RevealRenderer(config.revealSize, config.revealBlockSizes)
+    sprites = [makeSprite(id) for id in range(1, SPRITES + 1)]
+    print(
+        f"{SPRITES} sprites of 475x475, {renderer.stageCount} stages of "
+        f"{renderer.size}x{renderer.size} with blocks of {renderer.blockSizes}"
+    )
+
+    with tempfile.TemporaryDirectory() as directory:
+        for name, render in (
+            ("separate", renderSeparately),
+            ("pyramid", renderStrip),
+        ):
+            start = time.perf_counter()
+            size = sum(
+                render(renderer, sprite, directory, id)
+                for id, sprite in enumerate(sprites)
+            )
+            elapsed = (time.perf_counter() - start) / SPRITES
+            print(
+                f"{name:>8}: {elapsed * 1000:7.1f} ms per Pokemon, "
+                f"{size / SPRITES / 1024:6.1f} KB stored per Pokemon"
+            )
+
+        start = time.perf_counter()
+        sent = 0
+        for id in range(SPRITES):
+            images = renderer.stages(os.path.join(directory, f"{id}.png"))
+            sent += sum(len(image) for image in images.values())
+        elapsed = (time.perf_counter() - start) / SPRITES
+        print(
+            f"   slice: {elapsed * 1000:7.1f} ms per Pokemon to cut every stage "
+            f"out of the strip, {sent / SPRITES / 1024:6.1f} KB to upload"
+        )
+
+
+if __name__ == "__main__":
+    main()
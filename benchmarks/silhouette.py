@@ -0,0 +1,117 @@
+"""
+Benchmarks drawing "Who's that Pokémon?" question images: the renderer the
+game used to have, which decoded the background for every sprite and built
+the silhouette as a full colour image, against utils.silhouette. Each is run
+in a fresh process, to compare peak memory too. Encoding the PNG is timed
+separately, as it is the same for both.
+
+Run from the repository root:
+
+    python -m benchmarks.silhouette
+"""
+
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image
+from tools.stubPokeApi import makeSprite
+from utils.configManager import PokemonConfig
+from utils.silhouette import SilhouetteRenderer
+
+SPRITES = 40
+
+
+def legacyRender(image, backgroundPath):
+    """
+    The question image renderer as it was before utils.silhouette. ANTIALIAS
+    is the same filter as LANCZOS.
+    """
+    sprite = Image.open(image)
+    alpha = sprite.split()[-1]
+    spriteImage = Image.new("RGBA", sprite.size, (54, 57, 63, 0))
+    bgImage = Image.open(backgroundPath, "r")
+    spriteImage.putalpha(alpha)
+
+    spriteImage.load()
+    imageData = np.asarray(spriteImage)
+    imageDataBW = imageData.max(axis=2)
+    nonEmptyColumns = np.where(imageDataBW.max(axis=0) > 0)[0]
+    nonEmptyRows = np.where(imageDataBW.max(axis=1) > 0)[0]
+    cropBox = (
+        min(nonEmptyRows),
+        max(nonEmptyRows),
+        min(nonEmptyColumns),
+        max(nonEmptyColumns),
+    )
+
+    imageDataNew = imageData[
+        cropBox[0] : cropBox[1] + 1, cropBox[2] : cropBox[3] + 1, :
+    ]
+    newImage = Image.fromarray(imageDataNew)
+
+    mywidth = 750
+    wpercent = mywidth / float(newImage.size[0])
+    hsize = int((float(newImage.size[1]) * float(wpercent)))
+    newImage = newImage.resize((mywidth, hsize), Image.LANCZOS)
+    bgImage.paste(newImage, (225, 220), newImage)
+    return bgImage
+
+
+def peakMemory():
+    # ru_maxrss is in kilobytes on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run(variant, sprites, directory, results):
+    backgroundPath = PokemonConfig().backgroundImage
+    baseline = peakMemory()
+    renderTime = encodeTime = 0
+    if variant == "before":
+        render = lambda sprite: legacyRender(sprite, backgroundPath)
+    else:
+        render = SilhouetteRenderer(backgroundPath).render
+    for i, sprite in enumerate(sprites):
+        start = time.perf_counter()
+        question = render(sprite)
+        renderTime += time.perf_counter() - start
+        start = time.perf_counter()
+        question.save(os.path.join(directory, f"{i}.png"), "PNG")
+        encodeTime += time.perf_counter() - start
+    results.put(
+        (renderTime / len(sprites), encodeTime / len(sprites), peakMemory() - baseline)
+    )
+
+
+def main():
+    spriteDirectory = tempfile.TemporaryDirectory()
+    sprites = []
+    for id in range(1, SPRITES + 1):
+        fileName = os.path.join(spriteDirectory.name, f"sprite-{id}.png")
+        with open(fileName, "wb") as fp:
+            fp.write(makeSprite(id))
+        sprites.append(fileName)
+
+    context = multiprocessing.get_context("spawn")
+    print(f"{SPRITES} sprites of 475x475 on a 1920x1080 background")
+    for variant in ("before", "after"):
+        with tempfile.TemporaryDirectory() as directory:
+            results = context.Queue()
+            process = context.Process(
+                target=run, args=(variant, sprites, directory, results)
+            )
+            process.start()
+            renderTime, encodeTime, memory = results.get()
+            process.join()
+        print(
+            f"{variant:>6}: render {renderTime * 1000:6.1f} ms per sprite, "
+            f"encode {encodeTime * 1000:6.1f} ms, peak memory +{memory:5.1f} MB"
+        )
+    spriteDirectory.cleanup()
+
+
+if __name__ == "__main__":
+    main()
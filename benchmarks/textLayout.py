@@ -0,0 +1,102 @@
+"""
+Benchmarks laying out Garlic and Bullshit text: the loops the cogs used,
+which step the font size one at a time and load the font again at every
+step, against utils.textLayout, cold and with the layout memoized. The loops
+measure text with bounding boxes rather than the deprecated getsize, which
+comes to the same sizes.
+
+Run from the repository root:
+
+    python -m benchmarks.textLayout
+"""
+
+import textwrap
+import time
+
+from PIL import Image, ImageFont
+from utils.configManager import GarlicConfig
+from utils.renderService import loadFont
+from utils.textLayout import layout, textSize
+
+REPEATS = 5
+SENTENCE = (
+    "WE ARE IN THE MIDST OF A HIGH-FREQUENCY BLOSSOMING OF INTERCONNECTEDNESS "
+    "THAT WILL GIVE US ACCESS TO THE QUANTUM SOUP ITSELF. "
+)
+TEXTS = {
+    "short": "GARLIC BREAD",
+    "medium": SENTENCE * 2,
+    "long": SENTENCE * 16,
+}
+
+
+def linearLayout(text, fontPath, imageWidth, loads):
+    """
+    The layout loops of the Garlic and Bullshit cogs.
+
+    Returns:
+    tuple: The wrapped text and its font size.
+    """
+
+    def truetype(size):
+        loads[0] += 1
+        return ImageFont.truetype(fontPath, size)
+
+    fontsize = 1
+    txt = text
+    font = truetype(fontsize)
+    while textSize(txt, font)[1] < 0.2 * textSize(txt, font)[0] and fontsize < 80:
+        fontsize += 1
+        font = truetype(fontsize)
+        w = (len(txt) * imageWidth) // font.getbbox(txt)[2]
+        txt = "\n".join(textwrap.wrap(txt, w))
+    while textSize(txt, font, spacing=10)[0] < 0.8 * imageWidth:
+        fontsize += 1
+        font = truetype(fontsize)
+    while textSize(txt, font, spacing=10)[0] > 0.8 * imageWidth:
+        fontsize -= 1
+        font = truetype(fontsize)
+    return txt, fontsize
+
+
+def main():
+    config = GarlicConfig()
+    with Image.open(config.template) as template:
+        imageWidth = template.width
+    print(f"Fitting text to a {imageWidth} pixel wide template")
+
+    for name, text in TEXTS.items():
+        loads = [0]
+        start = time.perf_counter()
+        for _ in range(REPEATS):
+            wrapped, size = linearLayout(text, config.font, imageWidth, loads)
+        linear = (time.perf_counter() - start) / REPEATS
+        print(
+            f"{name} ({len(text)} characters):\n"
+            f"    linear: {linear * 1000:8.1f} ms, {loads[0] // REPEATS:4d} font "
+            f"loads, size {size}, {wrapped.count(chr(10)) + 1} lines"
+        )
+
+        cold = 0
+        for _ in range(REPEATS):
+            layout.cache_clear()
+            loadFont.cache_clear()
+            start = time.perf_counter()
+            wrapped, size = layout(text, config.font, imageWidth)
+            cold += time.perf_counter() - start
+        cold /= REPEATS
+        print(
+            f"    search: {cold * 1000:8.1f} ms, "
+            f"{loadFont.cache_info().misses:4d} font loads, size {size}, "
+            f"{wrapped.count(chr(10)) + 1} lines"
+        )
+
+        start = time.perf_counter()
+        for _ in range(REPEATS):
+            layout(text, config.font, imageWidth)
+        memoized = (time.perf_counter() - start) / REPEATS
+        print(f"  memoized: {memoized * 1000:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,54 @@
 import asyncio
 import random
 import traceback
+import typing
 from concurrent.futures import CancelledError
 
-import aiohttp
 import discord
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from discord.ext import commands
 from utils.configManager import AnagramConfig
+from utils.corpusRegistry import CorpusRegistry
+from utils.definitionCache import DefinitionCache, WordsApiError
+from utils.letterIndex import LetterCountIndex
 from utils.log import log
+from utils.lookahead import Lookahead
+from utils.quizEngine import ChannelGame, QuizEngine, avatarUrl
+from utils.wordCorpus import TIERS
+
+
+class AnagramGame(ChannelGame):
+    """
+    The state of an anagram game or blitz in one channel.
+    """
+
+    __slots__ = (
+        "corpusName",
+        "corpus",
+        "difficulty",
+        "wordsList",
+        "answers",
+        "details",
+        "rack",
+        "blitzAnswers",
+        "found",
+    )
+
+    def __init__(self, channel):
+        super().__init__(channel)
+        self.corpusName = None
+        self.corpus = None
+        self.difficulty = None
+        # Every word picked for the game so far, so none is picked twice.
+        self.wordsList = []
+        # Every anagram of the current word that is accepted as an answer.
+        self.answers = frozenset()
+        self.details = []
+        # Blitz only: the rack of letters, its answers, and word -> user ID
+        # of the words found.
+        self.rack = None
+        self.blitzAnswers = frozenset()
+        self.found = {}
 
 
 class Anagrams(commands.Cog):
@@ -17,12 +58,32 @@ class Anagrams(commands.Cog):
 
     def __init__(self, bot):
         self.bot = bot
-        self.channelStates = {}
         self.config = AnagramConfig()
+        self.quiz = QuizEngine(self, self.config, "anagram")
         self.botConfig = bot.config
-        with open(self.config.corpus) as fp:
-            self.corpus = fp.read().splitlines()
-        self.corpusHasChanged = False
+        # Letter count indexes for anagram blitz, built on first use by
+        # getLetterIndex and keyed by corpus name.
+        self.letterIndexes = {}
+        # Corpora are opened when a game first needs them.
+        self.corpora = CorpusRegistry(
+            self.config.corpora,
+            compactionThreshold=self.config.corpusCompactionThreshold,
+            idleTime=self.config.corpusIdleTime,
+            onEvict=lambda name: self.letterIndexes.pop(name, None),
+        )
+        self.corpusCollection = bot.db_client[self.botConfig.database][
+            self.config.corpusCollection
+        ]
+        self.guildCorpora = {}
+        scheduler = AsyncIOScheduler()
+        scheduler.add_job(self.corpora.evictIdle, "interval", minutes=5)
+        scheduler.start()
+        self.definitions = DefinitionCache(
+            self.config.definitionCache,
+            self.config.wordsAPI,
+            ttl=self.config.definitionTTL,
+            negativeTtl=self.config.noDefinitionTTL,
+        )
 
     @commands.group(
         name="anagram",
@@ -30,19 +91,22 @@ class Anagrams(commands.Cog):
         invoke_without_command=True,
         case_insensitive=True,
     )
-    async def anagram(self, ctx, numberOfQuestions=None):
+    async def anagram(self, ctx, numberOfQuestions: typing.Optional[int], *options):
         """
         Play anagrams. If no subcommands are provided, it defaults to start.
         """
-        await self.start(ctx, numberOfQuestions)
+        await self.start(ctx, numberOfQuestions, *options)
 
-    @anagram.command(name="start")
-    async def start(self, ctx, numberOfQuestions=None):
+    @anagram.command(
+        name="start",
+        usage="[number of questions] [easy | medium | hard] [corpus]",
+    )
+    async def start(self, ctx, numberOfQuestions: typing.Optional[int], *options):
         """
-        Starts a game of anagrams.
+        Starts a game of anagrams. Optionally pick a difficulty and a word list.
         """
-        if str(ctx.channel.id) not in self.channelStates:
-            self.channelStates[str(ctx.channel.id)] = {}
+        if self.quiz.get(ctx.channel) is None:
+            game = self.quiz.newGame(ctx.channel)
             embed = discord.Embed(
                 title=ctx.message.author.name + " started a game of anagrams",
                 description="Unscramble the letters to make meaningful words.",
@@ -50,7 +114,10 @@ class Anagrams(commands.Cog):
             )
             await ctx.send(embed=embed)
             try:
-                await self.playAnagrams(ctx, numberOfQuestions)
+                difficulty, corpusName = await self.parseGameOptions(ctx, options)
+                await self.playAnagrams(
+                    ctx, game, numberOfQuestions, difficulty, corpusName
+                )
             except Exception as e:
                 log(ctx.channel.id, "Oopsie, exception: ", e)
                 traceback.print_exc()
@@ -69,9 +136,10 @@ class Anagrams(commands.Cog):
         """
         Stops an ongoing game of anagrams.
         """
-        if await self.checkGameInProgress(ctx.channel):
+        game = await self.checkGameInProgress(ctx.channel)
+        if game is not None:
             try:
-                self.cleanTasks(str(ctx.channel.id))
+                self.quiz.cancelTasks(game)
             except Exception as e:
                 log(ctx.channel.id, "Oopsie, exception: ", e)
                 traceback.print_exc()
@@ -84,41 +152,108 @@ class Anagrams(commands.Cog):
                     colour=discord.Colour.red(),
                 )
                 await ctx.send(embed=embed)
-                await self.publishScores(ctx.channel)
-                self.stopGame(ctx.channel)
+                if game.rack is not None:
+                    await self.publishBlitzResults(game)
+                else:
+                    await self.quiz.publishScores(game)
+                self.quiz.stopGame(game)
 
     @anagram.command(name="skip", aliases=["giveup", "sk", "lite"])
     async def skip(self, ctx):
         """
         Skips the current question in an anagram game.
         """
-        if not await self.checkGameInProgress(ctx.channel):
+        game = await self.checkGameInProgress(ctx.channel)
+        if game is None:
             return
-        elif (
-            "answer" not in self.channelStates[str(ctx.channel.id)]
-            or self.channelStates[str(ctx.channel.id)]["answer"] is None
-        ):
+        try:
+            self.quiz.skip(game)
+        except Exception as e:
+            log(ctx.channel.id, "Oopsie, exception: ", e)
+            traceback.print_exc()
+
+    @anagram.command(name="scores", alias=["sc"])
+    async def scores(self, ctx):
+        """
+        Displays the scoreboard.
+        """
+        game = await self.checkGameInProgress(ctx.channel)
+        if game is None:
             return
+        if game.rack is not None:
+            await self.publishBlitzResults(game, False)
         else:
+            await self.quiz.publishScores(game, False)
+
+    @anagram.command(name="blitz", aliases=["b"], usage="[seconds] [corpus]")
+    async def blitz(self, ctx, seconds: typing.Optional[int], *options):
+        """
+        Starts a round of anagram blitz. Find as many words as you can in a set of letters.
+        """
+        if self.quiz.get(ctx.channel) is None:
+            game = self.quiz.newGame(ctx.channel)
             try:
-                self.cleanTasks(str(ctx.channel.id))
+                _, corpusName = await self.parseGameOptions(ctx, options)
+                await self.playBlitz(ctx, game, seconds, corpusName)
             except Exception as e:
                 log(ctx.channel.id, "Oopsie, exception: ", e)
                 traceback.print_exc()
-            else:
-                answerTask = asyncio.create_task(
-                    self.revealAnswer(
-                        ctx.channel, waitTime=0, reason="Question skipped"
-                    )
-                )
-                answerTask.set_name("anagram-" + str(ctx.channel.id))
+                self.quiz.stopGame(game)
+        else:
+            embed = discord.Embed(
+                title="There's already a game running in this channel",
+                description="Try running the command in another channel or stop the ongoing game with `"
+                + self.botConfig.commandPrefix
+                + "stop`.",
+                colour=discord.Colour.red(),
+            )
+            await ctx.send(embed=embed)
 
-    @anagram.command(name="scores", alias=["sc"])
-    async def scores(self, ctx):
+    @anagram.command(name="corpus", aliases=["corpora", "words"])
+    async def corpus(self, ctx, name=None):
         """
-        Displays the scoreboard.
+        Lists the available word lists, or picks the one this server plays with.
         """
-        await self.publishScores(ctx.channel, False)
+        if name is None:
+            current = self.getGuildCorpus(ctx.guild)
+            embed = discord.Embed(
+                title="Available word lists",
+                description="\n".join(
+                    ("**" + corpus + "** (current)" if corpus == current else corpus)
+                    for corpus in self.corpora.names
+                ),
+                colour=discord.Colour.blue(),
+            )
+            embed.set_footer(
+                text="Type "
+                + self.botConfig.commandPrefix
+                + "anagram corpus <name> to switch."
+            )
+            await ctx.send(embed=embed)
+        elif name.lower() not in self.corpora:
+            embed = discord.Embed(
+                title="Couldn't find the word list you specified.",
+                colour=discord.Colour.red(),
+            )
+            await ctx.send(embed=embed)
+        elif ctx.guild is None:
+            embed = discord.Embed(
+                title="Word lists can only be picked for servers.",
+                colour=discord.Colour.red(),
+            )
+            await ctx.send(embed=embed)
+        else:
+            self.corpusCollection.update_one(
+                {"guildId": ctx.guild.id},
+                {"$set": {"guildId": ctx.guild.id, "corpus": name.lower()}},
+                upsert=True,
+            )
+            self.guildCorpora[ctx.guild.id] = name.lower()
+            embed = discord.Embed(
+                title="This server now plays with the " + name.lower() + " word list.",
+                colour=discord.Colour.blue(),
+            )
+            await ctx.send(embed=embed)
 
     @commands.Cog.listener()
     async def on_message(self, message):
@@ -129,81 +264,15 @@ class Anagrams(commands.Cog):
         if message.author == self.bot.user:
             return
 
-        if str(message.channel.id) not in self.channelStates:
+        game = self.quiz.games.get(message.channel.id)
+        if game is None:
             return
 
-        if not self.channelStates[str(message.channel.id)]:
+        if game.rack is not None:
+            await self.checkBlitzWord(game, message)
             return
 
-        if "answer" not in self.channelStates[str(message.channel.id)]:
-            return
-        if (
-            message.content.casefold()
-            == self.channelStates[str(message.channel.id)]["answer"].casefold()
-        ):
-            self.channelStates[str(message.channel.id)]["answer"] = None
-            await message.add_reaction("\N{THUMBS UP SIGN}")
-            if message.author in self.channelStates[str(message.channel.id)]["scores"]:
-                self.channelStates[str(message.channel.id)]["scores"][
-                    message.author
-                ] = (
-                    self.channelStates[str(message.channel.id)]["scores"][
-                        message.author
-                    ]
-                    + 1
-                )
-            else:
-                self.channelStates[str(message.channel.id)]["scores"][
-                    message.author
-                ] = 1
-            embed = discord.Embed(
-                title="The answer was: `" + message.content.upper() + "`",
-                colour=discord.Colour.green(),
-            )
-            embed.set_author(
-                name=message.author.name + " got it right!",
-                icon_url="https://cdn.discordapp.com/avatars/"
-                + str(message.author.id)
-                + "/"
-                + str(message.author.avatar)
-                + ".png",
-            )
-            embed.set_thumbnail(
-                url="https://cdn.discordapp.com/avatars/"
-                + str(message.author.id)
-                + "/"
-                + str(message.author.avatar)
-                + ".png"
-            )
-            for i in self.channelStates[str(message.channel.id)]["details"]:
-                if (
-                    "partOfSpeech" in i
-                    and i["partOfSpeech"] is not None
-                    and "definition" in i
-                    and i["definition"] is not None
-                ):
-                    embed.add_field(
-                        name="_" + i["partOfSpeech"] + "_",
-                        value=i["definition"],
-                        inline=False,
-                    )
-            await message.channel.send(embed=embed)
-            try:
-                self.cleanTasks(str(message.channel.id))
-            except Exception as e:
-                log(message.channel.id, "Oopsie, exception: ", e)
-                traceback.print_exc()
-            try:
-                nextQuestionTask = asyncio.create_task(
-                    self.askQuestion(
-                        message.channel, waitTime=self.config.timeToNextQuestion
-                    )
-                )
-                nextQuestionTask.set_name("anagrams-" + str(message.channel.id))
-            except Exception as e:
-                log(message.channel.id, "Oopsie, exception: ", e)
-                traceback.print_exc()
-            return
+        await self.quiz.checkAnswer(game, message)
 
     async def checkGameInProgress(self, channel):
         """
@@ -214,9 +283,10 @@ class Anagrams(commands.Cog):
         channel (discord.TextChannel): The channel to be checked for running games
 
         Returns:
-        boolean: True if there is a game running in the channel. False otherwise.
+        AnagramGame: The game running in the channel, or None if there isn't one.
         """
-        if str(channel.id) not in self.channelStates:
+        game = self.quiz.get(channel)
+        if game is None:
             embed = discord.Embed(
                 title="There are no games in progress",
                 description="Type `"
@@ -225,73 +295,263 @@ class Anagrams(commands.Cog):
                 colour=discord.Colour.red(),
             )
             await channel.send(embed=embed)
-            return False
-        else:
-            return True
+        return game
+
+    def getGuildCorpus(self, guild):
+        """
+        Gets the name of the word list a server plays with by default.
 
-    async def playAnagrams(self, ctx, numberOfQuestions):
+        Parameters:
+        guild (discord.Guild): The server, or None for direct messages
+
+        Returns:
+        string: The corpus name.
+        """
+        if guild is None:
+            return "default"
+        if guild.id not in self.guildCorpora:
+            setting = self.corpusCollection.find_one({"guildId": guild.id}) or {}
+            self.guildCorpora[guild.id] = setting.get("corpus", "default")
+        if self.guildCorpora[guild.id] not in self.corpora:
+            return "default"
+        return self.guildCorpora[guild.id]
+
+    async def parseGameOptions(self, ctx, options):
+        """
+        Sorts the options given to start a game into a difficulty and a word
+        list. Sends a message about any that aren't either.
+
+        Parameters:
+        ctx (discord.ext.commands.Context): The context of the recieved command
+        options (tuple): The options
+
+        Returns:
+        tuple: (difficulty, corpusName). difficulty is None if not given.
+        """
+        difficulty = None
+        corpusName = self.getGuildCorpus(ctx.guild)
+        for option in options:
+            if option.lower() in TIERS:
+                difficulty = option.lower()
+            elif option.lower() in self.corpora:
+                corpusName = option.lower()
+            else:
+                embed = discord.Embed(
+                    title="Couldn't find a difficulty or word list called "
+                    + option
+                    + ". Ignoring it.",
+                    colour=discord.Colour.blue(),
+                )
+                await ctx.send(embed=embed)
+        return difficulty, corpusName
+
+    async def playAnagrams(
+        self, ctx, game, numberOfQuestions, difficulty=None, corpusName="default"
+    ):
         """
         Function to set up and start the anagram game.
 
         Parameters:
         ctx (discord.ext.commands.Context): The context of the recieved command
+        game (AnagramGame): The game to set up
         numberOfQuestions (int): The number of questions in the game
+        difficulty (string): The difficulty tier to pick words from
+        corpusName (string): The word list to pick words from
         """
-        await self.getWordsFromCorpus(ctx, numberOfQuestions)
-        self.channelStates[str(ctx.channel.id)]["scores"] = {}
-        askQuestionTask = asyncio.create_task(
-            self.askQuestion(ctx.channel, self.config.timeToFirstQuestion)
+        self.useCorpus(game, corpusName)
+        await self.getWordsFromCorpus(ctx, game, numberOfQuestions, difficulty)
+        self.quiz.play(game, self.config.timeToFirstQuestion)
+
+    def useCorpus(self, game, corpusName):
+        """
+        Opens a word list for a game. It is released again when the game ends.
+
+        Parameters:
+        game (AnagramGame): The game
+        corpusName (string): The name of the word list
+        """
+        game.corpus = self.corpora.acquire(corpusName)
+        game.corpusName = corpusName
+
+    def getLetterIndex(self, corpusName):
+        """
+        Returns the letter count index of a corpus, building it if it hasn't
+        been built yet or the corpus has been compacted since.
+        """
+        corpus = self.corpora.acquire(corpusName)
+        try:
+            if (
+                corpusName not in self.letterIndexes
+                or self.letterIndexes[corpusName].generation != corpus.generation
+            ):
+                self.letterIndexes[corpusName] = LetterCountIndex(corpus)
+            return self.letterIndexes[corpusName]
+        finally:
+            self.corpora.release(corpusName)
+
+    async def playBlitz(self, ctx, game, seconds, corpusName="default"):
+        """
+        Function to set up and start a round of anagram blitz.
+
+        Parameters:
+        ctx (discord.ext.commands.Context): The context of the recieved command
+        game (AnagramGame): The game to set up
+        seconds (int): The length of the round in seconds
+        corpusName (string): The word list to make the rack from
+        """
+        if seconds is None:
+            seconds = self.config.blitzTime
+        self.useCorpus(game, corpusName)
+        rack, answers = self.getLetterIndex(corpusName).makeRack(
+            self.config.blitzRackSize,
+            minLength=self.config.blitzMinWordLength,
+            minAnswers=self.config.blitzMinAnswers,
         )
-        askQuestionTask.set_name("anagrams-" + str(ctx.channel.id))
-        log(ctx.channel.id, "Anagram game started.")
-
-    async def fetch(self, word: str, session: object, ctx):
-        """
-        Fetch data for a word. If required data is not available,
-        get a new word and fetch data for that.
-        """
-        url = self.config.wordsAPI.replace("{word}", word)
-        async with session.get(url) as response:
-            if response.status == 200:
-                data = await response.json()
-                if data != [] and "defs" in data[0]:
-                    # The required data is available. Add it to the list.
-                    details = []
-                    for j in data[0]["defs"]:
-                        d = {}
-                        partOfSpeech, definition = tuple(j.split("\t", 1))
-                        if partOfSpeech == "n":
-                            d["partOfSpeech"] = "noun"
-                        elif partOfSpeech == "v":
-                            d["partOfSpeech"] = "verb"
-                        elif partOfSpeech == "adj":
-                            d["partOfSpeech"] = "adjective"
-                        d["definition"] = definition
-                        details.append(d)
-                    self.channelStates[str(ctx.channel.id)]["words"].append(
-                        (word, details)
-                    )
-                    return
-            # The required data is not available. Get a new word and try again.
-            oldWord = word
-            self.corpus.remove(oldWord)
-            self.corpusHasChanged = True
-            while word in self.channelStates[str(ctx.channel.id)]["wordsList"]:
-                word = random.choice(self.corpus)
-            self.channelStates[str(ctx.channel.id)]["wordsList"].append(word)
-            log(ctx.channel.id, f"Replacing {oldWord} with {word}")
-            task = asyncio.create_task(self.fetch(word, session, ctx))
-            await task
+        game.rack = rack
+        game.blitzAnswers = answers
+        embed = discord.Embed(
+            title=self.shuffle_word(rack),
+            description="Find words of "
+            + str(self.config.blitzMinWordLength)
+            + " or more letters using these letters. There are "
+            + str(len(answers))
+            + " to find and you have "
+            + str(int(seconds))
+            + " seconds!",
+            colour=discord.Colour.blue(),
+        )
+        embed.set_author(name=ctx.message.author.name + " started an anagram blitz")
+        await ctx.send(embed=embed)
+        self.quiz.startTask(game, self.endBlitz(game, int(seconds)))
+        log(ctx.channel.id, f"Anagram blitz started with {rack}.")
+
+    async def checkBlitzWord(self, game, message):
+        """
+        Scores a message in an anagram blitz if it is a word from the rack that
+        hasn't been found yet.
+
+        Parameters:
+        game (AnagramGame): The blitz in the message's channel
+        message (discord.Message): The message to check
+        """
+        word = message.content.casefold()
+        if word not in game.blitzAnswers or word in game.found:
             return
+        game.found[word] = message.author.id
+        game.addPoint(message.author)
+        await message.add_reaction("\N{WHITE HEAVY CHECK MARK}")
+
+    async def endBlitz(self, game, waitTime):
+        """
+        End the anagram blitz once time runs out.
 
-    async def getWordsFromCorpus(self, ctx, numberOfQuestions):
+        Parameters:
+        game (AnagramGame): The blitz to end.
+        waitTime (int): Seconds to wait before ending the round.
+        """
+        try:
+            await asyncio.sleep(waitTime)
+            await self.publishBlitzResults(game)
+            self.quiz.stopGame(game)
+        except asyncio.CancelledError:
+            log(game.channel.id, "endBlitz task was cancelled")
+
+    async def publishBlitzResults(self, game, gameEnded=True):
+        """
+        Publish the words found so far in an anagram blitz, and who found them.
+
+        Parameters:
+        game (AnagramGame): The blitz to publish the results of.
+        gameEnded (boolean): Whether the round is over
+        """
+        scores = game.ranking()
+        if not scores:
+            winnerString = (
+                "Ruh-roh! No one found any words."
+                if gameEnded
+                else "No words found so far."
+            )
+        elif len(scores) == 1 or scores[0][1] != scores[1][1]:
+            winnerString = game.players[scores[0][0]][0] + (
+                " won the blitz!" if gameEnded else " is in the lead!"
+            )
+        else:
+            winnerString = "It's a tie!" if gameEnded else "It's tied at the top!"
+        embed = discord.Embed(title=winnerString, colour=discord.Colour.blue())
+        embed.set_author(name="Blitz over" if gameEnded else "Words so far")
+        if scores:
+            embed.add_field(
+                name="Player",
+                value="\n".join(game.players[userId][0] for userId, _ in scores),
+            )
+            embed.add_field(
+                name="Words", value="\n".join(str(score) for _, score in scores)
+            )
+        embed.add_field(
+            name="Found",
+            value=str(len(game.found)) + "/" + str(len(game.blitzAnswers)),
+            inline=False,
+        )
+        if gameEnded:
+            missed = sorted(
+                game.blitzAnswers.difference(game.found),
+                key=lambda word: (-len(word), word),
+            )
+            if missed:
+                embed.add_field(
+                    name="Some you missed",
+                    value=", ".join("`" + word + "`" for word in missed[:10]),
+                    inline=False,
+                )
+        await game.channel.send(embed=embed)
+
+    async def fetch(self, word: str, game):
+        """
+        Fetch data for a word. If the word has no definitions, get a new
+        word and fetch data for that. If WordsAPI can't be reached after a
+        few attempts, give up on the question.
+
+        Returns:
+        tuple: (word, details) for the word that was used, or None if
+            WordsAPI is down.
+        """
+        failures = 0
+        while True:
+            try:
+                details = await self.definitions.get(word)
+            except WordsApiError as e:
+                # Any other word would fail the same way, so try this one
+                # again after a while.
+                failures += 1
+                log(game.channel.id, f"Couldn't look up {word}: ", e)
+                if failures >= self.config.wordsAPIAttempts:
+                    return None
+                await asyncio.sleep(failures)
+                continue
+            if details is not None:
+                return word, details
+            # The word has no definitions, so it's no use to anyone.
+            game.corpus.remove(word)
+            if game.corpus.needsCompaction:
+                asyncio.create_task(game.corpus.compact(self.bot.loop))
+            oldWord = word
+            (word,) = game.corpus.sample(
+                1, exclude=game.wordsList, tier=game.difficulty
+            )
+            game.wordsList.append(word)
+            log(game.channel.id, f"Replacing {oldWord} with {word}")
+
+    async def getWordsFromCorpus(self, ctx, game, numberOfQuestions, difficulty=None):
         """
         Get the words required for the game from the corpus.
 
         Parameters:
         ctx (discord.ext.commands.Context): The context of the recieved command
+        game (AnagramGame): The game to get the words for
         numberOfQuestions (int): The number of questions in the game
+        difficulty (string): The difficulty tier to pick words from
         """
+        game.difficulty = difficulty
         if numberOfQuestions is None:
             numberOfQuestions = self.config.noOfQuestions
         elif int(numberOfQuestions) > self.config.questionLimit:
@@ -305,260 +565,120 @@ class Anagrams(commands.Cog):
             )
             await ctx.send(embed=embed)
             numberOfQuestions = self.config.questionLimit
-        self.channelStates[str(ctx.channel.id)]["wordsList"] = random.sample(
-            self.corpus, int(numberOfQuestions)
+        game.wordsList = game.corpus.sample(int(numberOfQuestions), tier=difficulty)
+        # Only the next few words are looked up at a time, so a long game
+        # doesn't hold every definition in memory from the start.
+        game.questions = Lookahead(
+            lambda word: self.fetch(word, game),
+            list(game.wordsList),
+            size=self.config.questionLookahead,
+            name="anagram-prep-" + str(game.channel.id),
         )
-        self.channelStates[str(ctx.channel.id)]["words"] = []
-        tasks = []
-        async with aiohttp.ClientSession(loop=self.bot.loop) as session:
-            for word in list(self.channelStates[str(ctx.channel.id)]["wordsList"]):
-                task = asyncio.ensure_future(self.fetch(word, session, ctx))
-                tasks.append(task)
-            _ = await asyncio.gather(*tasks)
-        del self.channelStates[str(ctx.channel.id)]["wordsList"]
-        print([i[0] for i in self.channelStates[str(ctx.channel.id)]["words"]])
+        game.questions.start()
 
-    async def askQuestion(self, channel, waitTime=None):
+    def newGame(self, channel):
+        return AnagramGame(channel)
+
+    def setQuestion(self, game, item):
         """
-        Ask the next question.
+        Makes a word the current question.
 
         Parameters:
-        channel (discord.TextChannel): Channel to send the message to.
-        waitTime (int): Seconds to wait before asking the question.
-        """
-        if waitTime is None:
-            waitTime = self.config.timeToNextQuestion
-        try:
-            if not self.channelStates[str(channel.id)]["words"]:
-                await self.publishScores(channel)
-                self.stopGame(channel)
-                return
+        game (AnagramGame): The game to ask the question in
+        item (tuple): (word, details) from fetch
 
-            await asyncio.sleep(waitTime)
-            word, details = self.channelStates[str(channel.id)]["words"][0]
-            self.channelStates[str(channel.id)]["words"] = self.channelStates[
-                str(channel.id)
-            ]["words"][1:]
-            self.channelStates[str(channel.id)]["answer"] = word
-            self.channelStates[str(channel.id)]["details"] = details
-            question = self.shuffle_word(word)
-            self.channelStates[str(channel.id)]["question"] = discord.Embed(
-                title=question, colour=discord.Colour.blue()
-            )
-            if "questionNumber" not in self.channelStates[str(channel.id)]:
-                self.channelStates[str(channel.id)]["questionNumber"] = 1
-            else:
-                self.channelStates[str(channel.id)]["questionNumber"] += 1
-            self.channelStates[str(channel.id)]["question"].set_author(
-                name="Question "
-                + str(self.channelStates[str(channel.id)]["questionNumber"])
-            )
-            await channel.send(embed=self.channelStates[str(channel.id)]["question"])
-            try:
-                answerTask = asyncio.create_task(self.revealAnswer(channel))
-                answerTask.set_name("anagram-" + str(channel.id))
-                hintTask = asyncio.create_task(self.giveHint(channel))
-                hintTask.set_name("anagram-" + str(channel.id))
-            except Exception as e:
-                log(channel.id, "Oopsie, exception: ", e)
-                traceback.print_exc()
-        except asyncio.CancelledError:
-            log(channel.id, "askQuestion task was cancelled")
-        except KeyError:
-            log(channel.id, "askQuestion task was interrupted by stop")
+        Returns:
+        dict: The message to send.
+        """
+        word, details = item
+        game.answer = word
+        game.answers = game.corpus.anagramsOf(word)
+        game.details = details
+        game.question = discord.Embed(
+            title=self.shuffle_word(word), colour=discord.Colour.blue()
+        )
+        return {"embed": game.question}
 
-    async def revealAnswer(self, channel, waitTime=None, reason="Time's up!"):
-        """
-        Reveal the answer to the current question.
+    def questionSent(self, game):
+        pass
 
-        Parameters:
-        channel (discord.TextChannel): Channel to send the message to.
-        waitTime (int): Seconds to wait before asking the question.
-        reason (string): Reason why the answer is being revealed.
-        """
-        if waitTime is None:
-            waitTime = self.config.timePerQuestion
-        try:
-            await asyncio.sleep(waitTime)
-            answer = self.channelStates[str(channel.id)]["answer"]
-            self.channelStates[str(channel.id)]["answer"] = None
-            self.cleanTasks(str(channel.id))
-            embed = discord.Embed(
-                title="The answer was `" + answer + "`", colour=discord.Colour.red()
-            )
-            for i in self.channelStates[str(channel.id)]["details"]:
-                if (
-                    "partOfSpeech" in i
-                    and i["partOfSpeech"] is not None
-                    and "definition" in i
-                    and i["definition"] is not None
-                ):
-                    embed.add_field(
-                        name="_" + i["partOfSpeech"] + "_",
-                        value=i["definition"],
-                        inline=False,
-                    )
-            embed.set_author(name=reason)
-            await channel.send(embed=embed)
-            try:
-                nextQuestionTask = asyncio.create_task(
-                    self.askQuestion(channel, waitTime=self.config.timeToNextQuestion)
-                )
-                nextQuestionTask.set_name("anagram-" + str(channel.id))
-            except Exception as e:
-                log(channel.id, "Oopsie, exception", e)
-                traceback.print_exc()
-        except asyncio.CancelledError:
-            log(channel.id, "revealAnswer task was cancelled")
+    def isCorrect(self, game, text):
+        return text.casefold() in game.answers
 
-    async def giveHint(self, channel, waitTime=None):
+    def addDefinitions(self, embed, details):
         """
-        Give the next hint for the question.
-
-        Parameters:
-        channel (discord.TextChannel): Channel to send the message to.
-        waitTime (int): Seconds to wait before asking the question.
+        Adds a field for each definition of a word to an embed.
         """
-        if waitTime is None:
-            waitTime = self.config.timeToFirstHint
-        try:
-            await asyncio.sleep(waitTime)
-            if not await self.checkGameInProgress(channel):
-                return
-
-            elif (
-                "answer" not in self.channelStates[str(channel.id)]
-                or self.channelStates[str(channel.id)]["answer"] is None
-            ):
-                return
-
-            elif self.channelStates[str(channel.id)]["question"].fields == []:
-                self.channelStates[str(channel.id)]["question"].add_field(
-                    name="First letter",
-                    value=self.shuffle_word(self.channelStates[str(channel.id)]["answer"][0]),
-                    inline=True,
-                )
-                await channel.send(
-                    embed=self.channelStates[str(channel.id)]["question"]
-                )
-            else:
-                n = len(self.channelStates[str(channel.id)]["question"].fields)
-                if n > len(self.channelStates[str(channel.id)]["details"]):
-                    return
-                i = self.channelStates[str(channel.id)]["details"][n - 1]
-                if "definition" in i and i["definition"] is not None:
-                    self.channelStates[str(channel.id)]["question"].add_field(
-                        name="Definition", value=i["definition"], inline=False
-                    )
-                    await channel.send(
-                        embed=self.channelStates[str(channel.id)]["question"]
-                    )
+        for i in details:
             if (
-                len(self.channelStates[str(channel.id)]["answer"])
-                > self.config.shortWordLengthCutoff
+                "partOfSpeech" in i
+                and i["partOfSpeech"] is not None
+                and "definition" in i
+                and i["definition"] is not None
             ):
-                hintTask = asyncio.create_task(
-                    self.giveHint(channel, self.config.timeToSecondHint)
-                )
-                hintTask.set_name("anagram-" + str(channel.id))
-            else:
-                hintTask = asyncio.create_task(
-                    self.giveHint(channel, self.config.timeToSecondHintShortWords)
+                embed.add_field(
+                    name="_" + i["partOfSpeech"] + "_",
+                    value=i["definition"],
+                    inline=False,
                 )
-                hintTask.set_name("anagram-" + str(channel.id))
-        except asyncio.CancelledError:
-            log(channel.id, "giveHint task was cancelled")
-
-    async def publishScores(self, channel, gameEnded=True):
-        """
-        Publish the scores.
 
-        Parameters:
-        channel (discord.TextChannel): Channel to send the message to.
-        """
-        if "questionNumber" in self.channelStates[str(channel.id)]:
-            scores = sorted(
-                self.channelStates[str(channel.id)]["scores"].items(),
-                key=lambda x: x[1],
-                reverse=True,
-            )
-            nameString = ""
-            scoreString = ""
-            avatar = ""
-            maxScore = -1
-            if gameEnded:
-                winnerString = "Ruh-roh! No one got any points."
-            else:
-                winnerString = "No points so far."
-            showScores = False
-            noOfQuestions = self.channelStates[str(channel.id)]["questionNumber"]
-            if len(scores) > 0:
-                showScores = True
-                maxScore = scores[0][1]
-            if showScores:
-                if len(scores) == 1 or scores[0][1] != scores[1][1]:
-                    winner = scores[0][0]
-                    if gameEnded:
-                        winnerString = winner.name + " won the game!"
-                    else:
-                        winnerString = winner.name + " is in the lead!"
-                    avatar = (
-                        "https://cdn.discordapp.com/avatars/"
-                        + str(winner.id)
-                        + "/"
-                        + str(winner.avatar)
-                        + ".png"
-                    )
-                else:
-                    if gameEnded:
-                        winnerString = "It's a tie!"
-                    else:
-                        winnerString = "It's tied at the top!"
-                for user, score in scores:
-                    if score == maxScore:
-                        nameString = nameString + "**" + user.name + "**\n"
-                        scoreString = (
-                            scoreString
-                            + "**"
-                            + str(round(score * 100 / noOfQuestions, 2))
-                            + "**\n"
-                        )
-                    else:
-                        nameString = nameString + user.name + "\n"
-                        scoreString = (
-                            scoreString
-                            + str(round(score * 100 / noOfQuestions, 2))
-                            + "\n"
-                        )
-            embed = discord.Embed(title=winnerString, colour=discord.Colour.blue())
-            if gameEnded:
-                embed.set_author(name="Game over", icon_url=avatar)
-            else:
-                embed.set_author(name="Scores so far", icon_url=avatar)
-            if showScores:
-                embed.add_field(name="Player", value=nameString)
-                embed.add_field(name="Score", value=scoreString)
-                embed.set_thumbnail(url=avatar)
-            await channel.send(embed=embed)
+    def answerEmbed(self, game, message, answer):
+        embed = discord.Embed(
+            title="The answer was: `" + message.content.upper() + "`",
+            colour=discord.Colour.green(),
+        )
+        if message.content.casefold() != answer.casefold():
+            embed.description = "The word I had in mind was `" + answer.upper() + "`."
+        embed.set_author(
+            name=message.author.name + " got it right!",
+            icon_url=avatarUrl(message.author),
+        )
+        embed.set_thumbnail(url=avatarUrl(message.author))
+        self.addDefinitions(embed, game.details)
+        return embed
 
-    def stopGame(self, channel):
-        self.cleanTasks(str(channel.id))
-        del self.channelStates[str(channel.id)]
-        log(channel.id, "Anagram game ended.")
+    def revealEmbed(self, game, answer):
+        embed = discord.Embed(
+            title="The answer was `" + answer + "`", colour=discord.Colour.red()
+        )
+        self.addDefinitions(embed, game.details)
+        return embed
 
-    def cleanTasks(self, channel=""):
+    def nextHint(self, game):
         """
-        Clean up any existing game task.
+        Adds the next hint to the question: the first letter, then the
+        definitions one by one.
 
-        Parameters:
-        channel (discord.TextChannel): Channel to clean up tasks in.
-        """
-        for task in asyncio.all_tasks():
-            if task != asyncio.current_task() and task.get_name().startswith(
-                "anagram-" + channel
-            ):
-                task.cancel()
-        return
+        Returns:
+        tuple: (changed, waitTime), or None if there are no hints left.
+        """
+        changed = False
+        if game.question.fields == []:
+            game.question.add_field(
+                name="First letter",
+                value=self.shuffle_word(game.answer[0]),
+                inline=True,
+            )
+            changed = True
+        else:
+            n = len(game.question.fields)
+            if n > len(game.details):
+                return None
+            i = game.details[n - 1]
+            if "definition" in i and i["definition"] is not None:
+                game.question.add_field(
+                    name="Definition", value=i["definition"], inline=False
+                )
+                changed = True
+        if len(game.answer) > self.config.shortWordLengthCutoff:
+            return changed, self.config.timeToSecondHint
+        return changed, self.config.timeToSecondHintShortWords
+
+    def endGame(self, game):
+        if game.questions is not None:
+            log(game.channel.id, "Definition cache: " + self.definitions.stats)
+        if game.corpusName is not None:
+            self.corpora.release(game.corpusName)
 
     def shuffle_word(self, word):
         """
@@ -571,23 +691,16 @@ class Anagrams(commands.Cog):
         random.shuffle(word)
         return " ".join([(":regional_indicator_%s:" % letter) for letter in word])
 
-    def cleanCorpus(self):
-        """
-        Rewrites the corpus.
-        """
-        with open(self.config.corpus, "w") as f:
-            for item in self.corpus:
-                f.write("%s\n" % item)
-
-    def signal_handler(self):
+    async def signal_handler(self):
         """
         Called by bot when it recieves a SIGTERM or SIGINT. For cleanup activities before exiting.
         """
         print("Cancelling tasks...")
-        self.cleanTasks()
-        if self.corpusHasChanged:
-            print("Rewriting anagram corpus...")
-            self.cleanCorpus()
+        self.quiz.stopAll()
+        print("Closing definition cache...")
+        await self.definitions.close()
+        print("Closing anagram corpora...")
+        await self.corpora.closeAll()
 
 
 def setup(bot):
@@ -1,13 +1,15 @@
 import random
-import textwrap
+from io import BytesIO
 
+import aiohttp
 import discord
 import nabg
-import requests
 from discord.ext import commands
-from PIL import Image, ImageDraw, ImageFont
 from utils.configManager import BullshitConfig
+from utils.imageEncoder import ImageEncoder, extensionOf
 from utils.log import log
+from utils.renderService import RenderError, RenderQueueFull, preloadFont
+from utils.textPost import renderPost
 
 
 class Bullshit(commands.Cog):
@@ -18,6 +20,8 @@ class Bullshit(commands.Cog):
     def __init__(self, bot):
         self.config = BullshitConfig()
         self.bot = bot
+        self.encoder = ImageEncoder.fromConfig(self.config.imageEncoding)
+        bot.renders.preload(preloadFont, self.config.font, range(1, 121))
 
     @commands.command(aliases=["shit"])
     async def bullshit(self, ctx):
@@ -30,58 +34,42 @@ class Bullshit(commands.Cog):
         """
         Creates and sends the message.
         """
-        image = Image.open(
-            requests.get("http://placeimg.com/640/480/nature", stream=True).raw
-        )
-        draw = ImageDraw.Draw(image)
-
-        fontsize = 1
-        txt = nabg.ionize()
-        # portion of image width you want text width to be
-        img_fraction = 0.8
-
         message = await ctx.send("Opening photoshop...")
-        font = ImageFont.truetype(self.config.font, fontsize)
-        log(ctx.channel.id, "Finding optimum wrap")
-        while (
-            font.getsize_multiline(txt)[1] < 0.2 * font.getsize_multiline(txt)[0]
-            and fontsize < 80
-        ):
-            fontsize += 1
-            font = ImageFont.truetype(self.config.font, fontsize)
-            w = (len(txt) * image.width) // font.getsize(txt)[0]
-            txt = "\n".join(textwrap.wrap(txt, w))
-
-        await message.edit(content="Making text boxes...")
-        log(ctx.channel.id, "Finding optimum font size")
-        while font.getsize_multiline(txt, spacing=10)[0] < img_fraction * image.size[0]:
-            # iterate until the text size is just larger than the criteria
-            fontsize += 1
-            font = ImageFont.truetype(self.config.font, fontsize)
-
-        await message.edit(content="Putting text on the template...")
-        log(ctx.channel.id, "Fitting font")
-        while font.getsize_multiline(txt, spacing=10)[0] > img_fraction * image.size[0]:
-            fontsize -= 1
-            font = ImageFont.truetype(self.config.font, fontsize)
-
-        w, h = draw.multiline_textsize(txt, font, spacing=1)
-        left = (image.width - w) * 0.5
-        top = (image.height - h) * 0.2
-
-        await message.edit(content="Rasterizing image...")
-        draw.text(
-            (left, top),
-            txt,
-            random.choice(["yellow", "orange", "red", "skyblue", "green"]),
-            font=font,
-            spacing=50,
-            stroke_width=5,
-            stroke_fill="black",
-        )  # put the text on the image
-        image.save("bullshit.png")
+        photo = None
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.get("http://placeimg.com/640/480/nature") as r:
+                    if r.status == 200:
+                        photo = await r.read()
+        except aiohttp.ClientError as e:
+            log(ctx.channel.id, "Couldn't fetch a photo: ", e)
+        if photo is None:
+            await message.edit(content="Couldn't find a photo :(")
+            return
+        log(ctx.channel.id, "Rendering bullshit")
+        try:
+            data = await self.bot.renders.submit(
+                renderPost,
+                photo,
+                nabg.ionize(),
+                self.config.font,
+                random.choice(["yellow", "orange", "red", "skyblue", "green"]),
+                self.encoder,
+                top=0.2,
+                stroke_width=5,
+                stroke_fill="black",
+            )
+        except RenderQueueFull:
+            await message.edit(content="Photoshop is swamped. Try again in a bit!")
+            return
+        except RenderError as e:
+            log(ctx.channel.id, "Couldn't render bullshit: ", e)
+            await message.edit(content="Photoshop crashed :(")
+            return
         await message.delete()
-        await ctx.send(file=discord.File("bullshit.png"))
+        await ctx.send(
+            file=discord.File(BytesIO(data), filename="bullshit." + extensionOf(data))
+        )
 
 
 def setup(bot):
@@ -1,10 +1,17 @@
-import textwrap
+from io import BytesIO
 
 import discord
 from discord.ext import commands
-from PIL import Image, ImageDraw, ImageFont
 from utils.configManager import GarlicConfig
+from utils.imageEncoder import ImageEncoder, extensionOf
 from utils.log import log
+from utils.renderService import (
+    RenderError,
+    RenderQueueFull,
+    preloadFont,
+    preloadImage,
+)
+from utils.textPost import renderPost
 
 
 class Garlic(commands.Cog):
@@ -16,6 +23,10 @@ class Garlic(commands.Cog):
         self.bot = bot
         self.config = GarlicConfig()
         self.botConfig = bot.config
+        self.encoder = ImageEncoder.fromConfig(self.config.imageEncoding)
+        bot.renders.preload(preloadImage, self.config.template)
+        bot.renders.preload(preloadImage, self.config.darkTemplate)
+        bot.renders.preload(preloadFont, self.config.font, range(1, 121))
 
     @commands.command(
         usage="[dark | light] <text to include in post>", aliases=["garlic"]
@@ -43,50 +54,28 @@ class Garlic(commands.Cog):
         """
         Creates and sends the garlic post.
         """
-        image = Image.open(imageFile)
-        draw = ImageDraw.Draw(image)
-
-        fontsize = 1
-        txt = " ".join(words)
-        # portion of image width you want text width to be
-        img_fraction = 0.8
-
         message = await ctx.send("Opening photoshop...")
-        font = ImageFont.truetype(self.config.font, fontsize)
-        log(ctx.channel.id, "Finding optimum wrap")
-        while (
-            font.getsize_multiline(txt)[1] < 0.2 * font.getsize_multiline(txt)[0]
-            and fontsize < 80
-        ):
-            fontsize += 1
-            font = ImageFont.truetype(self.config.font, fontsize)
-            w = (len(txt) * image.width) // font.getsize(txt)[0]
-            txt = "\n".join(textwrap.wrap(txt, w))
-
-        await message.edit(content="Making text boxes...")
-        log(ctx.channel.id, "Finding optimum font size")
-        while font.getsize_multiline(txt, spacing=10)[0] < img_fraction * image.size[0]:
-            # iterate until the text size is just larger than the criteria
-            fontsize += 1
-            font = ImageFont.truetype(self.config.font, fontsize)
-
-        await message.edit(content="Putting text on the template...")
-        log(ctx.channel.id, "Fitting font")
-        while font.getsize_multiline(txt, spacing=10)[0] > img_fraction * image.size[0]:
-            fontsize -= 1
-            font = ImageFont.truetype(self.config.font, fontsize)
-
-        w, h = draw.multiline_textsize(txt, font, spacing=1)
-        left = (image.width - w) * 0.5
-        top = (image.height - h) * 0.4
-
-        await message.edit(content="Rasterizing image...")
-        draw.text(
-            (left, top), txt, colour, font=font, spacing=50
-        )  # put the text on the image
-        image.save("diygarlic.png")
+        log(ctx.channel.id, "Rendering garlic post")
+        try:
+            data = await self.bot.renders.submit(
+                renderPost,
+                imageFile,
+                " ".join(words),
+                self.config.font,
+                colour,
+                self.encoder,
+            )
+        except RenderQueueFull:
+            await message.edit(content="Photoshop is swamped. Try again in a bit!")
+            return
+        except RenderError as e:
+            log(ctx.channel.id, "Couldn't render garlic post: ", e)
+            await message.edit(content="Photoshop crashed :(")
+            return
         await message.delete()
-        await ctx.send(file=discord.File("diygarlic.png"))
+        await ctx.send(
+            file=discord.File(BytesIO(data), filename="diygarlic." + extensionOf(data))
+        )
 
     @diygarlic.error
     async def diygarlicError(self, ctx, error):
@@ -9,11 +9,65 @@ from io import BytesIO
 
 import aiohttp
 import discord
-import numpy as np
 from discord.ext import commands
-from PIL import Image
+from utils.attachmentRegistry import AttachmentRegistry
 from utils.configManager import PokemonConfig
+from utils.imageEncoder import ImageEncoder, extensionOf
 from utils.log import log
+from utils.lookahead import Lookahead
+from utils.pokedex import Pokedex, parseNames, parsePokemon, parseSpecies
+from utils.pokemonNames import NameIndex
+from utils.silhouette import SilhouetteRenderer, artworkKey, silhouetteKey
+from utils.quizEngine import ChannelGame, QuizEngine, avatarUrl
+from utils.renderService import RenderError, shared
+from utils.reveal import RevealRenderer, revealKey, stageKey
+from utils.spriteCache import SpriteCache
+
+GAME_MODES = ("silhouette", "reveal")
+
+
+class GameMode(commands.Converter):
+    """
+    Converts the name of a game mode.
+    """
+
+    async def convert(self, ctx, argument):
+        if argument.lower() not in GAME_MODES:
+            raise commands.BadArgument(f"{argument} isn't a game mode")
+        return argument.lower()
+
+
+class PokemonGame(ChannelGame):
+    """
+    The state of a "Who's that Pokémon?" game in one channel.
+    """
+
+    __slots__ = (
+        "mode",
+        "pokeList",
+        "pokemonId",
+        "types",
+        "descriptions",
+        "stages",
+        "stage",
+        "questionKey",
+    )
+
+    def __init__(self, channel):
+        super().__init__(channel)
+        # One of GAME_MODES.
+        self.mode = "silhouette"
+        # Every Pokemon ID picked for the game so far, so none is picked twice.
+        self.pokeList = []
+        self.pokemonId = None
+        self.types = []
+        self.descriptions = []
+        # [key, uploaded URL, PNG bytes] of each image the question shows in
+        # turn, and the one it shows now. Silhouettes have a single stage.
+        self.stages = []
+        self.stage = 0
+        # Sprite cache key of the question image, while it is being uploaded.
+        self.questionKey = None
 
 
 class Pokemon(commands.Cog):
@@ -23,9 +77,38 @@ class Pokemon(commands.Cog):
 
     def __init__(self, bot):
         self.bot = bot
-        self.channelStates = {}
         self.config = PokemonConfig()
+        self.quiz = QuizEngine(self, self.config, "pokemon")
         self.botConfig = bot.config
+        self.session = None
+        # Built by tools.importPokedex. Without it, everything comes from PokeAPI.
+        self.pokedex = None
+        if os.path.isfile(self.config.pokedex):
+            self.pokedex = Pokedex(self.config.pokedex)
+        # The names each Pokemon can be answered with. Pokemon that aren't in
+        # the Pokédex are added as they are fetched.
+        self.names = NameIndex(self.config.answerLanguages)
+        if self.pokedex is not None:
+            for id, name, names in self.pokedex.allNames():
+                self.names.add(id, name, names)
+        encoder = ImageEncoder.fromConfig(self.config.imageEncoding)
+        self.silhouettes = SilhouetteRenderer(
+            self.config.backgroundImage, encoder=encoder
+        )
+        self.reveals = RevealRenderer(
+            self.config.revealSize, self.config.revealBlockSizes, encoder=encoder
+        )
+        bot.renders.preload(shared, *self.silhouettes.sharedArgs)
+        # Artwork and question images, kept across restarts.
+        self.sprites = SpriteCache(
+            self.config.pokemonSpriteDirectory, self.config.spriteCacheSize
+        )
+        # URLs of question images already uploaded to Discord, in any channel.
+        self.attachments = AttachmentRegistry(
+            bot.db_client[self.botConfig.database][self.config.attachmentCollection],
+            ttl=self.config.attachmentTTL,
+            checkInterval=self.config.attachmentCheckInterval,
+        )
 
     @commands.group(
         name="pokemon",
@@ -36,26 +119,32 @@ class Pokemon(commands.Cog):
     async def pokemon(
         self,
         ctx,
+        mode: typing.Optional[GameMode],
         numberOfQuestions: typing.Optional[int],
         region: typing.Optional[str] = "all",
     ):
         """
         Play "Who's that Pokémon?". If no subcommands are provided, it defaults to start.
         """
-        await self.start(ctx, numberOfQuestions, region)
+        await self.start(ctx, mode, numberOfQuestions, region)
 
-    @pokemon.command(name="start")
+    @pokemon.command(
+        name="start", usage="[silhouette | reveal] [number of questions] [region]"
+    )
     async def start(
         self,
         ctx,
+        mode: typing.Optional[GameMode],
         numberOfQuestions: typing.Optional[int],
         region: typing.Optional[str] = "all",
     ):
         """
-        Start a game of "Who's that Pokémon?".
+        Start a game of "Who's that Pokémon?". In reveal mode, the Pokémon starts out pixelated and each hint sharpens it.
         """
-        if str(ctx.channel.id) not in self.channelStates:
-            self.channelStates[str(ctx.channel.id)] = {}
+        if self.quiz.get(ctx.channel) is None:
+            game = self.quiz.newGame(ctx.channel)
+            if mode is not None:
+                game.mode = mode
             embed = discord.Embed(
                 title=ctx.message.author.name
                 + ' started a game of "Who\'s that Pokémon?"',
@@ -64,7 +153,7 @@ class Pokemon(commands.Cog):
             )
             await ctx.send(embed=embed)
             try:
-                await self.playPokemon(ctx, numberOfQuestions, region)
+                await self.playPokemon(ctx, game, numberOfQuestions, region)
             except Exception as e:
                 log(ctx.channel.id, "Oopsie, exception: ", e)
                 traceback.print_exc()
@@ -83,9 +172,10 @@ class Pokemon(commands.Cog):
         """
         Stops an ongoing game of "Who's that Pokémon?".
         """
-        if await self.checkGameInProgress(ctx.channel):
+        game = await self.checkGameInProgress(ctx.channel)
+        if game is not None:
             try:
-                self.cleanTasks(str(ctx.channel.id))
+                self.quiz.cancelTasks(game)
             except Exception as e:
                 log(ctx.channel.id, "Oopsie, exception: ", e)
                 traceback.print_exc()
@@ -98,41 +188,31 @@ class Pokemon(commands.Cog):
                     colour=discord.Colour.red(),
                 )
                 await ctx.send(embed=embed)
-                await self.publishScores(ctx.channel)
-                self.stopGame(ctx.channel)
+                await self.quiz.publishScores(game)
+                self.quiz.stopGame(game)
 
     @pokemon.command(name="skip", aliases=["giveup", "sk", "lite"])
     async def skip(self, ctx):
         """
         Skips the current question.
         """
-        if not await self.checkGameInProgress(ctx.channel):
+        game = await self.checkGameInProgress(ctx.channel)
+        if game is None:
             return
-        elif (
-            "answer" not in self.channelStates[str(ctx.channel.id)]
-            or self.channelStates[str(ctx.channel.id)]["answer"] is None
-        ):
-            return
-        else:
-            try:
-                self.cleanTasks(str(ctx.channel.id))
-            except Exception as e:
-                log(ctx.channel.id, "Oopsie, exception: ", e)
-                traceback.print_exc()
-            else:
-                answerTask = asyncio.create_task(
-                    self.revealAnswer(
-                        ctx.channel, waitTime=0, reason="Question skipped"
-                    )
-                )
-                answerTask.set_name("pokemon-" + str(ctx.channel.id))
+        try:
+            self.quiz.skip(game)
+        except Exception as e:
+            log(ctx.channel.id, "Oopsie, exception: ", e)
+            traceback.print_exc()
 
     @pokemon.command(name="scores", alias=["points", "sc", "p"])
     async def scores(self, ctx):
         """
         Displays the scoreboard.
         """
-        await self.publishScores(ctx.channel, False)
+        game = await self.checkGameInProgress(ctx.channel)
+        if game is not None:
+            await self.quiz.publishScores(game, False)
 
     @commands.Cog.listener()
     async def on_message(self, message):
@@ -143,90 +223,11 @@ class Pokemon(commands.Cog):
         if message.author == self.bot.user:
             return
 
-        if str(message.channel.id) not in self.channelStates:
+        game = self.quiz.games.get(message.channel.id)
+        if game is None:
             return
 
-        if not self.channelStates[str(message.channel.id)]:
-            return
-
-        if (
-            "answer" not in self.channelStates[str(message.channel.id)]
-            or self.channelStates[str(message.channel.id)]["answer"] is None
-        ):
-            return
-
-        if (
-            message.content.lower()
-            == self.channelStates[str(message.channel.id)]["answer"].lower()
-        ):
-            self.channelStates[str(message.channel.id)]["answer"] = None
-            await message.add_reaction("\N{THUMBS UP SIGN}")
-            if message.author in self.channelStates[str(message.channel.id)]["scores"]:
-                self.channelStates[str(message.channel.id)]["scores"][
-                    message.author
-                ] = (
-                    self.channelStates[str(message.channel.id)]["scores"][
-                        message.author
-                    ]
-                    + 1
-                )
-            else:
-                self.channelStates[str(message.channel.id)]["scores"][
-                    message.author
-                ] = 1
-            embed = discord.Embed(
-                title="It's " + message.content.capitalize() + "!",
-                colour=discord.Colour.green(),
-            )
-            embed.set_author(
-                name=message.author.name + " got it right!",
-                icon_url="https://cdn.discordapp.com/avatars/"
-                + str(message.author.id)
-                + "/"
-                + str(message.author.avatar)
-                + ".png",
-            )
-
-            embed.set_image(
-                url=self.config.pokemonSpriteAPI.replace(
-                    "{id}",
-                    str(self.channelStates[str(message.channel.id)]["pokemonId"]),
-                )
-            )
-            types = self.channelStates[str(message.channel.id)]["types"]
-            embed.add_field(
-                name="Type",
-                value=self.config.getEmoji(types[0]) + " " + types[0].capitalize(),
-                inline=True,
-            )
-            if len(types) == 2:
-                embed.add_field(
-                    name="\u200b",
-                    value=self.config.getEmoji(types[1]) + " " + types[1].capitalize(),
-                    inline=True,
-                )
-            embed.add_field(
-                name="Pokédex",
-                value=self.channelStates[str(message.channel.id)]["descriptions"][0],
-                inline=False,
-            )
-            await message.channel.send(embed=embed)
-            try:
-                self.cleanTasks(str(message.channel.id))
-            except Exception as e:
-                log(message.channel.id, "Oopsie, exception: ", e)
-                traceback.print_exc()
-            try:
-                nextQuestionTask = asyncio.create_task(
-                    self.askQuestion(
-                        message.channel, waitTime=self.config.timeToNextQuestion
-                    )
-                )
-                nextQuestionTask.set_name("pokemon-" + str(message.channel.id))
-            except Exception as e:
-                log(message.channel.id, "Oopsie, exception: ", e)
-                traceback.print_exc()
-            return
+        await self.quiz.checkAnswer(game, message)
 
     async def checkGameInProgress(self, channel, sendEmbed=True):
         """
@@ -238,9 +239,10 @@ class Pokemon(commands.Cog):
         sendEmbed (boolean): Whether or not to send an embed if there are no games in progress
 
         Returns:
-        boolean: True if there is a game running in the channel. False otherwise.
+        PokemonGame: The game running in the channel, or None if there isn't one.
         """
-        if str(channel.id) not in self.channelStates:
+        game = self.quiz.get(channel)
+        if game is None:
             if sendEmbed:
                 file = discord.File("resources/common/oak.png", filename="oak.png")
                 embed = discord.Embed(
@@ -252,63 +254,140 @@ class Pokemon(commands.Cog):
                 )
                 embed.set_thumbnail(url="attachment://oak.png")
                 await channel.send(file=file, embed=embed)
-            return False
-        else:
-            return True
+        return game
 
-    async def playPokemon(self, ctx, numberOfQuestions, region):
+    async def playPokemon(self, ctx, game, numberOfQuestions, region):
         """
         Function to set up and start the game.
 
         Parameters:
         ctx (discord.ext.commands.Context): The context of the recieved command
+        game (PokemonGame): The game to set up
         numberOfQuestions (int): The number of questions in the game
         """
-        await self.getPokemonList(ctx, numberOfQuestions, region)
-        self.channelStates[str(ctx.channel.id)]["scores"] = {}
-        askQuestionTask = asyncio.create_task(
-            self.askQuestion(ctx.channel, self.config.timeToFirstQuestion)
-        )
-        askQuestionTask.set_name("pokemon-" + str(ctx.channel.id))
-        log(ctx.channel.id, "Pokemon game started.")
+        await self.getPokemonList(ctx, game, numberOfQuestions, region)
+        self.quiz.play(game, self.config.timeToFirstQuestion)
 
-    async def fetchSprite(self, id: int, session: object, ctx: commands.Context):
+    async def fetchSprite(self, id: int, session: object, game: PokemonGame):
         """
-        Sends a GET request for a pokemon's sprite and starts a task to create a
-        question image.
+        Gets the question image of a Pokemon from the sprite cache, downloading
+        its sprite and drawing the image if they aren't cached. Games asking
+        for the same Pokemon at once share the download and the drawing.
 
         Parameters:
         id (int): The Pokemon's ID
         session (aiohttp.ClientSession): Session to make the GET request from
-        ctx (discord.ext.commands.Context): The context of the recieved command
+        game (PokemonGame): The game the data is for
+
+        Returns:
+        string: The path of the question image, or False if there is no sprite.
         """
         url = self.config.pokemonSpriteAPI.replace("{id}", str(id))
-        async with session.get(url) as response:
-            if response.status == 200:
+
+        async def draw(fileName):
+            # The artwork is only needed when the question image isn't cached.
+            artwork = await self.fetchArtwork(url, session)
+            if artwork is None:
+                return False
+            try:
+                await self.makeQuestion(artwork, fileName)
+            except RenderError as e:
+                log(game.channel.id, f"Couldn't draw {id}: {e}")
+                return False
+
+        question = await self.sprites.getOrCreate(
+            silhouetteKey(url, self.silhouettes), draw
+        )
+        if question is None:
+            return False
+        return question
+
+    async def fetchArtwork(self, url, session):
+        """
+        Gets a sprite from the sprite cache, downloading it if it isn't cached.
+
+        Parameters:
+        url (string): The sprite's URL
+        session (aiohttp.ClientSession): Session to make the GET request from
+
+        Returns:
+        string: The path of the sprite, or None if there is no sprite.
+        """
+
+        async def download(fileName):
+            async with session.get(url) as response:
+                if response.status != 200:
+                    return False
                 data = await response.read()
-                task = asyncio.create_task(self.makeQuestion(BytesIO(data), str(id)))
-                task.set_name(f"pokemon-sprite-{id}-{ctx.channel.id}")
-                return task
-        return False
+            with open(fileName, "wb") as fp:
+                fp.write(data)
+
+        return await self.sprites.getOrCreate(artworkKey(url), download)
+
+    async def fetchReveal(self, id: int, session: object, game: PokemonGame):
+        """
+        Gets the stages of a reveal question. All the stages are drawn at once
+        into a strip kept in the sprite cache, and cut out of it when needed.
+        Stages uploaded before are not cut out at all.
+
+        Parameters:
+        id (int): The Pokemon's ID
+        session (aiohttp.ClientSession): Session to make the GET request from
+        game (PokemonGame): The game the data is for
 
-    async def fetchData(self, id: int, session: object, ctx):
+        Returns:
+        dict: The stages, or False if there is no sprite.
+        """
+        url = self.config.pokemonSpriteAPI.replace("{id}", str(id))
+        key = revealKey(url, self.reveals)
+        stages = []
+        for stage in range(self.reveals.stageCount):
+            uploaded = await self.attachments.get(stageKey(key, stage), session)
+            stages.append([stageKey(key, stage), uploaded, None])
+        missing = [stage for stage in range(len(stages)) if stages[stage][1] is None]
+        if not missing:
+            return {"stages": stages}
+
+        async def draw(fileName):
+            artwork = await self.fetchArtwork(url, session)
+            if artwork is None:
+                return False
+            try:
+                await self.bot.renders.submit(
+                    self.reveals.renderToFile, artwork, fileName, wait=True
+                )
+            except RenderError as e:
+                log(game.channel.id, f"Couldn't draw {id}: {e}")
+                return False
+
+        strip = await self.sprites.getOrCreate(key, draw)
+        if strip is None:
+            return False
+        try:
+            images = await self.bot.renders.submit(
+                self.reveals.stages, strip, missing, wait=True
+            )
+        except RenderError as e:
+            log(game.channel.id, f"Couldn't cut the stages of {id}: {e}")
+            return False
+        for stage, image in images.items():
+            stages[stage][2] = image
+        return {"stages": stages}
+
+    async def fetchData(self, id: int, session: object, game):
         """
         Sends a GET request for a pokemon's data.
 
         Parameters:
         id (int): The Pokemon's ID
         session (aiohttp.ClientSession): Session to make the GET request from
-        ctx (discord.ext.commands.Context): The context of the recieved command
+        game (PokemonGame): The game the data is for
         """
         url = self.config.pokemonDataAPI.replace("{id}", str(id))
         async with session.get(url) as r:
             if r.status == 200:
                 data = await r.json()
-                name = data["species"]["name"].replace("-", " ").capitalize()
-                typeList = {}
-                for i in data["types"]:
-                    typeList[str(i["slot"])] = i["type"]["name"]
-                typeList = [typeList[key] for key in sorted(typeList.keys())]
+                name, typeList = parsePokemon(data)
                 d = {}
                 d["id"] = id
                 d["name"] = name
@@ -316,30 +395,28 @@ class Pokemon(commands.Cog):
                 return d
         return False
 
-    async def fetchSpeciesData(self, id: int, session: object, ctx):
+    async def fetchSpeciesData(self, id: int, session: object, game):
         """
         Sends a GET request for a pokemon species' data.
 
         Parameters:
         id (int): The Pokemon species' ID
         session (aiohttp.ClientSession): Session to make the GET request from
-        ctx (discord.ext.commands.Context): The context of the recieved command
+        game (PokemonGame): The game the data is for
         """
         url = self.config.pokemonSpeciesDataAPI.replace("{id}", str(id))
         async with session.get(url) as speciesData:
             if speciesData.status == 200:
                 speciesData = await speciesData.json()
-                descriptionList = []
-                for i in speciesData["flavor_text_entries"]:
-                    if i["language"]["name"] == "en":
-                        descriptionList.append(i["flavor_text"].replace("\n", " "))
+                descriptionList = parseSpecies(speciesData)
                 d = {}
                 d["id"] = id
                 d["descriptionList"] = descriptionList
+                d["names"] = parseNames(speciesData)
                 return d
         return False
 
-    async def fetch(self, id: int, session: object, ctx, start, end):
+    async def fetch(self, id: int, session: object, game, candidates):
         """
         Fetch all the data for a Pokemon. If the required data is not available,
         pick a new Pokemon and get data for that.
@@ -347,43 +424,64 @@ class Pokemon(commands.Cog):
         Parameters:
         id (int): The Pokemon species' ID
         session (aiohttp.ClientSession): Session to make the GET request from
-        ctx (discord.ext.commands.Context): The context of the recieved command
-        start (int): The starting ID in the available list of Pokemon
-        end (int): The starting ID in the available list of Pokemon
+        game (PokemonGame): The game the data is for
+        candidates (sequence): The IDs to pick a new Pokemon from
+
+        Returns:
+        dict: The Pokemon's data, once its question image is ready.
         """
         tasks = []
-        task = asyncio.ensure_future(self.fetchSprite(id, session, ctx))
-        tasks.append(task)
-        task = asyncio.ensure_future(self.fetchData(id, session, ctx))
-        tasks.append(task)
-        task = asyncio.ensure_future(self.fetchSpeciesData(id, session, ctx))
-        tasks.append(task)
+        question = {}
+        if game.mode == "reveal":
+            tasks.append(asyncio.ensure_future(self.fetchReveal(id, session, game)))
+        else:
+            spriteUrl = self.config.pokemonSpriteAPI.replace("{id}", str(id))
+            key = silhouetteKey(spriteUrl, self.silhouettes)
+            # Question images uploaded before don't need to be drawn or read.
+            questionUrl = await self.attachments.get(key, session)
+            question["stages"] = [[key, questionUrl, None]]
+            if questionUrl is None:
+                task = asyncio.ensure_future(self.fetchSprite(id, session, game))
+                tasks.append(task)
+        entry = self.pokedex.get(id) if self.pokedex is not None else None
+        if entry is None:
+            # Not in the local Pokédex, so ask PokeAPI.
+            task = asyncio.ensure_future(self.fetchData(id, session, game))
+            tasks.append(task)
+            task = asyncio.ensure_future(self.fetchSpeciesData(id, session, game))
+            tasks.append(task)
         results = await asyncio.gather(*tasks)
+        if entry is not None:
+            results.append(entry)
         if False in results:
             # Some data is not available. Get a new pokemon and try again.
-            if results[0] is not False:
-                results[0].cancel()
             oldId = id
-            while id in self.channelStates[str(ctx.channel.id)]["pokeList"]:
-                id = random.randrange(start, end + 1)
-            self.channelStates[str(ctx.channel.id)]["pokeList"].append(id)
-            log(ctx.channel.id, f"Replacing {oldId} with {id}")
-            task = asyncio.create_task(self.fetch(id, session, ctx, start, end))
-            await task
-            return
+            while id in game.pokeList:
+                id = random.choice(candidates)
+            game.pokeList.append(id)
+            log(game.channel.id, f"Replacing {oldId} with {id}")
+            return await self.fetch(id, session, game, candidates)
         else:
-            result = {}
-            result.update(results[1])
-            result.update(results[2])
-            self.channelStates[str(ctx.channel.id)]["pokemonIdList"].append(result)
-            return
+            result = question
+            for data in results:
+                if isinstance(data, str):
+                    # Kept in memory until the question is asked, so it is
+                    # read once.
+                    with open(data, "rb") as fp:
+                        result["stages"][0][2] = fp.read()
+                else:
+                    result.update(data)
+            if id not in self.names:
+                self.names.add(id, result["name"], result["names"])
+            return result
 
-    async def getPokemonList(self, ctx, numberOfQuestions, region):
+    async def getPokemonList(self, ctx, game, numberOfQuestions, region):
         """
         Get the words required for the game from the corpus.
 
         Parameters:
         ctx (discord.ext.commands.Context): The context of the recieved command
+        game (PokemonGame): The game to get the Pokemon for
         numberOfQuestions (int): The number of questions in the game
         """
         if numberOfQuestions is None:
@@ -405,376 +503,213 @@ class Pokemon(commands.Cog):
             await ctx.send(embed=embed)
             region = "all"
         start, end = self.config.getRange(region.lower())
-        self.channelStates[str(ctx.channel.id)]["pokeList"] = random.sample(
-            range(start, end + 1), int(numberOfQuestions)
-        )
-        tasks = []
-        self.channelStates[str(ctx.channel.id)]["pokemonIdList"] = []
-        async with aiohttp.ClientSession(loop=self.bot.loop) as session:
-            for id in list(self.channelStates[str(ctx.channel.id)]["pokeList"]):
-                task = asyncio.ensure_future(self.fetch(id, session, ctx, start, end))
-                tasks.append(task)
-            _ = await asyncio.gather(*tasks)
-        log(
-            ctx.channel.id,
-            "Pokemon List: " + str(self.channelStates[str(ctx.channel.id)]["pokeList"]),
+        candidates = range(start, end + 1)
+        if self.pokedex is not None:
+            # Only pick Pokemon the local Pokédex has everything for.
+            regionIds = self.pokedex.regionIds(region.lower())
+            if regionIds == () and region.lower() != "all":
+                embed = discord.Embed(
+                    title="There are no Pokémon from that region yet. Defaulting to all.",
+                    colour=discord.Colour.blue(),
+                )
+                await ctx.send(embed=embed)
+                regionIds = self.pokedex.regionIds("all")
+            if regionIds:
+                candidates = regionIds
+        game.pokeList = random.sample(
+            candidates, min(int(numberOfQuestions), len(candidates))
         )
-        del self.channelStates[str(ctx.channel.id)]["pokeList"]
-
-    async def makeQuestion(self, data, id):
-        # Async wrapper around createQuestionImage
-        loop = asyncio.get_event_loop()
-        await loop.run_in_executor(None, self.createQuestionImage, data, id)
-
-    def createQuestionImage(self, image, id):
-        if not os.path.exists(self.config.pokemonSpriteDirectory):
-            os.makedirs(self.config.pokemonSpriteDirectory)
-        fileName = f"{self.config.pokemonSpriteDirectory}/{id}.png"
-        if os.path.isfile(fileName):
-            return fileName
-        sprite = Image.open(image)
-        alpha = sprite.split()[-1]
-        spriteImage = Image.new("RGBA", sprite.size, (54, 57, 63, 0))
-        bgImage = Image.open(self.config.backgroundImage, "r")
-        spriteImage.putalpha(alpha)
-
-        spriteImage.load()
-        imageData = np.asarray(spriteImage)
-        imageDataBW = imageData.max(axis=2)
-        nonEmptyColumns = np.where(imageDataBW.max(axis=0) > 0)[0]
-        nonEmptyRows = np.where(imageDataBW.max(axis=1) > 0)[0]
-        cropBox = (
-            min(nonEmptyRows),
-            max(nonEmptyRows),
-            min(nonEmptyColumns),
-            max(nonEmptyColumns),
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(loop=self.bot.loop)
+        session = self.session
+        # Only the next few Pokemon are fetched at a time, so a long game
+        # doesn't hold every sprite and description in memory from the start.
+        game.questions = Lookahead(
+            lambda id: self.fetch(id, session, game, candidates),
+            list(game.pokeList),
+            size=self.config.questionLookahead,
+            name="pokemon-prep-" + str(ctx.channel.id),
         )
+        game.questions.start()
+        log(ctx.channel.id, "Pokemon List: " + str(game.pokeList))
 
-        imageDataNew = imageData[
-            cropBox[0] : cropBox[1] + 1, cropBox[2] : cropBox[3] + 1, :
-        ]
-        newImage = Image.fromarray(imageDataNew)
+    async def makeQuestion(self, sprite, fileName):
+        # Questions are prepared ahead, so they wait for room in the queue.
+        await self.bot.renders.submit(
+            self.silhouettes.renderToFile, sprite, fileName, wait=True
+        )
 
-        mywidth = 750
-        wpercent = mywidth / float(newImage.size[0])
-        hsize = int((float(newImage.size[1]) * float(wpercent)))
-        newImage = newImage.resize((mywidth, hsize), Image.ANTIALIAS)
-        bgImage.paste(newImage, (225, 220), newImage)
-        bgImage.save(fileName)
-        return fileName
+    def newGame(self, channel):
+        return PokemonGame(channel)
 
-    async def askQuestion(self, channel, waitTime=None):
+    def setQuestion(self, game, pokemonData):
         """
-        Ask the next question.
+        Makes a Pokemon the current question.
 
         Parameters:
-        channel (discord.TextChannel): Channel to send the message to.
-        waitTime (int): Seconds to wait before asking the question.
-        """
-        if waitTime is None:
-            waitTime = self.config.timeToNextQuestion
-        try:
-            if not self.channelStates[str(channel.id)]["pokemonIdList"]:
-                await self.publishScores(channel)
-                self.stopGame(channel)
-                return
-
-            await asyncio.sleep(waitTime)
-            pokemonData = self.channelStates[str(channel.id)]["pokemonIdList"][0]
-            self.channelStates[str(channel.id)]["pokemonIdList"] = self.channelStates[
-                str(channel.id)
-            ]["pokemonIdList"][1:]
-            self.channelStates[str(channel.id)]["pokemonId"] = pokemonData["id"]
-            self.channelStates[str(channel.id)]["answer"] = pokemonData["name"]
-            self.channelStates[str(channel.id)]["types"] = pokemonData["typeList"]
-            self.channelStates[str(channel.id)]["descriptions"] = pokemonData[
-                "descriptionList"
-            ]
-
-            print("Pokemon: " + pokemonData["name"])
-            id = pokemonData["id"]
-            for task in asyncio.all_tasks():
-                if task.get_name() == f"pokemon-sprite-{id}-{channel.id}":
-                    await task
-                    break
-
-            fileName = f"{self.config.pokemonSpriteDirectory}/{id}.png"
-            self.channelStates[str(channel.id)]["questionFile"] = fileName
-            spriteFile = discord.File(fileName, filename="sprite.png")
-
-            self.channelStates[str(channel.id)]["question"] = discord.Embed(
-                title="Who's that Pokémon?", colour=discord.Colour.blue()
-            )
-            if "questionNumber" not in self.channelStates[str(channel.id)]:
-                self.channelStates[str(channel.id)]["questionNumber"] = 1
-            else:
-                self.channelStates[str(channel.id)]["questionNumber"] += 1
-            self.channelStates[str(channel.id)]["question"].set_author(
-                name="Question "
-                + str(self.channelStates[str(channel.id)]["questionNumber"])
-            )
-            self.channelStates[str(channel.id)]["question"].set_image(
-                url=f"attachment://sprite.png"
-            )
-            await channel.send(
-                file=spriteFile, embed=self.channelStates[str(channel.id)]["question"]
-            )
-            try:
-                answerTask = asyncio.create_task(self.revealAnswer(channel))
-                answerTask.set_name("pokemon-" + str(channel.id))
-                hintTask = asyncio.create_task(self.giveHint(channel))
-                hintTask.set_name("pokemon-" + str(channel.id))
-            except Exception as e:
-                log(channel.id, "Oopsie, exception: ", e)
-                traceback.print_exc()
-        except asyncio.CancelledError:
-            log(channel.id, "askQuestion task was cancelled")
-        except KeyError:
-            log(channel.id, "askQuestion task was interrupted by stop")
-            traceback.print_exc()
-
-    async def revealAnswer(self, channel, waitTime=None, reason="Time's up!"):
-        """
-        Reveal the answer to the current question.
-
-        Parameters:
-        channel (discord.TextChannel): Channel to send the message to.
-        waitTime (int): Seconds to wait before asking the question.
-        reason (string): Reason why the answer is being revealed.
-        """
-        if waitTime is None:
-            waitTime = self.config.timePerQuestion
-        try:
-            await asyncio.sleep(waitTime)
-            answer = self.channelStates[str(channel.id)]["answer"]
-            self.channelStates[str(channel.id)]["answer"] = None
-            self.cleanTasks(str(channel.id))
-            embed = discord.Embed(
-                title="It's " + answer + "!", colour=discord.Colour.red()
-            )
-            types = self.channelStates[str(channel.id)]["types"]
-            embed.add_field(
-                name="Type",
-                value=self.config.getEmoji(types[0]) + " " + types[0].capitalize(),
-                inline=True,
-            )
-            if len(types) == 2:
-                embed.add_field(
-                    name="\u200b",
-                    value=self.config.getEmoji(types[1]) + " " + types[1].capitalize(),
-                    inline=True,
-                )
+        game (PokemonGame): The game to ask the question in
+        pokemonData (dict): The Pokemon's data from fetch
 
-            embed.add_field(
-                name="Pokédex",
-                value=self.channelStates[str(channel.id)]["descriptions"][0],
-                inline=False,
-            )
-            embed.set_author(name=reason)
-            embed.set_image(
-                url=self.config.pokemonSpriteAPI.replace(
-                    "{id}", str(self.channelStates[str(channel.id)]["pokemonId"])
-                )
-            )
-            await channel.send(embed=embed)
-            try:
-                nextQuestionTask = asyncio.create_task(
-                    self.askQuestion(channel, waitTime=self.config.timeToNextQuestion)
-                )
-                nextQuestionTask.set_name("pokemon-" + str(channel.id))
-            except Exception as e:
-                log(channel.id, "Oopsie, exception", e)
-                traceback.print_exc()
-        except asyncio.CancelledError:
-            log(channel.id, "revealAnswer task was cancelled")
+        Returns:
+        dict: The message to send.
+        """
+        game.pokemonId = pokemonData["id"]
+        # The English name is spelled properly, e.g. "Mr. Mime" for "Mr mime".
+        game.answer = pokemonData["names"].get("en", pokemonData["name"])
+        game.types = pokemonData["typeList"]
+        game.descriptions = pokemonData["descriptionList"]
+        print("Pokemon: " + pokemonData["name"])
+        game.question = discord.Embed(
+            title="Who's that Pokémon?", colour=discord.Colour.blue()
+        )
+        game.stages = pokemonData["stages"]
+        game.stage = 0
+        return self.showStage(game) or {"embed": game.question}
 
-    async def giveHint(self, channel, waitTime=None):
+    def showStage(self, game):
         """
-        Give the next hint for the question.
+        Puts the image of the current stage in the question.
 
-        Parameters:
-        channel (discord.TextChannel): Channel to send the message to.
-        waitTime (int): Seconds to wait before asking the question.
-        """
-        # pass
-        if waitTime is None:
-            waitTime = self.config.timeToFirstHint
-        try:
-            await asyncio.sleep(waitTime)
-            if not await self.checkGameInProgress(channel):
-                return
-
-            elif (
-                "answer" not in self.channelStates[str(channel.id)]
-                or self.channelStates[str(channel.id)]["answer"] is None
-            ):
-                return
-
-            elif self.channelStates[str(channel.id)]["question"].fields == []:
-                types = self.channelStates[str(channel.id)]["types"]
-                self.channelStates[str(channel.id)]["question"].add_field(
-                    name="Type",
-                    value=self.config.getEmoji(types[0]) + " " + types[0].capitalize(),
-                    inline=True,
-                )
-                if len(types) == 2:
-                    self.channelStates[str(channel.id)]["question"].add_field(
-                        name="\u200b",
-                        value=self.config.getEmoji(types[1])
-                        + " "
-                        + types[1].capitalize(),
-                        inline=True,
-                    )
-                spriteFile = discord.File(
-                    self.channelStates[str(channel.id)]["questionFile"],
-                    filename="sprite.png",
-                )
-                await channel.send(
-                    file=spriteFile,
-                    embed=self.channelStates[str(channel.id)]["question"],
-                )
-                hintTask = asyncio.create_task(
-                    self.giveHint(channel, self.config.timeToSecondHint)
-                )
-                hintTask.set_name("pokemon-" + str(channel.id))
-            else:
-                n = len(self.channelStates[str(channel.id)]["question"].fields)
-                if n > 1:
-                    return
-                insensitiveName = re.compile(
-                    re.escape(self.channelStates[str(channel.id)]["answer"]),
-                    re.IGNORECASE,
-                )
-                self.channelStates[str(channel.id)]["question"].add_field(
-                    name="Pokédex",
-                    value=insensitiveName.sub(
-                        ":black_large_square::black_large_square::black_large_square:",
-                        self.channelStates[str(channel.id)]["descriptions"][0],
-                    ),
-                    inline=False,
-                )
-                spriteFile = discord.File(
-                    self.channelStates[str(channel.id)]["questionFile"],
-                    filename="sprite.png",
-                )
-                await channel.send(
-                    file=spriteFile,
-                    embed=self.channelStates[str(channel.id)]["question"],
-                )
+        Returns:
+        dict: The message to send if the image has to be uploaded, or None if
+        it has been uploaded before.
+        """
+        key, url, image = game.stages[game.stage]
+        if url is not None:
+            # Uploaded before, maybe in another channel.
+            game.questionKey = None
+            game.question.set_image(url=url)
+            return None
+        game.questionKey = key
+        fileName = "sprite." + extensionOf(image)
+        game.question.set_image(url="attachment://" + fileName)
+        return {
+            "file": discord.File(BytesIO(image), filename=fileName),
+            "embed": game.question,
+        }
+
+    def questionSent(self, game):
+        if game.questionKey is None:
+            return
+        # QuizEngine points the question at the uploaded copy of the image.
+        url = game.question.image.url
+        if isinstance(url, str) and not url.startswith("attachment://"):
+            self.attachments.put(game.questionKey, url)
 
-        except asyncio.CancelledError:
-            log(channel.id, "giveHint task was cancelled")
+    def isCorrect(self, game, text):
+        return self.names.matches(game.pokemonId, text)
 
-    async def publishScores(self, channel, gameEnded=True):
+    def addTypes(self, embed, types):
         """
-        Publish the scores.
-
-        Parameters:
-        channel (discord.TextChannel): Channel to send the message to.
+        Adds a field for each of a Pokemon's types to an embed.
         """
-        if "questionNumber" in self.channelStates[str(channel.id)]:
-            scores = sorted(
-                self.channelStates[str(channel.id)]["scores"].items(),
-                key=lambda x: x[1],
-                reverse=True,
+        embed.add_field(
+            name="Type",
+            value=self.config.getEmoji(types[0]) + " " + types[0].capitalize(),
+            inline=True,
+        )
+        if len(types) == 2:
+            embed.add_field(
+                name="\u200b",
+                value=self.config.getEmoji(types[1]) + " " + types[1].capitalize(),
+                inline=True,
             )
-            nameString = ""
-            scoreString = ""
-            avatar = ""
-            maxScore = -1
-            if gameEnded:
-                winnerString = "Ruh-roh! No one got any points."
-            else:
-                winnerString = "No points so far."
-            showScores = False
-            noOfQuestions = self.channelStates[str(channel.id)]["questionNumber"]
-            if len(scores) > 0:
-                showScores = True
-                maxScore = scores[0][1]
-            if showScores:
-                if len(scores) == 1 or scores[0][1] != scores[1][1]:
-                    winner = scores[0][0]
-                    if gameEnded:
-                        winnerString = winner.name + " won the game!"
-                    else:
-                        winnerString = winner.name + " is in the lead!"
-                    avatar = (
-                        "https://cdn.discordapp.com/avatars/"
-                        + str(winner.id)
-                        + "/"
-                        + str(winner.avatar)
-                        + ".png"
-                    )
-                else:
-                    if gameEnded:
-                        winnerString = "It's a tie!"
-                    else:
-                        winnerString = "It's tied at the top!"
-                for user, score in scores:
-                    if score == maxScore:
-                        nameString = nameString + "**" + user.name + "**\n"
-                        scoreString = (
-                            scoreString
-                            + "**"
-                            + str(round(score * 100 / noOfQuestions, 2))
-                            + "**\n"
-                        )
-                    else:
-                        nameString = nameString + user.name + "\n"
-                        scoreString = (
-                            scoreString
-                            + str(round(score * 100 / noOfQuestions, 2))
-                            + "\n"
-                        )
-            embed = discord.Embed(title=winnerString, colour=discord.Colour.blue())
-            if gameEnded:
-                embed.set_author(name="Game over", icon_url=avatar)
-            else:
-                embed.set_author(name="Scores so far", icon_url=avatar)
-            if showScores:
-                embed.add_field(name="Player", value=nameString)
-                embed.add_field(name="Score", value=scoreString)
-                embed.set_thumbnail(url=avatar)
-            await channel.send(embed=embed)
 
-    def stopGame(self, channel):
-        self.cleanTasks(str(channel.id))
-        del self.channelStates[str(channel.id)]
-        log(channel.id, "Pokemon game ended.")
+    def answerEmbed(self, game, message, answer):
+        embed = discord.Embed(
+            title="It's " + answer + "!",
+            colour=discord.Colour.green(),
+        )
+        embed.set_author(
+            name=message.author.name + " got it right!",
+            icon_url=avatarUrl(message.author),
+        )
+        embed.set_image(
+            url=self.config.pokemonSpriteAPI.replace("{id}", str(game.pokemonId))
+        )
+        self.addTypes(embed, game.types)
+        embed.add_field(name="Pokédex", value=game.descriptions[0], inline=False)
+        return embed
+
+    def revealEmbed(self, game, answer):
+        embed = discord.Embed(title="It's " + answer + "!", colour=discord.Colour.red())
+        self.addTypes(embed, game.types)
+        embed.add_field(name="Pokédex", value=game.descriptions[0], inline=False)
+        embed.set_image(
+            url=self.config.pokemonSpriteAPI.replace("{id}", str(game.pokemonId))
+        )
+        return embed
 
-    def cleanTasks(self, channel=""):
+    def nextHint(self, game):
         """
-        Clean up any existing game task.
+        Adds the next hint to the question: the Pokemon's types, then its
+        Pokédex entry with the name blacked out.
 
-        Parameters:
-        channel (discord.TextChannel): Channel to clean up tasks in.
-        """
-        for task in asyncio.all_tasks():
-            if task != asyncio.current_task() and task.get_name().startswith(
-                "pokemon-" + channel
-            ):
-                task.cancel()
-        return
+        Returns:
+        tuple: (changed, waitTime), or None if there are no hints left.
+        """
+        if game.mode == "reveal":
+            return self.nextRevealHint(game)
+        if game.question.fields == []:
+            self.addTypes(game.question, game.types)
+            waitTime = self.config.timeToSecondHint
+        elif len(game.question.fields) > 1:
+            return None
+        else:
+            self.addHiddenEntry(game)
+            waitTime = None
+        return True, waitTime
 
-    def cleanSprites(self):
-        """
-        Deletes the question images from the sprite folder.
+    def nextRevealHint(self, game):
         """
-        mydir = self.config.pokemonSpriteDirectory
-        if not os.path.exists(mydir):
-            return
-        filelist = [f for f in os.listdir(mydir)]
-        for f in filelist:
-            os.remove(os.path.join(mydir, f))
+        Sharpens the question image, adding the Pokemon's types with the
+        first stage and its Pokédex entry with the second.
+
+        Returns:
+        tuple: (changed, waitTime), or None if there are no hints left.
+        """
+        if game.stage + 1 >= len(game.stages):
+            return None
+        game.stage += 1
+        if game.stage == 1:
+            self.addTypes(game.question, game.types)
+        elif game.stage == 2:
+            self.addHiddenEntry(game)
+        waitTime = None
+        if game.stage + 1 < len(game.stages):
+            waitTime = self.config.timeToSecondHint
+        return self.showStage(game) or True, waitTime
+
+    def addHiddenEntry(self, game):
+        """
+        Adds the Pokemon's Pokédex entry to the question, with its name
+        blacked out.
+        """
+        insensitiveName = re.compile(re.escape(game.answer), re.IGNORECASE)
+        game.question.add_field(
+            name="Pokédex",
+            value=insensitiveName.sub(
+                ":black_large_square::black_large_square::black_large_square:",
+                game.descriptions[0],
+            ),
+            inline=False,
+        )
+
+    def endGame(self, game):
+        pass
 
-    def signal_handler(self):
+    async def signal_handler(self):
         """
         Called by bot when it recieves a SIGTERM or SIGINT. For cleanup activities before exiting.
         """
         print("Cancelling tasks...")
-        self.cleanTasks()
-        print("Deleting sprite data...")
-        self.cleanSprites()
+        self.quiz.stopAll()
+        if self.session is not None:
+            await self.session.close()
+        if self.pokedex is not None:
+            self.pokedex.close()
+        print("Sprite cache: " + self.sprites.stats)
+        print("Uploaded question images: " + self.attachments.stats)
 
 
 def setup(bot):
@@ -1,53 +1,41 @@
+import asyncio
 import os
 import random
 import sys
 import traceback
-import urllib
 
 import asyncpraw
 import discord
-import urlextract
+from asyncprawcore.exceptions import BadRequest, Forbidden, NotFound, Redirect
 from discord.ext import commands
 from utils.channelUtils import is_nsfw_allowed
 from utils.configManager import BotConfig, RedditConfig
 from utils.log import log
-
-
-def credit_embed(post):
+from utils.recentPosts import RecentPosts
+from utils.redditLinks import find_submission_ids
+from utils.redditListings import Listing, ListingCache, PostRecord, pick_post
+from utils.redditRequests import (
+    BACKGROUND,
+    INTERACTIVE,
+    PacedRequestor,
+    RequestScheduler,
+)
+from utils.subredditMetadata import SubredditMetadata
+from utils.ttlCache import TTLCache
+
+
+def credit_embed(post, subreddit):
     """
     Returns a Discord embed with the post title, subreddit and link to the original post.
     """
     embed = discord.Embed(
         title=post.title,
-        description="r/{0}".format(post.subreddit.display_name),
+        description="r/{0}".format(subreddit),
         url="https://www.reddit.com" + post.permalink,
     )
     return embed
 
 
-async def get_subpost(sublist, is_sfw):
-    """
-    Picks a random post from a list of posts.
-    """
-    posts = []
-    async for submission in sublist:
-        if is_submission_valid(submission, is_sfw):
-            posts.append(submission)
-    post = random.choice(posts)
-    return post
-
-
-def is_submission_valid(submission, is_sfw):
-    """
-    Checks if a Reddit submission is valid.
-    """
-    return (
-        not submission.stickied
-        and len(submission.selftext) < 2000
-        and not (is_sfw and submission.over_18)
-    )
-
-
 class Reddit(commands.Cog):
     """Pull posts from Reddit."""
 
@@ -57,44 +45,130 @@ class Reddit(commands.Cog):
         self.bot_config = BotConfig()
         self.reddit_config = RedditConfig()
 
+        # Every call to Reddit's API goes through the scheduler, which merges
+        # identical ones and paces them to stay within the rate limit.
+        self.requests = RequestScheduler(
+            self.reddit_config.requests_per_minute, self.reddit_config.request_burst
+        )
         self.reddit_instance = asyncpraw.Reddit(
             client_id=os.getenv("REDDIT_CLIENT_ID"),
             client_secret=os.getenv("REDDIT_SECRET"),
             user_agent=self.reddit_config.user_agent,
+            requestor_class=PacedRequestor,
+            requestor_kwargs={"scheduler": self.requests},
+        )
+        # Posts linked in messages recently, by ID, and those being fetched.
+        self.submissions = TTLCache(
+            self.reddit_config.link_cache_size, self.reddit_config.link_cache_ttl
+        )
+        self.resolving = {}
+        # Posts each channel was sent lately, so they aren't sent again soon.
+        self.recent_posts = RecentPosts(
+            self.reddit_config.recent_posts_per_channel,
+            self.reddit_config.recent_post_channels,
+        )
+        # Whether subreddits exist and are NSFW, kept across restarts.
+        self.subreddits = SubredditMetadata(
+            bot.db_client[self.bot_config.database][
+                self.reddit_config.subreddit_collection
+            ],
+            self.reddit_config.subreddit_ttl,
+            self.reddit_config.subreddit_missing_ttl,
+        )
+        # Posts of subreddit listings. The meme and cute subreddits are kept
+        # warm, so their commands are answered from memory.
+        self.listings = ListingCache(
+            self.fetch_listing,
+            self.reddit_config.listing_ttl,
+            self.reddit_config.listing_stale_ttl,
+            self.reddit_config.listing_cache_size,
+            self.promote_listing,
+        )
+        self.listings.keep_warm(
+            [
+                (subname, "top", "day")
+                for subname in self.reddit_config.meme_subs
+                + self.reddit_config.cute_subs
+            ],
+            self.reddit_config.listing_refresh_interval,
         )
 
     async def check_and_post_reddit(self, message):
         """
-        Checks if a Discord message has a valid Reddit URL, and if it does, post its contents into the channel.
+        Checks if a Discord message links to Reddit posts, and if it does, posts their contents into the channel.
         """
         channel = message.channel
-        url = message.content
-
-        extractor = urlextract.URLExtract()
-        if not extractor.has_urls(url):
+        submission_ids = find_submission_ids(
+            message.content, self.reddit_config.links_per_message
+        )
+        if not submission_ids:
             return
 
-        parse_result = urllib.parse.urlparse(url)
-        if parse_result[1] != "www.reddit.com":
-            return
+        posts = await asyncio.gather(
+            *[
+                self.resolve_submission(submission_id)
+                for submission_id in submission_ids
+            ]
+        )
+        for submission_id, post in zip(submission_ids, posts):
+            if post is False:
+                log(
+                    channel.id, f"INFO: Reddit post {submission_id} seems to be invalid"
+                )
+                continue
+
+            if post["over_18"] and not is_nsfw_allowed(channel):
+                await channel.send("This isn't an NSFW channel you degenerate")
+                continue
+
+            if post["is_self"]:
+                await channel.send(post["selftext"])
+            else:
+                await channel.send(post["url"])
+
+    async def resolve_submission(self, submission_id):
+        """
+        Gets what unfurling a Reddit post needs. Posts are cached for a while,
+        and links to the same post at once share one API call.
 
-        try:
-            post = await self.reddit_instance.submission(url=url)
-        except:
-            log(
-                channel.id,
-                "INFO: This Reddit URL seems to be invalid. The link might not be prefixed with https://",
+        Returns:
+            dict: The post's "over_18", "is_self", "selftext" and "url", or False if it can't be found.
+        """
+        post = self.submissions.get(submission_id)
+        if post is not None:
+            return post
+        if submission_id not in self.resolving:
+            self.resolving[submission_id] = asyncio.ensure_future(
+                self.fetch_submission(submission_id)
             )
-            return
+        return await asyncio.shield(self.resolving[submission_id])
 
-        if post.over_18 and not is_nsfw_allowed(channel):
-            await channel.send("This isn't an NSFW channel you degenerate")
-            return
-
-        if post.is_self:
-            await channel.send(post.selftext)
+    async def fetch_submission(self, submission_id):
+        try:
+            submission = await self.requests.request(
+                ("submission", submission_id),
+                lambda: self.reddit_instance.submission(id=submission_id),
+            )
+            post = {
+                "over_18": submission.over_18,
+                "is_self": submission.is_self,
+                "selftext": submission.selftext,
+                "url": submission.url,
+            }
+        except (BadRequest, Forbidden, NotFound, Redirect):
+            # Won't be found if asked again any time soon either.
+            post = False
+            self.submissions.put(
+                submission_id, post, self.reddit_config.link_failure_ttl
+            )
+        except Exception as e:
+            print(f"Couldn't fetch Reddit post {submission_id}: {e}")
+            post = False
         else:
-            await channel.send(post.url)
+            self.submissions.put(submission_id, post)
+        finally:
+            del self.resolving[submission_id]
+        return post
 
     @commands.Cog.listener()
     async def on_message(self, message):
@@ -102,39 +176,111 @@ class Reddit(commands.Cog):
             return
         await self.check_and_post_reddit(message)
 
+    async def load_subreddit(self, subname):
+        """
+        Asks Reddit about a subreddit for the subreddit metadata cache.
+
+        Returns:
+            tuple: The subreddit's display name and whether it's NSFW, or None if it doesn't exist, is banned or is private.
+        """
+
+        async def load():
+            subreddit = await self.reddit_instance.subreddit(subname)
+            await subreddit.load()
+            return subreddit.display_name, subreddit.over18
+
+        try:
+            # Merged calls only get what this returns, not the object loaded.
+            return await self.requests.request(("about", subname.lower()), load)
+        except (BadRequest, Forbidden, NotFound, Redirect):
+            return None
+
+    async def fetch_listing(self, subname, sort, window, background=False):
+        """
+        Fetches 40 posts of a subreddit listing for the listing cache.
+        """
+
+        async def fetch():
+            # Looking the subreddit up goes at least as soon as the listing.
+            metadata = await self.subreddits.lookup(subname, self.load_subreddit)
+            if not metadata["exists"]:
+                raise LookupError(f"r/{subname} doesn't exist")
+            subreddit = await self.reddit_instance.subreddit(subname)
+            if sort == "top":
+                submissions = subreddit.top(window, limit=40)
+            else:
+                submissions = subreddit.hot(limit=40)
+            posts = [PostRecord(submission) async for submission in submissions]
+            return Listing(metadata["display_name"], metadata["over_18"], posts)
+
+        return await self.requests.request(
+            ("listing", subname.lower(), sort, window),
+            fetch,
+            BACKGROUND if background else INTERACTIVE,
+        )
+
+    def promote_listing(self, subname, sort, window):
+        """
+        Has a background fetch of a listing go as soon as a command's, once a
+        command is waiting on it.
+        """
+        self.requests.promote(("listing", subname.lower(), sort, window))
+
+    async def send_post(self, ctx, post):
+        """
+        Sends a post's link, or its text if it's a self post.
+        """
+        if not post.is_self:
+            await ctx.send(post.url)
+            return
+        # Listings don't keep the text of posts.
+        details = await self.resolve_submission(post.id)
+        if details is False:
+            await ctx.send(post.url)
+        else:
+            await ctx.send(details["selftext"])
+
     async def post(self, ctx, subname, should_check_top_posts):
         """
         Takes a subreddit name and sends a post from it in the channel.
         """
+        didnt_load = "That didn't load. Check the subreddit name and try again.\nIf you're spelling it correctly, it's possible the subreddit you're trying to view is banned."
         try:
-            subreddit = await self.reddit_instance.subreddit(subname)
-            await subreddit.load()
-        except:
-            await ctx.send(
-                "That didn't load. Check the subreddit name and try again.\nIf you're spelling it correctly, it's possible the subreddit you're trying to view is banned."
-            )
+            metadata = await self.subreddits.lookup(subname, self.load_subreddit)
+        except Exception as e:
+            log(ctx.channel.id, f"Couldn't look up r/{subname}: {e}")
+            metadata = None
+        if metadata is None or not metadata["exists"]:
+            await ctx.send(didnt_load)
             return
 
         is_channel_sfw = not is_nsfw_allowed(ctx.channel)
 
-        if subreddit.over18 and is_channel_sfw:
+        if metadata["over_18"] and is_channel_sfw:
             await ctx.send("Go run this in an NSFW channel you degenerate")
             return
 
-        post = None
+        try:
+            if should_check_top_posts:
+                listing = await self.listings.get(subname, "top", "day")
+            else:
+                listing = await self.listings.get(subname, "hot")
+        except:
+            await ctx.send(didnt_load)
+            return
 
-        if should_check_top_posts:
-            post = await get_subpost(subreddit.top("day", limit=40), is_channel_sfw)
-        else:
-            post = await get_subpost(subreddit.hot(limit=40), is_channel_sfw)
+        post = pick_post(
+            listing, is_channel_sfw, self.recent_posts.seen(ctx.channel.id)
+        )
+        if post is None:
+            await ctx.send("There's nothing there I can post here.")
+            return
+        self.recent_posts.remember(ctx.channel.id, post.id)
 
         log(ctx.channel.id, post.url)
 
-        await ctx.send(embed=credit_embed(post))
-        if post.is_self:
-            await ctx.send(post.selftext)
-        else:
-            await ctx.send(post.url)
+        await ctx.send(embed=credit_embed(post, listing.subreddit))
+        await self.send_post(ctx, post)
 
     @commands.command(usage="<subreddit name>", aliases=["gettop"])
     async def top(self, ctx, subname: str):
@@ -161,19 +307,32 @@ class Reddit(commands.Cog):
     @commands.command()
     async def copypasta(self, ctx):
         """To be fair, you have to have a very high IQ to use this command."""
-        subreddit = await self.reddit_instance.subreddit("copypasta")
-        post = await get_subpost(
-            subreddit.hot(limit=40), not is_nsfw_allowed(ctx.channel)
+        listing = await self.listings.get("copypasta", "hot")
+        post = pick_post(
+            listing,
+            not is_nsfw_allowed(ctx.channel),
+            self.recent_posts.seen(ctx.channel.id),
         )
+        if post is None:
+            await ctx.send("There's nothing there I can post here.")
+            return
+        self.recent_posts.remember(ctx.channel.id, post.id)
         await ctx.send("**{0}**".format(post.title))
-        await ctx.send(post.selftext)
+        await self.send_post(ctx, post)
 
     async def signal_handler(self):
         """
         Called by bot when it recieves a SIGTERM or SIGINT. For cleanup activities before exiting.
         """
+        self.listings.stop()
+        print("Reddit listings: " + self.listings.stats)
+        print("Linked Reddit posts: " + self.submissions.stats)
+        print("Subreddit metadata: " + self.subreddits.stats)
+        print("Recently sent posts: " + self.recent_posts.stats)
+        print("Reddit requests: " + self.requests.stats)
         print("Closing connection to reddit...")
         await self.reddit_instance.close()
+        self.requests.close()
 
     async def cog_command_error(self, ctx, error):
         """This is triggered when an error is raised while invoking a command in this cog.
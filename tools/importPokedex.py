@@ -0,0 +1,114 @@
+"""
+Fetches the name, types and Pokédex entries of every Pokemon in the
+configured regions from PokeAPI into a local SQLite Pokédex, so that the
+Pokemon game doesn't have to ask PokeAPI during a game.
+
+Pokemon are stored as they come in, so an interrupted run picks up where it
+left off. Pokemon that couldn't be fetched are retried on the next run.
+
+Run from the repository root:
+
+    python -m tools.importPokedex [--data-api URL] [--species-api URL] [--concurrency N]
+
+Use tools.stubPokeApi to run it without network access.
+"""
+
+import argparse
+import asyncio
+import time
+
+import aiohttp
+from utils.configManager import PokemonConfig
+from utils.pokedex import PokeApiError, Pokedex, fetchEntry
+
+COMMIT_EVERY = 50
+
+
+async def worker(queue, session, pokedex, args, progress):
+    """
+    Fetches Pokemon from the queue until it is empty.
+    """
+    while True:
+        try:
+            id = queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        try:
+            entry = await fetchEntry(session, args.data_api, args.species_api, id)
+        except PokeApiError as e:
+            print(f"Couldn't fetch {id}: {e}")
+            progress["failed"] += 1
+            continue
+        pokedex.store(id, entry, commit=False)
+        progress["found" if entry is not None else "missing"] += 1
+        progress["done"] += 1
+        if progress["done"] % COMMIT_EVERY == 0:
+            print(f"{progress['done']}/{progress['total']} Pokemon fetched")
+            pokedex.commit()
+
+
+async def importPokedex(args):
+    config = PokemonConfig()
+    regions = config.regionWiseDex
+    ids = set()
+    for bounds in regions.values():
+        ids.update(range(bounds["start"], bounds["end"] + 1))
+    pokedex = Pokedex(args.output)
+    checked = pokedex.checkedIds()
+    queue = asyncio.Queue()
+    for id in sorted(ids - checked):
+        queue.put_nowait(id)
+    print(f"{len(ids) - queue.qsize()} Pokemon already fetched, {queue.qsize()} to go")
+
+    progress = {
+        "total": queue.qsize(),
+        "done": 0,
+        "found": 0,
+        "missing": 0,
+        "failed": 0,
+    }
+    start = time.time()
+    connector = aiohttp.TCPConnector(limit=args.concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        await asyncio.gather(
+            *[
+                worker(queue, session, pokedex, args, progress)
+                for _ in range(args.concurrency)
+            ]
+        )
+    pokedex.commit()
+    print(
+        f"Fetched {progress['done']} Pokemon in {time.time() - start:.1f}s "
+        f"({progress['missing']} don't exist, {progress['failed']} failed, "
+        "run again to retry them)"
+    )
+
+    for region, count in pokedex.buildRegions(regions).items():
+        bounds = regions[region]
+        print(f"{region}: {count}/{bounds['end'] - bounds['start'] + 1} playable")
+    pokedex.close()
+
+
+def main():
+    config = PokemonConfig()
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--output", default=config.pokedex, help="Pokédex to write")
+    parser.add_argument(
+        "--data-api",
+        default=config.pokemonDataAPI,
+        help="Pokemon data URL with an {id} placeholder",
+    )
+    parser.add_argument(
+        "--species-api",
+        default=config.pokemonSpeciesDataAPI,
+        help="Pokemon species URL with an {id} placeholder",
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=8, help="maximum requests in flight"
+    )
+    args = parser.parse_args()
+    asyncio.run(importPokedex(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Renders the question image of every Pokemon in a region into the sprite
+cache ahead of time, so that games don't have to download sprites or draw
+silhouettes.
+
+Sprites are downloaded concurrently and drawn in a pool of processes. Images
+that are already cached are skipped, so an interrupted run picks up where it
+left off. The cache is shared with the bot, so it can run while the bot does.
+
+Run from the repository root:
+
+    python -m tools.renderSilhouettes [--region all] [--sprite-api URL] [--workers N]
+
+Use tools.stubPokeApi to run it without network access.
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+import aiohttp
+from utils.configManager import PokemonConfig
+from utils.imageEncoder import ImageEncoder
+from utils.pokedex import Pokedex
+from utils.silhouette import SilhouetteRenderer, artworkKey, silhouetteKey
+from utils.spriteCache import SpriteCache
+
+# The renderer of each worker process, so the background is decoded once per
+# process rather than once per sprite.
+renderer = None
+
+
+def initWorker(backgroundPath, encoder):
+    global renderer
+    renderer = SilhouetteRenderer(backgroundPath, encoder=encoder)
+
+
+def renderSprite(data, fileName):
+    """
+    Draws one question image. Runs in a worker process.
+    """
+    renderer.renderToFile(BytesIO(data), fileName)
+
+
+async def render(id, session, semaphore, pool, cache, silhouettes, args, progress):
+    url = args.sprite_api.replace("{id}", str(id))
+    key = silhouetteKey(url, silhouettes)
+    fileName = cache.temporaryPath(key)
+    try:
+        async with semaphore:
+            async with session.get(url) as response:
+                if response.status != 200:
+                    print(f"Couldn't fetch the sprite of {id}: {response.status}")
+                    progress["failed"] += 1
+                    return
+                data = await response.read()
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(pool, renderSprite, data, fileName)
+        # The artwork is cached too, so a new background doesn't need the
+        # sprites downloaded again.
+        artwork = cache.temporaryPath(artworkKey(url))
+        with open(artwork, "wb") as fp:
+            fp.write(data)
+        cache.commit(artworkKey(url), artwork)
+        cache.commit(key, fileName)
+    except (aiohttp.ClientError, ValueError, OSError) as e:
+        print(f"Couldn't render {id}: {e}")
+        progress["failed"] += 1
+        return
+    finally:
+        if os.path.exists(fileName):
+            os.remove(fileName)
+    progress["done"] += 1
+    if progress["done"] % 50 == 0:
+        print(f"{progress['done']}/{progress['total']} rendered")
+
+
+async def renderRegion(args):
+    config = PokemonConfig()
+    ids = None
+    if os.path.isfile(config.pokedex):
+        pokedex = Pokedex(config.pokedex)
+        ids = pokedex.regionIds(args.region)
+        pokedex.close()
+    if ids is None:
+        start, end = config.getRange(args.region)
+        ids = range(start, end + 1)
+    cache = SpriteCache(args.output, config.spriteCacheSize)
+    encoder = ImageEncoder.fromConfig(config.imageEncoding)
+    silhouettes = SilhouetteRenderer(config.backgroundImage, encoder=encoder)
+    if not args.force:
+        ids = [
+            id
+            for id in ids
+            if cache.get(
+                silhouetteKey(args.sprite_api.replace("{id}", str(id)), silhouettes)
+            )
+            is None
+        ]
+    print(f"{len(ids)} question images to render")
+
+    progress = {"total": len(ids), "done": 0, "failed": 0}
+    start = time.time()
+    semaphore = asyncio.Semaphore(args.concurrency)
+    with ProcessPoolExecutor(
+        max_workers=args.workers,
+        initializer=initWorker,
+        initargs=(config.backgroundImage, encoder),
+    ) as pool:
+        async with aiohttp.ClientSession() as session:
+            await asyncio.gather(
+                *[
+                    render(
+                        id, session, semaphore, pool, cache, silhouettes, args, progress
+                    )
+                    for id in ids
+                ]
+            )
+    print(
+        f"Rendered {progress['done']} question images in "
+        f"{time.time() - start:.1f}s ({progress['failed']} failed)"
+    )
+    print("Sprite cache: " + cache.stats)
+
+
+def main():
+    config = PokemonConfig()
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument(
+        "--region",
+        default="all",
+        choices=list(config.regionWiseDex.keys()),
+        help="region to render",
+    )
+    parser.add_argument(
+        "--sprite-api",
+        default=config.pokemonSpriteAPI,
+        help="sprite URL with an {id} placeholder",
+    )
+    parser.add_argument(
+        "--output",
+        default=config.pokemonSpriteDirectory,
+        help="sprite cache to render into",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=os.cpu_count(), help="rendering processes"
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=8, help="maximum downloads in flight"
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="render images that are already cached again",
+    )
+    args = parser.parse_args()
+    asyncio.run(renderRegion(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+A local stand-in for PokeAPI and the official artwork sprites, for running the
+Pokemon tools and game without network access.
+
+Every ID up to --count exists, except for a deterministic fraction that 404.
+Names, types and Pokédex entries are made up, and sprites are plain shapes.
+
+    python -m tools.stubPokeApi [--port 8001] [--count 807]
+
+Then point the tools at it with
+--data-api "http://localhost:8001/api/v2/pokemon/{id}",
+--species-api "http://localhost:8001/api/v2/pokemon-species/{id}" and
+--sprite-api "http://localhost:8001/sprites/{id}.png".
+"""
+
+import argparse
+import zlib
+from io import BytesIO
+
+from aiohttp import web
+from PIL import Image, ImageDraw
+
+TYPES = [
+    "normal",
+    "fighting",
+    "flying",
+    "poison",
+    "ground",
+    "rock",
+    "bug",
+    "ghost",
+    "steel",
+    "fire",
+    "water",
+    "grass",
+    "electric",
+    "psychic",
+    "ice",
+    "dragon",
+    "dark",
+    "fairy",
+]
+
+
+def makeSprite(id, size=475):
+    """
+    Draws a made-up sprite: a coloured shape on a transparent background.
+
+    Returns:
+    bytes: The PNG.
+    """
+    seed = zlib.crc32(str(id).encode("utf-8"))
+    image = Image.new("RGBA", (size, size), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(image)
+    colour = (seed & 0xFF, (seed >> 8) & 0xFF, (seed >> 16) & 0xFF, 255)
+    margin = 20 + seed % 80
+    draw.ellipse((margin, margin * 2, size - margin, size - margin // 2), fill=colour)
+    draw.polygon(
+        [(size // 2, margin // 2), (margin, size // 2), (size - margin, size // 2)],
+        fill=colour,
+    )
+    output = BytesIO()
+    image.save(output, "PNG")
+    return output.getvalue()
+
+
+def makeApp(count=807, missingRate=0.02, movesPerPokemon=80):
+    """
+    Creates the stand-in API application.
+
+    Parameters:
+    count (int): The highest Pokemon ID.
+    missingRate (float): The fraction of IDs that don't exist.
+    movesPerPokemon (int): Padding moves per /pokemon response, to make it
+        about as big as the real thing.
+    """
+
+    def exists(id):
+        return 0 < id <= count and zlib.crc32(str(id).encode()) % 1000 >= (
+            missingRate * 1000
+        )
+
+    def getId(request):
+        try:
+            return int(request.match_info["id"])
+        except ValueError:
+            raise web.HTTPNotFound()
+
+    async def pokemon(request):
+        id = getId(request)
+        if not exists(id):
+            raise web.HTTPNotFound()
+        seed = zlib.crc32(str(id).encode("utf-8"))
+        types = [TYPES[seed % len(TYPES)]]
+        if seed % 3 == 0:
+            types.append(TYPES[(seed // 7) % len(TYPES)])
+        return web.json_response(
+            {
+                "id": id,
+                "species": {"name": f"stubmon-{id}"},
+                "types": [
+                    {"slot": slot + 1, "type": {"name": name}}
+                    for slot, name in enumerate(types)
+                ],
+                "moves": [
+                    {"move": {"name": f"move-{i}"}, "version_group_details": []}
+                    for i in range(movesPerPokemon)
+                ],
+            }
+        )
+
+    async def species(request):
+        id = getId(request)
+        if not exists(id):
+            raise web.HTTPNotFound()
+        return web.json_response(
+            {
+                "id": id,
+                "names": [
+                    {"name": f"Stubmon {id}", "language": {"name": "en"}},
+                    {"name": f"Stubmön {id}", "language": {"name": "fr"}},
+                ],
+                "flavor_text_entries": [
+                    {
+                        "flavor_text": f"Stubmon {id} lives\nin the test suite.",
+                        "language": {"name": "en"},
+                    },
+                    {
+                        "flavor_text": f"Stubmon {id} vit\ndans les tests.",
+                        "language": {"name": "fr"},
+                    },
+                    {
+                        "flavor_text": f"Stubmon {id} lives\nin the test suite.",
+                        "language": {"name": "en"},
+                    },
+                ],
+            }
+        )
+
+    async def sprite(request):
+        id = getId(request)
+        if not exists(id):
+            raise web.HTTPNotFound()
+        return web.Response(body=makeSprite(id), content_type="image/png")
+
+    app = web.Application()
+    app.router.add_get("/api/v2/pokemon/{id}", pokemon)
+    app.router.add_get("/api/v2/pokemon-species/{id}", species)
+    app.router.add_get("/sprites/{id}.png", sprite)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--count", type=int, default=807)
+    parser.add_argument("--missing-rate", type=float, default=0.02)
+    args = parser.parse_args()
+    web.run_app(makeApp(args.count, args.missing_rate), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
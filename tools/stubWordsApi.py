@@ -0,0 +1,69 @@
+"""
+A local stand-in for the Datamuse words API, for running the anagram tools
+without network access.
+
+Definitions are read from a JSON file mapping words to lists of Datamuse
+"defs" strings (e.g. "n\\ta small domesticated feline"). Without one, every
+word gets a made-up definition, except for a deterministic fraction of words
+that are reported as having none.
+
+    python -m tools.stubWordsApi [--port 8000] [--definitions FILE]
+
+Then point the tools at it with --api "http://localhost:8000/words?sp={word}".
+"""
+
+import argparse
+import json
+import zlib
+
+from aiohttp import web
+
+
+def makeApp(definitions=None, missingRate=0.1):
+    """
+    Creates the stand-in API application.
+
+    Parameters:
+    definitions (dict): Word -> list of Datamuse "defs" strings. If given, only
+        these words have definitions.
+    missingRate (float): Without a definitions file, the fraction of words
+        reported as having no definitions.
+    """
+
+    async def words(request):
+        word = request.query.get("sp", "")
+        if definitions is not None:
+            defs = definitions.get(word)
+        elif zlib.crc32(word.encode("utf-8")) % 1000 < missingRate * 1000:
+            defs = None
+        else:
+            defs = [f"n\tA stand-in definition of {word}"]
+        if not defs:
+            return web.json_response([])
+        # A made-up frequency between 0.01 and 1000 per million.
+        frequency = 10 ** (zlib.crc32(word[::-1].encode("utf-8")) % 5000 / 1000 - 2)
+        return web.json_response(
+            [{"word": word, "score": 1, "defs": defs, "tags": [f"f:{frequency:.4f}"]}]
+        )
+
+    app = web.Application()
+    app.router.add_get("/words", words)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--definitions", help="JSON file of word -> defs")
+    parser.add_argument("--missing-rate", type=float, default=0.1)
+    args = parser.parse_args()
+    definitions = None
+    if args.definitions is not None:
+        with open(args.definitions) as fp:
+            definitions = json.load(fp)
+    web.run_app(makeApp(definitions, args.missing_rate), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
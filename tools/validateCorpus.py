@@ -0,0 +1,129 @@
+"""
+Looks up every word in the anagram corpus on the words API and builds a
+corpus of the playable words, i.e. the ones that have definitions. Word
+frequencies from the API are used to sort the words into difficulty tiers.
+
+Results are written to the anagram definition cache as they come in, so the
+bot starts with a warm cache and an interrupted run picks up where it left off.
+
+Run from the repository root:
+
+    python -m tools.validateCorpus [--corpus NAME] [--api URL] [--concurrency N]
+
+Use tools.stubWordsApi to run it without network access.
+"""
+
+import argparse
+import asyncio
+import time
+
+import aiohttp
+from utils.configManager import AnagramConfig
+from utils.definitionCache import DefinitionCache, WordsApiError, fetchDefinitions
+from utils.wordCorpus import buildCorpusFile
+
+COMMIT_EVERY = 200
+
+
+async def worker(queue, session, cache, progress):
+    """
+    Looks up words from the queue until it is empty.
+    """
+    while True:
+        try:
+            word = queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        try:
+            details, frequency = await fetchDefinitions(session, cache.apiUrl, word)
+        except WordsApiError as e:
+            print(f"Couldn't look up {word}: {e}")
+            progress["failed"] += 1
+            continue
+        await cache.store(word, details, frequency, commit=False)
+        progress["playable" if details is not None else "unplayable"] += 1
+        progress["done"] += 1
+        if progress["done"] % COMMIT_EVERY == 0:
+            print(
+                f"{progress['done']}/{progress['total']} words checked, "
+                f"{progress['playable']} playable"
+            )
+            await cache.commit()
+
+
+async def validate(args):
+    config = AnagramConfig()
+    with open(args.source) as fp:
+        words = sorted(
+            {word.strip() for word in fp.read().splitlines() if word.strip()}
+        )
+    cache = DefinitionCache(
+        args.cache,
+        args.api,
+        ttl=config.definitionTTL,
+        negativeTtl=config.noDefinitionTTL,
+    )
+    known = await cache.knownWords()
+    queue = asyncio.Queue()
+    for word in words:
+        if word not in known:
+            queue.put_nowait(word)
+    print(f"{len(words) - queue.qsize()} words already checked, {queue.qsize()} to go")
+
+    progress = {
+        "total": queue.qsize(),
+        "done": 0,
+        "playable": 0,
+        "unplayable": 0,
+        "failed": 0,
+    }
+    start = time.time()
+    connector = aiohttp.TCPConnector(limit=args.concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        await asyncio.gather(
+            *[worker(queue, session, cache, progress) for _ in range(args.concurrency)]
+        )
+    await cache.commit()
+    print(
+        f"Checked {progress['done']} words in {time.time() - start:.1f}s "
+        f"({progress['failed']} failed, run again to retry them)"
+    )
+
+    known = await cache.knownWords()
+    frequencies = await cache.frequencies()
+    await cache.close()
+    playable = [word for word in words if known.get(word)]
+    buildCorpusFile(playable, args.output, frequencies=frequencies)
+    print(f"Wrote {len(playable)} of {len(words)} words to {args.output}")
+
+
+def main():
+    config = AnagramConfig()
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument(
+        "--corpus",
+        default="default",
+        choices=list(config.corpora.keys()),
+        help="configured corpus to validate",
+    )
+    parser.add_argument("--source", help="word list to check")
+    parser.add_argument("--output", help="playable corpus to write")
+    parser.add_argument(
+        "--cache", default=config.definitionCache, help="definition cache database"
+    )
+    parser.add_argument(
+        "--api", default=config.wordsAPI, help="words API URL with a {word} placeholder"
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=8, help="maximum requests in flight"
+    )
+    args = parser.parse_args()
+    if args.source is None:
+        args.source = config.getCorpus(args.corpus)["Source"]
+    if args.output is None:
+        args.output = config.getCorpus(args.corpus)["Playable"]
+    asyncio.run(validate(args))
+
+
+if __name__ == "__main__":
+    main()
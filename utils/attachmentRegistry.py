@@ -0,0 +1,116 @@
+import time
+from urllib.parse import parse_qs, urlsplit
+
+import aiohttp
+
+
+class AttachmentRegistry(object):
+    """
+    Remembers, in Mongo, the URL Discord gave a file when it was first
+    uploaded, so the file can be shown in any channel of any guild without
+    uploading it again.
+
+    Discord signs attachment URLs and they stop working after a while. A URL
+    is used until the expiry time in its "ex" parameter, or for ttl seconds
+    if it has none. In case it was deleted before then, it is checked with a
+    HEAD request every checkInterval seconds. A URL that has expired or fails
+    the check is forgotten, so the file is uploaded again and the new URL
+    registered.
+    """
+
+    def __init__(self, collection, ttl=82800, checkInterval=3600, margin=600):
+        """
+        Parameters:
+        collection (pymongo.collection.Collection): Where the URLs are kept
+        ttl (int): Seconds a URL without an expiry time is used for
+        checkInterval (int): Seconds between checks that a URL still works
+        margin (int): URLs expiring within this many seconds aren't used, so
+            they don't expire while the question is up.
+        """
+        self.collection = collection
+        self.ttl = ttl
+        self.checkInterval = checkInterval
+        self.margin = margin
+        # Key -> [url, expiry time, last checked]
+        self._urls = {}
+        self.hits = 0
+        self.misses = 0
+
+    def expiry(self, url, storedAt):
+        """
+        Returns:
+        float: When a URL stops working, as a Unix timestamp.
+        """
+        query = parse_qs(urlsplit(url).query)
+        if "ex" in query:
+            try:
+                return int(query["ex"][0], 16)
+            except ValueError:
+                pass
+        return storedAt + self.ttl
+
+    async def get(self, key, session):
+        """
+        Looks up the URL of an uploaded file.
+
+        Parameters:
+        key (string): The file's key
+        session (aiohttp.ClientSession): Session to check the URL from
+
+        Returns:
+        string: The URL, or None if the file has to be uploaded.
+        """
+        entry = self._urls.get(key)
+        if entry is None:
+            document = self.collection.find_one({"key": key})
+            if document is not None:
+                url = document["url"]
+                entry = [url, self.expiry(url, document["storedAt"]), 0]
+                self._urls[key] = entry
+        if entry is None or entry[1] - self.margin < time.time():
+            self._urls.pop(key, None)
+            self.misses += 1
+            return None
+        if time.time() - entry[2] > self.checkInterval:
+            if not await self.check(entry[0], session):
+                self.forget(key, entry[0])
+                self.misses += 1
+                return None
+            entry[2] = time.time()
+        self.hits += 1
+        return entry[0]
+
+    async def check(self, url, session):
+        """
+        Returns:
+        boolean: Whether a URL still works.
+        """
+        try:
+            async with session.head(url) as response:
+                return response.status == 200
+        except aiohttp.ClientError:
+            # Can't tell, so keep using it.
+            return True
+
+    def put(self, key, url):
+        """
+        Registers the URL of a file that has just been uploaded.
+        """
+        now = time.time()
+        self.collection.update_one(
+            {"key": key},
+            {"$set": {"key": key, "url": url, "storedAt": now}},
+            upsert=True,
+        )
+        self._urls[key] = [url, self.expiry(url, now), now]
+
+    def forget(self, key, url):
+        """
+        Drops a URL that doesn't work, unless it has been replaced already.
+        """
+        self._urls.pop(key, None)
+        self.collection.delete_one({"key": key, "url": url})
+
+    @property
+    def stats(self):
+        return f"{self.hits} hits, {self.misses} misses"
@@ -37,14 +37,41 @@ class BotConfig(Config):
     def database(self):
         return self.get_property("Database")
 
+    @property
+    def renderWorkers(self):
+        return int(self.get_property("RenderWorkers"))
+
+    @property
+    def renderQueueSize(self):
+        return int(self.get_property("RenderQueueSize"))
+
+    @property
+    def renderTimeout(self):
+        return int(self.get_property("RenderTimeout"))
+
 
 class AnagramConfig(Config):
     def __init__(self):
         Config.__init__(self, "Anagram")
 
     @property
-    def corpus(self):
-        return self.get_property("Corpus")
+    def corpora(self):
+        return self.get_property("Corpora")
+
+    def getCorpus(self, name: str):
+        return self.corpora[name]
+
+    @property
+    def corpusCompactionThreshold(self):
+        return int(self.get_property("CorpusCompactionThreshold"))
+
+    @property
+    def corpusIdleTime(self):
+        return int(self.get_property("CorpusIdleTime"))
+
+    @property
+    def corpusCollection(self):
+        return self.get_property("CorpusCollection")
 
     @property
     def noOfQuestions(self):
@@ -62,6 +89,10 @@ class AnagramConfig(Config):
     def timeToNextQuestion(self):
         return int(self.get_property("TimeToNextQuestion"))
 
+    @property
+    def questionLookahead(self):
+        return int(self.get_property("QuestionLookahead"))
+
     @property
     def timePerQuestion(self):
         return int(self.get_property("TimePerQuestion"))
@@ -86,6 +117,38 @@ class AnagramConfig(Config):
     def wordsAPI(self):
         return self.get_property("WordsAPI")
 
+    @property
+    def wordsAPIAttempts(self):
+        return int(self.get_property("WordsAPIAttempts"))
+
+    @property
+    def blitzTime(self):
+        return int(self.get_property("BlitzTime"))
+
+    @property
+    def blitzRackSize(self):
+        return int(self.get_property("BlitzRackSize"))
+
+    @property
+    def blitzMinWordLength(self):
+        return int(self.get_property("BlitzMinWordLength"))
+
+    @property
+    def blitzMinAnswers(self):
+        return int(self.get_property("BlitzMinAnswers"))
+
+    @property
+    def definitionCache(self):
+        return self.get_property("DefinitionCache")
+
+    @property
+    def definitionTTL(self):
+        return int(self.get_property("DefinitionTTL"))
+
+    @property
+    def noDefinitionTTL(self):
+        return int(self.get_property("NoDefinitionTTL"))
+
 
 class GarlicConfig(Config):
     def __init__(self):
@@ -103,6 +166,10 @@ class GarlicConfig(Config):
     def font(self):
         return self.get_property("Font")
 
+    @property
+    def imageEncoding(self):
+        return self.get_property("ImageEncoding")
+
 
 class RedditConfig(Config):
     def __init__(self):
@@ -120,6 +187,66 @@ class RedditConfig(Config):
     def cute_subs(self):
         return self.get_property("CuteSubs")
 
+    @property
+    def links_per_message(self):
+        return int(self.get_property("LinksPerMessage"))
+
+    @property
+    def link_cache_size(self):
+        return int(self.get_property("LinkCacheSize"))
+
+    @property
+    def link_cache_ttl(self):
+        return int(self.get_property("LinkCacheTTL"))
+
+    @property
+    def link_failure_ttl(self):
+        return int(self.get_property("LinkFailureTTL"))
+
+    @property
+    def listing_ttl(self):
+        return int(self.get_property("ListingTTL"))
+
+    @property
+    def listing_stale_ttl(self):
+        return int(self.get_property("ListingStaleTTL"))
+
+    @property
+    def listing_cache_size(self):
+        return int(self.get_property("ListingCacheSize"))
+
+    @property
+    def listing_refresh_interval(self):
+        return int(self.get_property("ListingRefreshInterval"))
+
+    @property
+    def subreddit_collection(self):
+        return self.get_property("SubredditCollection")
+
+    @property
+    def subreddit_ttl(self):
+        return int(self.get_property("SubredditTTL"))
+
+    @property
+    def subreddit_missing_ttl(self):
+        return int(self.get_property("SubredditMissingTTL"))
+
+    @property
+    def recent_posts_per_channel(self):
+        return int(self.get_property("RecentPostsPerChannel"))
+
+    @property
+    def recent_post_channels(self):
+        return int(self.get_property("RecentPostChannels"))
+
+    @property
+    def requests_per_minute(self):
+        return int(self.get_property("RequestsPerMinute"))
+
+    @property
+    def request_burst(self):
+        return int(self.get_property("RequestBurst"))
+
 
 class PokemonConfig(Config):
     def __init__(self):
@@ -141,6 +268,10 @@ class PokemonConfig(Config):
     def timeToNextQuestion(self):
         return int(self.get_property("TimeToNextQuestion"))
 
+    @property
+    def questionLookahead(self):
+        return int(self.get_property("QuestionLookahead"))
+
     @property
     def timePerQuestion(self):
         return int(self.get_property("TimePerQuestion"))
@@ -169,6 +300,42 @@ class PokemonConfig(Config):
     def pokemonSpriteDirectory(self):
         return self.get_property("PokemonSpriteDirectory")
 
+    @property
+    def pokedex(self):
+        return self.get_property("Pokedex")
+
+    @property
+    def spriteCacheSize(self):
+        return int(self.get_property("SpriteCacheSize"))
+
+    @property
+    def attachmentCollection(self):
+        return self.get_property("AttachmentCollection")
+
+    @property
+    def attachmentTTL(self):
+        return int(self.get_property("AttachmentTTL"))
+
+    @property
+    def attachmentCheckInterval(self):
+        return int(self.get_property("AttachmentCheckInterval"))
+
+    @property
+    def revealSize(self):
+        return int(self.get_property("RevealSize"))
+
+    @property
+    def revealBlockSizes(self):
+        return [int(size) for size in self.get_property("RevealBlockSizes")]
+
+    @property
+    def answerLanguages(self):
+        return self.get_property("AnswerLanguages")
+
+    @property
+    def imageEncoding(self):
+        return self.get_property("ImageEncoding")
+
     @property
     def backgroundImage(self):
         return self.get_property("BackgroundImage")
@@ -196,6 +363,10 @@ class BullshitConfig(Config):
     def font(self):
         return self.get_property("Font")
 
+    @property
+    def imageEncoding(self):
+        return self.get_property("ImageEncoding")
+
 
 class XkcdConfig(Config):
     def __init__(self):
@@ -0,0 +1,112 @@
+import os
+import time
+
+from utils.wordCorpus import WordCorpus
+
+
+class CorpusRegistry(object):
+    """
+    Opens word corpora on first use and shares them between every game that
+    uses them. Corpora that no game has used for a while are closed again.
+    """
+
+    def __init__(self, corpora, compactionThreshold=100, idleTime=1800, onEvict=None):
+        """
+        Parameters:
+        corpora (dict): Corpus name -> dict with a "Store" path to the binary
+            corpus file, and optionally a "Source" word list to build it from
+            and a "Playable" corpus built by tools.validateCorpus.
+        compactionThreshold (int): Passed on to each WordCorpus.
+        idleTime (int): Seconds a corpus may go unused before it is closed.
+        onEvict (callable): Called with the name of each corpus that is closed.
+        """
+        self.corpora = corpora
+        self.compactionThreshold = compactionThreshold
+        self.idleTime = idleTime
+        self.onEvict = onEvict
+        self._open = {}
+        self._users = {}
+        self._lastUsed = {}
+
+    def __contains__(self, name):
+        return name in self.corpora
+
+    @property
+    def names(self):
+        return list(self.corpora.keys())
+
+    @property
+    def loaded(self):
+        return dict(self._open)
+
+    def _load(self, name):
+        paths = self.corpora[name]
+        if paths.get("Playable") and os.path.isfile(paths["Playable"]):
+            # Built by tools.validateCorpus. Only has words with definitions.
+            return WordCorpus(
+                paths["Playable"], compactionThreshold=self.compactionThreshold
+            )
+        return WordCorpus(
+            paths["Store"],
+            sourcePath=paths.get("Source"),
+            compactionThreshold=self.compactionThreshold,
+        )
+
+    def acquire(self, name):
+        """
+        Gets a corpus, opening it if it isn't open yet. It won't be closed
+        until every acquire() has been matched by a release().
+
+        Returns:
+        utils.wordCorpus.WordCorpus: The corpus.
+        """
+        if name not in self._open:
+            self._open[name] = self._load(name)
+            self._users[name] = 0
+        self._users[name] += 1
+        self._lastUsed[name] = time.monotonic()
+        return self._open[name]
+
+    def release(self, name):
+        """
+        Marks that a game has finished with a corpus.
+        """
+        if name in self._users:
+            self._users[name] = max(self._users[name] - 1, 0)
+            self._lastUsed[name] = time.monotonic()
+
+    def evictIdle(self):
+        """
+        Closes every corpus that isn't in use and hasn't been for idleTime
+        seconds. Pending removals stay in the corpus' removal log and are
+        applied again when it is next opened.
+        """
+        now = time.monotonic()
+        for name in list(self._open.keys()):
+            if (
+                self._users[name] == 0
+                and now - self._lastUsed[name] > self.idleTime
+                and not self._open[name].compacting
+            ):
+                self._close(name)
+
+    def _close(self, name, compact=False):
+        corpus = self._open.pop(name)
+        del self._users[name]
+        del self._lastUsed[name]
+        if compact and corpus.removedCount:
+            corpus.compactNow()
+        corpus.close()
+        if self.onEvict is not None:
+            self.onEvict(name)
+
+    async def closeAll(self):
+        """
+        Closes every open corpus, folding pending removals into its file.
+        Compactions in progress are finished first, as they read the mapped
+        file on a worker thread.
+        """
+        for name in list(self._open.keys()):
+            await self._open[name].waitForCompaction()
+            if name in self._open:
+                self._close(name, compact=True)
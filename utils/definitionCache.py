@@ -0,0 +1,254 @@
+import asyncio
+import json
+import time
+
+import aiohttp
+import aiosqlite
+
+PARTS_OF_SPEECH = {"n": "noun", "v": "verb", "adj": "adjective"}
+
+
+class WordsApiError(Exception):
+    """
+    Raised when the words API can't be reached or returns an error. Unlike a
+    missing definition, this isn't cached.
+    """
+
+
+def parseDefinitions(data):
+    """
+    Parses a Datamuse response into a list of definitions.
+
+    Parameters:
+    data (list): The decoded JSON response.
+
+    Returns:
+    list: Dicts with "partOfSpeech" and "definition" keys, or None if the
+    response has no definitions.
+    """
+    if data == [] or "defs" not in data[0]:
+        return None
+    details = []
+    for j in data[0]["defs"]:
+        d = {}
+        partOfSpeech, definition = tuple(j.split("\t", 1))
+        if partOfSpeech in PARTS_OF_SPEECH:
+            d["partOfSpeech"] = PARTS_OF_SPEECH[partOfSpeech]
+        d["definition"] = definition
+        details.append(d)
+    return details
+
+
+def parseFrequency(data):
+    """
+    Parses a word's frequency out of a Datamuse response requested with the
+    "f" metadata flag.
+
+    Returns:
+    float: Occurrences of the word per million words of text, or None if the
+    response doesn't say.
+    """
+    if data == []:
+        return None
+    for tag in data[0].get("tags", []):
+        if tag.startswith("f:"):
+            return float(tag[2:])
+    return None
+
+
+async def fetchDefinitions(session, apiUrl, word):
+    """
+    Looks up a word's definitions on the words API.
+
+    Parameters:
+    session (aiohttp.ClientSession): Session to make the GET request from
+    apiUrl (string): URL template with a {word} placeholder
+    word (string): The word to look up
+
+    Raises:
+    WordsApiError: If the request fails.
+
+    Returns:
+    tuple: (details, frequency), where details is the word's definitions or
+    None if it has none, and frequency is as returned by parseFrequency.
+    """
+    url = apiUrl.replace("{word}", word)
+    try:
+        async with session.get(url) as response:
+            if response.status != 200:
+                raise WordsApiError(f"{url} returned {response.status}")
+            data = await response.json()
+    except aiohttp.ClientError as e:
+        raise WordsApiError(str(e)) from e
+    return parseDefinitions(data), parseFrequency(data)
+
+
+class DefinitionCache(object):
+    """
+    An on-disk cache of word definitions, shared by every channel. Words
+    without definitions are cached too, for a shorter time. Concurrent lookups
+    of the same word share a single request.
+    """
+
+    def __init__(self, path, apiUrl, ttl, negativeTtl):
+        """
+        Parameters:
+        path (string): Path to the SQLite database.
+        apiUrl (string): Words API URL template with a {word} placeholder.
+        ttl (int): Seconds to keep definitions for.
+        negativeTtl (int): Seconds to remember that a word has no definitions.
+        """
+        self.path = path
+        self.apiUrl = apiUrl
+        self.ttl = ttl
+        self.negativeTtl = negativeTtl
+        self.hits = 0
+        self.misses = 0
+        self._db = None
+        self._session = None
+        self._openLock = asyncio.Lock()
+        self._inFlight = {}
+
+    async def _connect(self):
+        async with self._openLock:
+            if self._db is None:
+                db = await aiosqlite.connect(self.path)
+                await db.execute(
+                    "CREATE TABLE IF NOT EXISTS definitions ("
+                    "word TEXT PRIMARY KEY, details TEXT, fetchedAt REAL NOT NULL, "
+                    "frequency REAL)"
+                )
+                async with db.execute("PRAGMA table_info(definitions)") as cursor:
+                    columns = [row[1] for row in await cursor.fetchall()]
+                if "frequency" not in columns:
+                    await db.execute("ALTER TABLE definitions ADD frequency REAL")
+                await db.commit()
+                self._db = db
+        return self._db
+
+    async def lookup(self, word):
+        """
+        Reads a word from the cache without going to the network.
+
+        Returns:
+        tuple: (found, details), where details is None for a cached negative.
+        """
+        db = await self._connect()
+        async with db.execute(
+            "SELECT details, fetchedAt FROM definitions WHERE word = ?", (word,)
+        ) as cursor:
+            row = await cursor.fetchone()
+        if row is None:
+            return False, None
+        details, fetchedAt = row
+        ttl = self.ttl if details is not None else self.negativeTtl
+        if time.time() - fetchedAt > ttl:
+            return False, None
+        return True, None if details is None else json.loads(details)
+
+    async def store(self, word, details, frequency=None, commit=True):
+        """
+        Writes a word's definitions, or None if it has none, to the cache.
+
+        Parameters:
+        word (string): The word
+        details (list): The word's definitions, or None if it has none
+        frequency (float): Occurrences of the word per million words, if known
+        commit (bool): Whether to commit straight away. Bulk writers can pass
+            False and call commit() themselves.
+        """
+        db = await self._connect()
+        await db.execute(
+            "INSERT OR REPLACE INTO definitions (word, details, fetchedAt, frequency) "
+            "VALUES (?, ?, ?, ?)",
+            (
+                word,
+                None if details is None else json.dumps(details),
+                time.time(),
+                frequency,
+            ),
+        )
+        if commit:
+            await db.commit()
+
+    async def commit(self):
+        db = await self._connect()
+        await db.commit()
+
+    async def knownWords(self):
+        """
+        Reads every word that has an unexpired cache entry.
+
+        Returns:
+        dict: Word -> True if the word has definitions, False if it doesn't.
+        """
+        db = await self._connect()
+        now = time.time()
+        known = {}
+        async with db.execute(
+            "SELECT word, details IS NOT NULL, fetchedAt FROM definitions"
+        ) as cursor:
+            async for word, playable, fetchedAt in cursor:
+                ttl = self.ttl if playable else self.negativeTtl
+                if now - fetchedAt <= ttl:
+                    known[word] = bool(playable)
+        return known
+
+    async def frequencies(self):
+        """
+        Reads the frequency of every cached word that has one.
+
+        Returns:
+        dict: Word -> occurrences per million words of text.
+        """
+        db = await self._connect()
+        async with db.execute(
+            "SELECT word, frequency FROM definitions WHERE frequency IS NOT NULL"
+        ) as cursor:
+            return {word: frequency async for word, frequency in cursor}
+
+    async def get(self, word):
+        """
+        Gets a word's definitions, from the cache if possible.
+
+        Raises:
+        WordsApiError: If the word isn't cached and the request fails.
+
+        Returns:
+        list: The word's definitions, or None if it has none.
+        """
+        found, details = await self.lookup(word)
+        if found:
+            self.hits += 1
+            return details
+        if word not in self._inFlight:
+            self.misses += 1
+            self._inFlight[word] = asyncio.ensure_future(self._fetch(word))
+        return await asyncio.shield(self._inFlight[word])
+
+    async def _fetch(self, word):
+        try:
+            if self._session is None:
+                self._session = aiohttp.ClientSession()
+            details, frequency = await fetchDefinitions(
+                self._session, self.apiUrl, word
+            )
+            await self.store(word, details, frequency)
+            return details
+        finally:
+            del self._inFlight[word]
+
+    @property
+    def stats(self):
+        return f"{self.hits} hits, {self.misses} misses"
+
+    async def close(self):
+        """
+        Closes the HTTP session and the database.
+        """
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        if self._db is not None:
+            await self._db.close()
+            self._db = None
@@ -0,0 +1,133 @@
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+FORMATS = ("palette", "webp", "jpeg", "png")
+
+
+def extensionOf(data):
+    """
+    Returns:
+    string: The file extension of encoded image bytes.
+    """
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "webp"
+    if data[:2] == b"\xff\xd8":
+        return "jpg"
+    return "png"
+
+
+def psnr(original, encoded):
+    """
+    Returns:
+    float: The peak signal to noise ratio of an encoded image against the
+    original, in dB. Higher is closer, and identical images give infinity.
+    """
+    a = np.asarray(original, dtype=np.float32)
+    b = np.asarray(encoded.convert(original.mode), dtype=np.float32)
+    error = np.mean((a - b) ** 2)
+    if error == 0:
+        return float("inf")
+    return 10 * np.log10(255 ** 2 / error)
+
+
+class ImageEncoder(object):
+    """
+    Encodes generated images for upload, as small as a quality threshold
+    allows. Each of a list of formats is tried in turn, and the first one
+    that is close enough to the original is used. If none is, the image is
+    saved as a lossless PNG.
+
+    Formats:
+    palette: A PNG with at most 256 colours. Small and quick for flat images,
+        like silhouettes on the question background or the Garlic templates.
+    webp, jpeg: Lossy, for photos. JPEG is skipped for transparent images.
+    png: Lossless.
+    """
+
+    def __init__(self, formats=("png",), minPsnr=35, quality=85, compressLevel=6):
+        """
+        Parameters:
+        formats (sequence): Formats to try, in order
+        minPsnr (float): How close, in dB, a lossy encoding must be
+        quality (int): WebP and JPEG quality
+        compressLevel (int): zlib level of PNGs, from 1 (fastest) to 9
+            (smallest)
+        """
+        for format in formats:
+            if format not in FORMATS:
+                raise ValueError(f"Unknown image format {format}")
+        self.formats = tuple(formats)
+        self.minPsnr = minPsnr
+        self.quality = quality
+        self.compressLevel = compressLevel
+        # Changes whenever the encoder would encode something differently.
+        self.signature = f"{self.formats} {minPsnr} {quality} {compressLevel}"
+
+    @classmethod
+    def fromConfig(cls, settings):
+        """
+        Creates an encoder from an ImageEncoding config section.
+
+        Parameters:
+        settings (dict): With "Formats", and optionally "MinPsnr", "Quality"
+            and "CompressLevel"
+        """
+        settings = settings or {}
+        return cls(
+            settings.get("Formats", ("png",)),
+            minPsnr=float(settings.get("MinPsnr", 35)),
+            quality=int(settings.get("Quality", 85)),
+            compressLevel=int(settings.get("CompressLevel", 6)),
+        )
+
+    def encode(self, image):
+        """
+        Encodes an image.
+
+        Parameters:
+        image (PIL.Image.Image): The image
+
+        Returns:
+        bytes: The encoded image. extensionOf gives its file extension.
+        """
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+        transparent = (
+            image.mode == "RGBA" and image.getchannel("A").getextrema()[0] < 255
+        )
+        if not transparent:
+            image = image.convert("RGB")
+        for format in self.formats:
+            if format == "png":
+                break
+            if format == "jpeg" and transparent:
+                continue
+            data = self._encodeLossy(image, format)
+            if data is not None:
+                return data
+        return self._save(image, "PNG", compress_level=self.compressLevel)
+
+    def _encodeLossy(self, image, format):
+        if format == "palette":
+            encoded = image.quantize(
+                256, method=Image.Quantize.FASTOCTREE, dither=Image.Dither.NONE
+            )
+            if psnr(image, encoded) < self.minPsnr:
+                return None
+            return self._save(encoded, "PNG", compress_level=self.compressLevel)
+        if format == "webp":
+            data = self._save(image, "WEBP", quality=self.quality)
+        else:
+            # Full resolution colour, or the edges of coloured text blur.
+            data = self._save(image, "JPEG", quality=self.quality, subsampling=0)
+        with Image.open(BytesIO(data)) as encoded:
+            if psnr(image, encoded) < self.minPsnr:
+                return None
+        return data
+
+    def _save(self, image, format, **options):
+        output = BytesIO()
+        image.save(output, format, **options)
+        return output.getvalue()
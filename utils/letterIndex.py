@@ -0,0 +1,106 @@
+import random
+
+import numpy as np
+
+ALPHABET = 26
+
+
+def letterCounts(word):
+    """
+    Counts the occurrences of each letter from a to z in a word.
+
+    Returns:
+    numpy.ndarray: 26 letter counts.
+    """
+    letters = np.frombuffer(word.casefold().encode("ascii", "ignore"), np.uint8)
+    letters = letters[(letters >= ord("a")) & (letters <= ord("z"))] - ord("a")
+    return np.bincount(letters, minlength=ALPHABET).astype(np.uint8)
+
+
+class LetterCountIndex(object):
+    """
+    A matrix of letter counts, one row per corpus word, for finding every word
+    that can be built from a rack of letters with a single vectorized
+    comparison.
+    """
+
+    def __init__(self, corpus):
+        """
+        Builds the index. Words with anything other than the letters a to z are
+        left out.
+
+        Parameters:
+        corpus (utils.wordCorpus.WordCorpus): The corpus to index.
+        """
+        self.corpus = corpus
+        self.generation = corpus.generation
+        offsets = np.frombuffer(corpus.section("offsets"), np.uint32).astype(np.int64)
+        blob = np.frombuffer(corpus.section("words"), np.uint8)
+        self.lengths = np.diff(offsets)
+        wordIds = np.repeat(np.arange(corpus.wordCount), self.lengths)
+        letters = blob.astype(np.int64) - ord("a")
+        isLetter = (letters >= 0) & (letters < ALPHABET)
+        self.counts = (
+            np.bincount(
+                wordIds[isLetter] * ALPHABET + letters[isLetter],
+                minlength=corpus.wordCount * ALPHABET,
+            )
+            .reshape(corpus.wordCount, ALPHABET)
+            .astype(np.uint8)
+        )
+        nonLetters = np.bincount(wordIds[~isLetter], minlength=corpus.wordCount)
+        self.usable = nonLetters == 0
+
+    def subWords(self, rack, minLength=1):
+        """
+        Finds every live corpus word that can be built from the letters of a
+        rack, using each letter at most as many times as it appears.
+
+        Parameters:
+        rack (string): The letters available.
+        minLength (int): The shortest word to include.
+
+        Returns:
+        list: The words, casefolded.
+        """
+        mask = (self.counts <= letterCounts(rack)).all(axis=1)
+        mask &= self.usable & (self.lengths >= minLength)
+        return [
+            self.corpus.word(int(index)).casefold()
+            for index in np.flatnonzero(mask)
+            if not self.corpus.isRemoved(int(index))
+        ]
+
+    def makeRack(self, size, minLength=3, minAnswers=1, attempts=50):
+        """
+        Picks a rack of letters by shuffling a random corpus word of the given
+        length, trying again until the rack has enough answers.
+
+        Parameters:
+        size (int): The number of letters in the rack.
+        minLength (int): The shortest word that counts as an answer.
+        minAnswers (int): The fewest answers a rack may have.
+        attempts (int): How many racks to try before settling for the best.
+
+        Returns:
+        tuple: (rack, answers), where answers is a frozenset of words.
+        """
+        candidates = np.flatnonzero(self.usable & (self.lengths == size))
+        if len(candidates) == 0:
+            raise ValueError(f"No {size} letter words in the corpus")
+        best = None
+        for _ in range(attempts):
+            index = int(random.choice(candidates))
+            if self.corpus.isRemoved(index):
+                continue
+            rack = list(self.corpus.word(index).casefold())
+            random.shuffle(rack)
+            rack = "".join(rack)
+            answers = frozenset(self.subWords(rack, minLength))
+            if best is None or len(answers) > len(best[1]):
+                best = (rack, answers)
+            if len(answers) >= minAnswers:
+                break
+        if best is None:
+            raise ValueError(f"No {size} letter words in the corpus")
+        return best
@@ -0,0 +1,86 @@
+import asyncio
+import traceback
+from collections import deque
+
+
+class Lookahead(object):
+    """
+    Prepares a stream of items in the background, a few at a time and in
+    order, so that the next ones are ready by the time they are needed
+    without preparing the whole stream up front.
+    """
+
+    def __init__(self, prepare, items, size=3, name=None):
+        """
+        Parameters:
+        prepare (coroutine function): Called with each item. Returns the
+            prepared item, or None if the item should be skipped.
+        items (iterable): The items to prepare. May be endless.
+        size (int): How many items to prepare ahead of the one being used.
+        name (string): Name for the preparation tasks.
+        """
+        self.prepare = prepare
+        self.size = size
+        self.name = name
+        self._items = iter(items)
+        self._pending = deque()
+        self._exhausted = False
+
+    @property
+    def done(self):
+        """
+        True once every item has been handed out.
+        """
+        self._fill()
+        return self._exhausted and not self._pending
+
+    def _fill(self):
+        while not self._exhausted and len(self._pending) < self.size:
+            try:
+                item = next(self._items)
+            except StopIteration:
+                self._exhausted = True
+                return
+            task = asyncio.ensure_future(self.prepare(item))
+            if self.name is not None:
+                task.set_name(self.name)
+            self._pending.append(task)
+
+    def start(self):
+        """
+        Starts preparing the first items.
+        """
+        self._fill()
+
+    async def next(self):
+        """
+        Waits for the next prepared item and starts preparing another one in
+        its place.
+
+        Returns:
+        The prepared item, or None once the stream runs out.
+        """
+        self._fill()
+        while self._pending:
+            task = self._pending[0]
+            try:
+                result = await asyncio.shield(task)
+            except Exception:
+                # A failed item is skipped like one that couldn't be prepared.
+                traceback.print_exc()
+                result = None
+            finally:
+                if task.done():
+                    self._pending.popleft()
+                    self._fill()
+            if result is not None:
+                return result
+        return None
+
+    def cancel(self):
+        """
+        Stops preparing items.
+        """
+        self._exhausted = True
+        while self._pending:
+            self._pending.popleft().cancel()
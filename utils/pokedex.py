@@ -0,0 +1,277 @@
+import json
+import sqlite3
+import time
+
+import aiohttp
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pokemon (
+    id INTEGER PRIMARY KEY,
+    name TEXT,
+    types TEXT,
+    descriptions TEXT,
+    fetchedAt REAL NOT NULL,
+    names TEXT
+);
+CREATE TABLE IF NOT EXISTS regions (
+    name TEXT PRIMARY KEY,
+    start INTEGER NOT NULL,
+    end INTEGER NOT NULL,
+    bitmap BLOB NOT NULL
+);
+"""
+
+
+class PokeApiError(Exception):
+    """
+    Raised when PokeAPI can't be reached or returns an error. Unlike a
+    Pokemon that doesn't exist, this isn't recorded in the Pokédex.
+    """
+
+
+def parsePokemon(data):
+    """
+    Parses a PokeAPI /pokemon/{id} response.
+
+    Returns:
+    tuple: (name, typeList), with the types in slot order.
+    """
+    name = data["species"]["name"].replace("-", " ").capitalize()
+    typeList = {}
+    for i in data["types"]:
+        typeList[str(i["slot"])] = i["type"]["name"]
+    return name, [typeList[key] for key in sorted(typeList.keys())]
+
+
+def parseSpecies(data):
+    """
+    Parses a PokeAPI /pokemon-species/{id} response.
+
+    Returns:
+    list: The English Pokédex entries, without repeats.
+    """
+    descriptionList = []
+    for i in data["flavor_text_entries"]:
+        if i["language"]["name"] == "en":
+            description = i["flavor_text"].replace("\n", " ")
+            if description not in descriptionList:
+                descriptionList.append(description)
+    return descriptionList
+
+
+def parseNames(data):
+    """
+    Parses the names of a PokeAPI /pokemon-species/{id} response.
+
+    Returns:
+    dict: Language -> the Pokemon's name in that language.
+    """
+    return {i["language"]["name"]: i["name"] for i in data.get("names", [])}
+
+
+async def fetchJson(session, url):
+    """
+    Sends a GET request to PokeAPI.
+
+    Raises:
+    PokeApiError: If the request fails.
+
+    Returns:
+    The decoded JSON response, or None if the resource doesn't exist.
+    """
+    try:
+        async with session.get(url) as response:
+            if response.status == 404:
+                return None
+            if response.status != 200:
+                raise PokeApiError(f"{url} returned {response.status}")
+            return await response.json()
+    except aiohttp.ClientError as e:
+        raise PokeApiError(f"Couldn't reach {url}: {e}") from e
+
+
+async def fetchEntry(session, dataApi, speciesApi, id):
+    """
+    Fetches everything the game needs to know about a Pokemon.
+
+    Parameters:
+    session (aiohttp.ClientSession): Session to make the GET requests from
+    dataApi (string): URL template of /pokemon/{id}
+    speciesApi (string): URL template of /pokemon-species/{id}
+    id (int): The Pokemon's ID
+
+    Raises:
+    PokeApiError: If a request fails.
+
+    Returns:
+    tuple: (name, typeList, descriptionList, names), or None if the Pokemon
+    doesn't exist.
+    """
+    data = await fetchJson(session, dataApi.replace("{id}", str(id)))
+    if data is None:
+        return None
+    speciesData = await fetchJson(session, speciesApi.replace("{id}", str(id)))
+    if speciesData is None:
+        return None
+    name, typeList = parsePokemon(data)
+    return name, typeList, parseSpecies(speciesData), parseNames(speciesData)
+
+
+class Pokedex(object):
+    """
+    A local SQLite copy of the Pokemon data the game uses, built by
+    tools.importPokedex, with a bitmap per region of the IDs that have
+    everything a question needs.
+    """
+
+    def __init__(self, path):
+        """
+        Parameters:
+        path (string): Path of the SQLite database. Created if it doesn't exist.
+        """
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+        columns = [row[1] for row in self.db.execute("PRAGMA table_info(pokemon)")]
+        if "names" not in columns:
+            # Pokédexes from before names were kept. Their Pokemon are fetched
+            # again by the next tools.importPokedex run.
+            self.db.execute("ALTER TABLE pokemon ADD COLUMN names TEXT")
+        self._regions = {}
+
+    def store(self, id, entry, commit=True):
+        """
+        Stores a Pokemon.
+
+        Parameters:
+        id (int): The Pokemon's ID
+        entry (tuple): (name, typeList, descriptionList, names) from
+            fetchEntry, or None to record that the Pokemon doesn't exist.
+        commit (boolean): Whether to commit straight away.
+        """
+        if entry is None:
+            row = (id, None, None, None, time.time(), None)
+        else:
+            name, typeList, descriptionList, names = entry
+            row = (
+                id,
+                name,
+                json.dumps(typeList),
+                json.dumps(descriptionList),
+                time.time(),
+                json.dumps(names),
+            )
+        self.db.execute(
+            "INSERT OR REPLACE INTO pokemon "
+            "(id, name, types, descriptions, fetchedAt, names) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            row,
+        )
+        if commit:
+            self.db.commit()
+
+    def commit(self):
+        self.db.commit()
+
+    def checkedIds(self):
+        """
+        Returns:
+        set: Every ID that has been fetched, whether or not it exists.
+        """
+        return {
+            row[0]
+            for row in self.db.execute(
+                "SELECT id FROM pokemon WHERE name IS NULL OR names IS NOT NULL"
+            )
+        }
+
+    def get(self, id):
+        """
+        Looks up a Pokemon.
+
+        Returns:
+        dict: The Pokemon's "id", "name", "typeList", "descriptionList" and
+        "names", or None if it isn't in the Pokédex.
+        """
+        row = self.db.execute(
+            "SELECT name, types, descriptions, names FROM pokemon WHERE id = ?",
+            (id,),
+        ).fetchone()
+        if row is None or row[0] is None:
+            return None
+        return {
+            "id": id,
+            "name": row[0],
+            "typeList": json.loads(row[1]),
+            "descriptionList": json.loads(row[2]),
+            "names": json.loads(row[3] or "{}"),
+        }
+
+    def allNames(self):
+        """
+        Returns:
+        generator: (id, name, names) of every Pokemon in the Pokédex.
+        """
+        for id, name, names in self.db.execute(
+            "SELECT id, name, names FROM pokemon WHERE name IS NOT NULL"
+        ):
+            yield id, name, json.loads(names or "{}")
+
+    def buildRegions(self, regions):
+        """
+        Works out which IDs of each region can be asked about, i.e. have a
+        name, types and at least one Pokédex entry, and stores them as bitmaps.
+
+        Parameters:
+        regions (dict): Region name -> dict with "start" and "end" IDs, as in
+            the RegionWiseDex config.
+
+        Returns:
+        dict: Region name -> number of usable IDs.
+        """
+        usable = {
+            row[0]
+            for row in self.db.execute(
+                "SELECT id FROM pokemon WHERE name IS NOT NULL "
+                "AND types != '[]' AND descriptions != '[]'"
+            )
+        }
+        counts = {}
+        for region, bounds in regions.items():
+            start, end = bounds["start"], bounds["end"]
+            bitmap = bytearray((end - start) // 8 + 1)
+            counts[region] = 0
+            for id in range(start, end + 1):
+                if id in usable:
+                    bitmap[(id - start) >> 3] |= 1 << ((id - start) & 7)
+                    counts[region] += 1
+            self.db.execute(
+                "INSERT OR REPLACE INTO regions VALUES (?, ?, ?, ?)",
+                (region, start, end, bytes(bitmap)),
+            )
+        self.db.commit()
+        self._regions = {}
+        return counts
+
+    def regionIds(self, region):
+        """
+        Returns:
+        tuple: The IDs of a region that can be asked about, or None if the
+        region hasn't been built.
+        """
+        if region not in self._regions:
+            row = self.db.execute(
+                "SELECT start, end, bitmap FROM regions WHERE name = ?", (region,)
+            ).fetchone()
+            if row is None:
+                return None
+            start, end, bitmap = row
+            self._regions[region] = tuple(
+                id
+                for id in range(start, end + 1)
+                if bitmap[(id - start) >> 3] & (1 << ((id - start) & 7))
+            )
+        return self._regions[region]
+
+    def close(self):
+        self.db.close()
@@ -0,0 +1,80 @@
+import unicodedata
+
+# Characters that don't decompose into letters, spelled out.
+SPELLINGS = str.maketrans({"♀": "f", "♂": "m", "ß": "ss", "æ": "ae", "œ": "oe"})
+
+# Other names players use, keyed by the normalized English name.
+ALIASES = {
+    "nidoranf": ["nidoran", "nidoran female"],
+    "nidoranm": ["nidoran", "nidoran male"],
+    "mrmime": ["mister mime"],
+    "mimejr": ["mime junior"],
+    "mrrime": ["mister rime"],
+    "typenull": ["type 0"],
+}
+
+
+def normalizeName(text):
+    """
+    Reduces a name to lowercase letters and digits, so that accents,
+    punctuation, gender symbols and spacing don't matter.
+
+    Returns:
+    string: The normalized name.
+    """
+    text = unicodedata.normalize("NFKD", text.casefold().translate(SPELLINGS))
+    return "".join(c for c in text if c.isalnum() and not unicodedata.combining(c))
+
+
+class NameIndex(object):
+    """
+    The names each Pokemon can be answered with, normalized ahead of time,
+    so an answer is checked with a single lookup.
+    """
+
+    def __init__(self, languages=("en",)):
+        """
+        Parameters:
+        languages (sequence): Languages whose names are accepted
+        """
+        self.languages = set(languages)
+        # Normalized name -> set of IDs it answers.
+        self._ids = {}
+        self._indexed = set()
+
+    def __contains__(self, id):
+        return id in self._indexed
+
+    def add(self, id, name, names=None):
+        """
+        Indexes the names of a Pokemon.
+
+        Parameters:
+        id (int): The Pokemon's ID
+        name (string): Its name, as parsePokemon gives it
+        names (dict): Language -> its name in that language
+        """
+        names = names or {}
+        accepted = [name]
+        accepted.extend(
+            localName
+            for language, localName in names.items()
+            if language in self.languages
+        )
+        english = normalizeName(names.get("en", name))
+        accepted.extend(ALIASES.get(english, []))
+        for answer in accepted:
+            normalized = normalizeName(answer)
+            if normalized:
+                self._ids.setdefault(normalized, set()).add(id)
+        self._indexed.add(id)
+
+    def matches(self, id, text):
+        """
+        Returns:
+        boolean: Whether a message names a Pokemon.
+        """
+        return id in self._ids.get(normalizeName(text), ())
+
+    def __len__(self):
+        return len(self._ids)
@@ -0,0 +1,424 @@
+import asyncio
+import traceback
+
+import discord
+from utils.log import log
+
+
+def avatarUrl(user):
+    """
+    Returns the URL of a user's avatar.
+    """
+    return (
+        "https://cdn.discordapp.com/avatars/"
+        + str(user.id)
+        + "/"
+        + str(user.avatar)
+        + ".png"
+    )
+
+
+class ChannelGame(object):
+    """
+    The state of a quiz game in one channel. Games add the state they need
+    by subclassing this with their own __slots__.
+    """
+
+    __slots__ = (
+        "channel",
+        "scores",
+        "players",
+        "questionNumber",
+        "answer",
+        "question",
+        "message",
+        "questions",
+        "tasks",
+    )
+
+    def __init__(self, channel):
+        """
+        Parameters:
+        channel (discord.TextChannel): The channel the game is played in
+        """
+        self.channel = channel
+        # User ID -> points, and user ID -> (name, avatar URL) for the scoreboard.
+        self.scores = {}
+        self.players = {}
+        self.questionNumber = 0
+        # The answer to the current question. None while no answer is accepted.
+        self.answer = None
+        # The embed of the current question, which hints are added to.
+        self.question = None
+        # The message the current question was sent in. Hints edit it.
+        self.message = None
+        # utils.lookahead.Lookahead of prepared questions.
+        self.questions = None
+        # Tasks started for the game, cancelled when it ends.
+        self.tasks = set()
+
+    def addPoint(self, user):
+        """
+        Gives a user a point.
+
+        Parameters:
+        user (discord.User): The user
+        """
+        self.scores[user.id] = self.scores.get(user.id, 0) + 1
+        self.players[user.id] = (user.name, avatarUrl(user))
+
+    def ranking(self):
+        """
+        Returns:
+        list: (user ID, points) tuples, highest points first.
+        """
+        return sorted(self.scores.items(), key=lambda x: x[1], reverse=True)
+
+
+class QuizEngine(object):
+    """
+    Runs question and answer games: asks the prepared questions one by one,
+    gives hints, checks answers, keeps score and cleans up when a game ends.
+
+    The game itself is supplied by a provider, which must have these methods:
+
+    newGame(channel): Returns a new ChannelGame (or subclass) for a channel.
+    setQuestion(game, item): Makes a prepared item the current question.
+        Sets game.answer and game.question, and returns the keyword
+        arguments to send the question with.
+    questionSent(game): Called once the question is sent, with game.message
+        set.
+    isCorrect(game, text): Whether a message answers the current question.
+    answerEmbed(game, message, answer): The embed sent when a message
+        answers the question.
+    revealEmbed(game, answer): The embed sent when the answer is revealed.
+    nextHint(game): Adds the next hint to game.question. Returns None if
+        there are no more hints, otherwise (changed, waitTime) where changed
+        is whether game.question was changed, so the question message needs
+        editing, or the keyword arguments to send the question again with if
+        it has a new file to upload, as editing can't upload files. waitTime
+        is the seconds until the next hint, or None if this was the last one.
+    endGame(game): Called when a game ends, to release anything it holds.
+    """
+
+    def __init__(self, provider, config, name):
+        """
+        Parameters:
+        provider (object): Supplies the questions, see above
+        config (utils.configManager.Config): Config with the game's timings
+        name (string): Name of the game, used for task names and logs
+        """
+        self.provider = provider
+        self.config = config
+        self.name = name
+        # Channel ID -> ChannelGame
+        self.games = {}
+
+    def get(self, channel):
+        """
+        Returns:
+        ChannelGame: The game running in a channel, or None.
+        """
+        return self.games.get(channel.id)
+
+    def newGame(self, channel):
+        """
+        Registers a new game in a channel.
+
+        Returns:
+        ChannelGame: The game.
+        """
+        game = self.provider.newGame(channel)
+        self.games[channel.id] = game
+        return game
+
+    def startTask(self, game, coroutine):
+        """
+        Runs a coroutine as one of a game's tasks.
+
+        Returns:
+        asyncio.Task: The task.
+        """
+        task = asyncio.create_task(coroutine)
+        task.set_name(self.name + "-" + str(game.channel.id))
+        game.tasks.add(task)
+        task.add_done_callback(game.tasks.discard)
+        return task
+
+    def cancelTasks(self, game):
+        """
+        Cancels every task of a game, except the one calling this.
+        """
+        current = asyncio.current_task()
+        for task in list(game.tasks):
+            if task is not current:
+                task.cancel()
+
+    def play(self, game, waitTime):
+        """
+        Starts asking a game's questions.
+
+        Parameters:
+        game (ChannelGame): The game, with game.questions set
+        waitTime (int): Seconds to wait before the first question
+        """
+        self.startTask(game, self.askQuestion(game, waitTime))
+        log(game.channel.id, self.name.capitalize() + " game started.")
+
+    def nextQuestion(self, game):
+        self.startTask(
+            game, self.askQuestion(game, waitTime=self.config.timeToNextQuestion)
+        )
+
+    async def askQuestion(self, game, waitTime=None):
+        """
+        Ask the next question.
+
+        Parameters:
+        game (ChannelGame): The game to ask the question in.
+        waitTime (int): Seconds to wait before asking the question.
+        """
+        if waitTime is None:
+            waitTime = self.config.timeToNextQuestion
+        try:
+            if game.questions.done:
+                await self.publishScores(game)
+                self.stopGame(game)
+                return
+
+            # The next question is prepared while the wait runs.
+            item, _ = await asyncio.gather(
+                game.questions.next(), asyncio.sleep(waitTime)
+            )
+            if item is None:
+                await self.publishScores(game)
+                self.stopGame(game)
+                return
+            message = self.provider.setQuestion(game, item)
+            game.questionNumber += 1
+            game.question.set_author(name="Question " + str(game.questionNumber))
+            await self.sendQuestion(game, message)
+            self.startTask(game, self.revealAnswer(game))
+            self.startTask(game, self.giveHint(game))
+        except asyncio.CancelledError:
+            log(game.channel.id, "askQuestion task was cancelled")
+
+    async def sendQuestion(self, game, message):
+        """
+        Sends the question message.
+
+        Parameters:
+        game (ChannelGame): The game to send the question in
+        message (dict): Keyword arguments to send it with
+        """
+        game.message = await game.channel.send(**message)
+        self.useUploadedImage(game)
+        self.provider.questionSent(game)
+
+    def useUploadedImage(self, game):
+        """
+        Points the question's image at the copy Discord keeps with the
+        question message, so that hints can edit the question without
+        uploading the image again.
+        """
+        image = game.question.image.url
+        if not isinstance(image, str) or not image.startswith("attachment://"):
+            return
+        if game.message.embeds:
+            uploaded = game.message.embeds[0].image.url
+            if isinstance(uploaded, str):
+                game.question.set_image(url=uploaded)
+
+    async def editQuestion(self, game):
+        """
+        Updates the question message with the hints in game.question.
+        """
+        try:
+            await game.message.edit(embed=game.question)
+        except discord.NotFound:
+            # Someone deleted the question, so ask it again.
+            game.message = await game.channel.send(embed=game.question)
+
+    async def revealAnswer(self, game, waitTime=None, reason="Time's up!"):
+        """
+        Reveal the answer to the current question.
+
+        Parameters:
+        game (ChannelGame): The game to reveal the answer in.
+        waitTime (int): Seconds to wait before revealing the answer.
+        reason (string): Reason why the answer is being revealed.
+        """
+        if waitTime is None:
+            waitTime = self.config.timePerQuestion
+        try:
+            await asyncio.sleep(waitTime)
+            answer = game.answer
+            game.answer = None
+            self.cancelTasks(game)
+            embed = self.provider.revealEmbed(game, answer)
+            embed.set_author(name=reason)
+            await game.channel.send(embed=embed)
+            self.nextQuestion(game)
+        except asyncio.CancelledError:
+            log(game.channel.id, "revealAnswer task was cancelled")
+
+    async def giveHint(self, game, waitTime=None):
+        """
+        Give the next hint for the question.
+
+        Parameters:
+        game (ChannelGame): The game to give the hint in.
+        waitTime (int): Seconds to wait before giving the hint.
+        """
+        if waitTime is None:
+            waitTime = self.config.timeToFirstHint
+        try:
+            await asyncio.sleep(waitTime)
+            if game.answer is None:
+                return
+            hint = self.provider.nextHint(game)
+            if hint is None:
+                return
+            changed, waitTime = hint
+            if isinstance(changed, dict):
+                await self.sendQuestion(game, changed)
+            elif changed:
+                await self.editQuestion(game)
+            if waitTime is not None:
+                self.startTask(game, self.giveHint(game, waitTime))
+        except asyncio.CancelledError:
+            log(game.channel.id, "giveHint task was cancelled")
+
+    def claimAnswer(self, game, message):
+        """
+        Checks if a message answers the current question and, if it does,
+        clears the answer so that no other message can claim it. There is no
+        await between the check and the claim, so the first correct message
+        always wins.
+
+        Parameters:
+        game (ChannelGame): The game in the message's channel
+        message (discord.Message): The message to check
+
+        Returns:
+        string: The claimed answer, or None if the message isn't correct or
+        the answer has already been claimed.
+        """
+        if game.answer is None:
+            return None
+        if not self.provider.isCorrect(game, message.content):
+            return None
+        answer = game.answer
+        game.answer = None
+        return answer
+
+    async def checkAnswer(self, game, message):
+        """
+        Scores a message if it answers the current question, and moves on to
+        the next one.
+
+        Parameters:
+        game (ChannelGame): The game in the message's channel
+        message (discord.Message): The message to check
+        """
+        answer = self.claimAnswer(game, message)
+        if answer is None:
+            return
+        game.addPoint(message.author)
+        embed = self.provider.answerEmbed(game, message, answer)
+        try:
+            self.cancelTasks(game)
+            self.nextQuestion(game)
+        except Exception as e:
+            log(game.channel.id, "Oopsie, exception: ", e)
+            traceback.print_exc()
+        # The answer has been claimed, so nothing else depends on these.
+        results = await asyncio.gather(
+            message.add_reaction("\N{THUMBS UP SIGN}"),
+            game.channel.send(embed=embed),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                log(game.channel.id, "Oopsie, exception: ", result)
+
+    def skip(self, game):
+        """
+        Reveals the answer to the current question straight away.
+        """
+        if game.answer is None:
+            return
+        self.cancelTasks(game)
+        self.startTask(
+            game, self.revealAnswer(game, waitTime=0, reason="Question skipped")
+        )
+
+    async def publishScores(self, game, gameEnded=True):
+        """
+        Publish the scores.
+
+        Parameters:
+        game (ChannelGame): The game to publish the scores of.
+        gameEnded (boolean): Whether the game is over
+        """
+        if not game.questionNumber:
+            return
+        scores = game.ranking()
+        nameString = ""
+        scoreString = ""
+        avatar = ""
+        if gameEnded:
+            winnerString = "Ruh-roh! No one got any points."
+        else:
+            winnerString = "No points so far."
+        if scores:
+            maxScore = scores[0][1]
+            if len(scores) == 1 or scores[0][1] != scores[1][1]:
+                name, avatar = game.players[scores[0][0]]
+                if gameEnded:
+                    winnerString = name + " won the game!"
+                else:
+                    winnerString = name + " is in the lead!"
+            else:
+                if gameEnded:
+                    winnerString = "It's a tie!"
+                else:
+                    winnerString = "It's tied at the top!"
+            for userId, score in scores:
+                name = game.players[userId][0]
+                percentage = str(round(score * 100 / game.questionNumber, 2))
+                if score == maxScore:
+                    nameString = nameString + "**" + name + "**\n"
+                    scoreString = scoreString + "**" + percentage + "**\n"
+                else:
+                    nameString = nameString + name + "\n"
+                    scoreString = scoreString + percentage + "\n"
+        embed = discord.Embed(title=winnerString, colour=discord.Colour.blue())
+        if gameEnded:
+            embed.set_author(name="Game over", icon_url=avatar)
+        else:
+            embed.set_author(name="Scores so far", icon_url=avatar)
+        if scores:
+            embed.add_field(name="Player", value=nameString)
+            embed.add_field(name="Score", value=scoreString)
+            embed.set_thumbnail(url=avatar)
+        await game.channel.send(embed=embed)
+
+    def stopGame(self, game):
+        """
+        Ends a game, cancelling its tasks and the questions being prepared.
+        """
+        self.cancelTasks(game)
+        if game.questions is not None:
+            game.questions.cancel()
+        self.provider.endGame(game)
+        if self.games.get(game.channel.id) is game:
+            del self.games[game.channel.id]
+        log(game.channel.id, self.name.capitalize() + " game ended.")
+
+    def stopAll(self):
+        """
+        Ends every game without publishing scores.
+        """
+        for game in list(self.games.values()):
+            self.stopGame(game)
@@ -0,0 +1,58 @@
+from collections import OrderedDict
+
+EMPTY = OrderedDict()
+
+
+class RecentPosts(object):
+    """
+    Remembers the last few posts sent in each channel, so they aren't sent
+    again soon.
+
+    Each channel keeps at most per_channel post IDs, oldest first, and at
+    most max_channels channels are kept, the ones that asked for a post
+    longest ago going first. So memory stays bounded however many channels
+    use the bot.
+    """
+
+    def __init__(self, per_channel=50, max_channels=2000):
+        """
+        Args:
+            per_channel (int): Posts remembered per channel.
+            max_channels (int): Channels remembered.
+        """
+        self.per_channel = per_channel
+        self.max_channels = max_channels
+        # Channel ID -> post IDs (keys only), least recently sent first.
+        self._channels = OrderedDict()
+
+    def __len__(self):
+        return len(self._channels)
+
+    def seen(self, channel_id):
+        """
+        Returns:
+            OrderedDict: The IDs of the posts the channel saw recently, as
+            keys, least recently sent first. Not to be changed.
+        """
+        return self._channels.get(channel_id, EMPTY)
+
+    def remember(self, channel_id, post_id):
+        """
+        Notes that a post was sent in a channel.
+        """
+        posts = self._channels.get(channel_id)
+        if posts is None:
+            posts = self._channels[channel_id] = OrderedDict()
+            if len(self._channels) > self.max_channels:
+                self._channels.popitem(last=False)
+        else:
+            self._channels.move_to_end(channel_id)
+        posts[post_id] = None
+        posts.move_to_end(post_id)
+        if len(posts) > self.per_channel:
+            posts.popitem(last=False)
+
+    @property
+    def stats(self):
+        posts = sum(len(posts) for posts in self._channels.values())
+        return f"{len(self)} channels, {posts} posts"
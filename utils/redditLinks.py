@@ -0,0 +1,52 @@
+import re
+
+# Rejects messages that can't have a Reddit link with a single scan.
+PREFILTER = re.compile(r"redd(?:it\.com|\.it)/", re.IGNORECASE)
+
+# Links to a submission on reddit.com or one of its subdomains, or redd.it
+# short links. The submission's ID is the first group.
+SUBMISSION_LINK = re.compile(
+    r"(?<![\w.-])(?:https?://)?"
+    r"(?:"
+    r"(?:(?:www|old|new|np|m)\.)?reddit\.com/(?:(?:r|u|user)/[\w-]+/)?comments/"
+    r"|redd\.it/"
+    r")"
+    r"([a-z0-9]{1,12})\b",
+    re.IGNORECASE,
+)
+
+
+def might_link_reddit(text: str) -> bool:
+    """
+    Cheaply checks whether text could have a Reddit link in it.
+
+    Args:
+        text (str): The text, usually a whole message.
+
+    Returns:
+        bool: False if it certainly doesn't.
+    """
+    return PREFILTER.search(text) is not None
+
+
+def find_submission_ids(text: str, limit: int = None) -> list:
+    """
+    Finds the Reddit submissions linked in some text.
+
+    Args:
+        text (str): The text, usually a whole message.
+        limit (int, optional): Most submissions to return.
+
+    Returns:
+        list: The IDs of the linked submissions, once each, in order.
+    """
+    ids = []
+    if not might_link_reddit(text):
+        return ids
+    for match in SUBMISSION_LINK.finditer(text):
+        submission_id = match.group(1).lower()
+        if submission_id not in ids:
+            ids.append(submission_id)
+            if limit is not None and len(ids) == limit:
+                break
+    return ids
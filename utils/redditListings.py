@@ -0,0 +1,249 @@
+import asyncio
+import random
+import time
+from collections import OrderedDict
+
+
+class PostRecord(object):
+    """
+    What picking and sending a post from a listing needs, without the rest
+    of the submission.
+    """
+
+    __slots__ = (
+        "id",
+        "title",
+        "permalink",
+        "url",
+        "is_self",
+        "over_18",
+        "stickied",
+        "selftext_length",
+    )
+
+    def __init__(self, submission):
+        """
+        Args:
+            submission (asyncpraw.models.Submission): The post.
+        """
+        self.id = submission.id
+        self.title = submission.title
+        self.permalink = submission.permalink
+        self.url = submission.url
+        self.is_self = submission.is_self
+        self.over_18 = submission.over_18
+        self.stickied = submission.stickied
+        self.selftext_length = len(submission.selftext)
+
+
+class Listing(object):
+    """
+    The posts of a subreddit listing, as fetched at one time.
+    """
+
+    __slots__ = ("subreddit", "over_18", "posts", "fetched_at")
+
+    def __init__(self, subreddit, over_18, posts):
+        """
+        Args:
+            subreddit (str): The subreddit's display name.
+            over_18 (bool): Whether the subreddit is NSFW.
+            posts (list): A PostRecord per post.
+        """
+        self.subreddit = subreddit
+        self.over_18 = over_18
+        self.posts = posts
+        self.fetched_at = time.monotonic()
+
+    @property
+    def age(self):
+        return time.monotonic() - self.fetched_at
+
+
+def pick_post(listing, is_sfw, seen=()):
+    """
+    Picks a random post from a listing that is fit to send, and that the
+    channel hasn't seen recently. If the channel has seen every one, the one
+    it saw longest ago is picked.
+
+    Args:
+        listing (Listing): The listing.
+        is_sfw (bool): Whether the channel is SFW.
+        seen (iterable): IDs of the posts the channel saw recently, least
+            recently first.
+
+    Returns:
+        PostRecord: The post, or None if none is fit.
+    """
+    posts = [
+        post
+        for post in listing.posts
+        if not post.stickied
+        and post.selftext_length < 2000
+        and not (is_sfw and post.over_18)
+    ]
+    if not posts:
+        return None
+    unseen = [post for post in posts if post.id not in seen]
+    if unseen:
+        return random.choice(unseen)
+    by_id = {post.id: post for post in posts}
+    for post_id in seen:
+        if post_id in by_id:
+            return by_id[post_id]
+    return random.choice(posts)
+
+
+class ListingCache(object):
+    """
+    Keeps subreddit listings in memory, keyed by subreddit, sort and time
+    window.
+
+    A listing is served as is for ttl seconds. After that, it is still
+    served while it is younger than stale_ttl, but a fresh one is fetched
+    in the background for the next command. Older listings are fetched
+    again before answering. Concurrent fetches of a listing are shared.
+    Listings that are kept warm are refreshed in the background before they
+    get old, so they are always answered from memory.
+    """
+
+    def __init__(self, fetch, ttl=300, stale_ttl=1800, max_size=256, promote=None):
+        """
+        Args:
+            fetch (coroutine function): Called with a subreddit name, sort,
+                time window and whether nobody is waiting on it. Returns a
+                Listing.
+            ttl (float): Seconds a listing is fresh for.
+            stale_ttl (float): Seconds a listing may be served for at all.
+            max_size (int): Most listings kept. The least recently used
+                ones go first.
+            promote (function, optional): Called with a listing's subreddit,
+                sort and time window when a command starts waiting on a
+                background fetch of it.
+        """
+        self.fetch = fetch
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_size = max_size
+        self._listings = OrderedDict()
+        self._fetching = {}
+        # Keys of the fetches nobody is waiting on.
+        self._background = set()
+        self.promote = promote
+        self._refresher = None
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+
+    async def get(self, subreddit, sort, window=None):
+        """
+        Gets a listing.
+
+        Args:
+            subreddit (str): The subreddit's name.
+            sort (str): "hot" or "top".
+            window (str, optional): The time window of top listings.
+
+        Raises:
+            Exception: Whatever fetching the listing raises.
+
+        Returns:
+            Listing: The listing.
+        """
+        key = (subreddit.lower(), sort, window)
+        listing = self._listings.get(key)
+        if listing is not None and listing.age < self.stale_ttl:
+            self._listings.move_to_end(key)
+            if listing.age < self.ttl:
+                self.hits += 1
+            else:
+                self.stale_hits += 1
+                self.refresh(key, background=True)
+            return listing
+        self.misses += 1
+        return await asyncio.shield(self.refresh(key))
+
+    def refresh(self, key, background=False):
+        """
+        Starts fetching a listing, unless it's being fetched already.
+
+        Args:
+            key (tuple): The listing's subreddit, sort and time window.
+            background (bool): Whether nobody is waiting on it.
+
+        Returns:
+            asyncio.Task: The fetch.
+        """
+        if key not in self._fetching:
+            task = asyncio.ensure_future(self._fetch(key, background))
+            task.add_done_callback(self._fetched)
+            self._fetching[key] = task
+            if background:
+                self._background.add(key)
+        elif not background and key in self._background:
+            # Somebody is waiting on it now.
+            self._background.discard(key)
+            if self.promote is not None:
+                self.promote(*key)
+        return self._fetching[key]
+
+    def _fetched(self, task):
+        # Refreshes in the background have nobody else to report to.
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Couldn't fetch a Reddit listing: {task.exception()}")
+
+    async def _fetch(self, key, background):
+        try:
+            listing = await self.fetch(*key, background)
+        finally:
+            del self._fetching[key]
+            self._background.discard(key)
+        self.refreshes += 1
+        self._listings[key] = listing
+        self._listings.move_to_end(key)
+        while len(self._listings) > self.max_size:
+            self._listings.popitem(last=False)
+        return listing
+
+    def keep_warm(self, keys, interval=60):
+        """
+        Starts refreshing listings in the background, each one before it
+        stops being fresh.
+
+        Args:
+            keys (list): (subreddit, sort, window) of each listing.
+            interval (float): Seconds between checks.
+        """
+        self.stop()
+        keys = [(subreddit.lower(), sort, window) for subreddit, sort, window in keys]
+        self._refresher = asyncio.ensure_future(self._keep_warm(keys, interval))
+
+    async def _keep_warm(self, keys, interval):
+        while True:
+            for key in keys:
+                listing = self._listings.get(key)
+                if listing is not None and listing.age < self.ttl - interval:
+                    continue
+                try:
+                    # One at a time, so commands aren't kept waiting.
+                    await self.refresh(key, background=True)
+                except Exception:
+                    # Reported once the fetch is done. Tried again next time.
+                    pass
+            await asyncio.sleep(interval)
+
+    def stop(self):
+        """
+        Stops refreshing listings in the background.
+        """
+        if self._refresher is not None:
+            self._refresher.cancel()
+            self._refresher = None
+
+    @property
+    def stats(self):
+        return (
+            f"{self.hits} hits, {self.stale_hits} stale hits, {self.misses} misses, "
+            f"{self.refreshes} fetches, {len(self._listings)} listings"
+        )
@@ -0,0 +1,258 @@
+import asyncio
+import heapq
+import itertools
+import time
+from contextvars import ContextVar
+
+from asyncprawcore import Requestor
+
+# Requests made for a command someone is waiting on go before those made to
+# refresh caches in the background.
+INTERACTIVE = 0
+BACKGROUND = 1
+
+# The request the scheduler is running in the current task, if any.
+_request = ContextVar("reddit_request", default=None)
+
+
+class _Request(object):
+    __slots__ = ("priority", "parent", "task")
+
+    def __init__(self, priority, parent):
+        # None to follow the parent's.
+        self.priority = priority
+        # The request this one was made for, if any.
+        self.parent = parent
+        self.task = None
+
+    @property
+    def effective(self):
+        """
+        The request's priority, or that of the request it was made for if
+        it has none or that's higher.
+        """
+        if self.parent is None:
+            return self.priority
+        if self.priority is None:
+            return self.parent.effective
+        return min(self.priority, self.parent.effective)
+
+
+class RequestScheduler(object):
+    """
+    Coordinates the bot's calls to Reddit's API.
+
+    Identical calls made at once are merged into one. HTTP requests are
+    paced by a token bucket that holds up to burst requests and refills at
+    per_minute requests a minute. Waiting requests are sent interactive ones
+    first, then in the order they were made. Calls made while running
+    another call go at least as soon as it does, even if it's promoted
+    later. Reddit's rate limit headers slow the bucket down when the quota
+    left wouldn't last until it resets, and stop it once the quota runs out.
+    """
+
+    def __init__(self, per_minute=90, burst=10):
+        """
+        Args:
+            per_minute (float): Most requests sent a minute.
+            burst (int): Most requests sent at once after a quiet spell.
+        """
+        self.base_rate = per_minute / 60
+        self.rate = self.base_rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.refilled_at = time.monotonic()
+        # No requests are sent before this, as the quota has run out.
+        self.blocked_until = 0
+        self.remaining = None
+        # Heap of [priority, order, future, request] of HTTP requests waiting
+        # for a token, and the call they are made for.
+        self._waiting = []
+        self._order = itertools.count()
+        self._timer = None
+        self._requests = {}
+        self.calls = 0
+        self.merged = 0
+        self.sent = 0
+        self.queued = 0
+
+    async def request(self, key, call, priority=None):
+        """
+        Calls Reddit's API, unless an identical call is being made already,
+        in which case its result is shared.
+
+        Args:
+            key (hashable): Equal for identical calls.
+            call (coroutine function): Makes the call.
+            priority (int, optional): INTERACTIVE or BACKGROUND. By
+                default, calls made while running another call follow its
+                priority, and others are interactive.
+
+        Raises:
+            Exception: Whatever the call raises.
+
+        Returns:
+            object: What the call returns.
+        """
+        parent = _request.get()
+        if priority is None and parent is None:
+            priority = INTERACTIVE
+        request = self._requests.get(key)
+        if request is None:
+            self.calls += 1
+            request = self._requests[key] = _Request(priority, parent)
+            request.task = asyncio.ensure_future(self._run(key, request, call))
+        else:
+            self.merged += 1
+            if parent is not None:
+                # What the caller's own call would go at.
+                priority = _Request(priority, parent).effective
+            if priority < request.effective:
+                self._promote(request, priority)
+        return await asyncio.shield(request.task)
+
+    def promote(self, key, priority=INTERACTIVE):
+        """
+        Raises the priority of a call being made, and of the calls made
+        while running it, if it's lower.
+
+        Args:
+            key (hashable): The call's key.
+            priority (int): Its new priority.
+        """
+        request = self._requests.get(key)
+        if request is not None and priority < request.effective:
+            self._promote(request, priority)
+
+    async def _run(self, key, request, call):
+        _request.set(request)
+        try:
+            return await call()
+        finally:
+            del self._requests[key]
+
+    def _promote(self, request, priority):
+        request.priority = priority
+        # The calls made while running it may be waiting too.
+        for entry in self._waiting:
+            if entry[3] is not None:
+                entry[0] = entry[3].effective
+        heapq.heapify(self._waiting)
+
+    async def acquire(self):
+        """
+        Waits until an HTTP request may be sent.
+        """
+        self._refill()
+        if not self._waiting and self._may_send():
+            self.tokens -= 1
+            self.sent += 1
+            return
+        request = _request.get()
+        priority = INTERACTIVE if request is None else request.effective
+        future = asyncio.get_event_loop().create_future()
+        heapq.heappush(self._waiting, [priority, next(self._order), future, request])
+        self.queued += 1
+        self._release()
+        await future
+
+    def _may_send(self):
+        return self.tokens >= 1 and time.monotonic() >= self.blocked_until
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(
+            self.burst, self.tokens + (now - self.refilled_at) * self.rate
+        )
+        self.refilled_at = now
+
+    def _release(self):
+        """
+        Lets waiting requests go while there are tokens, and comes back when
+        the next one will be.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._refill()
+        while self._waiting and self._may_send():
+            future = heapq.heappop(self._waiting)[2]
+            if future.done():
+                # Its caller gave up.
+                continue
+            self.tokens -= 1
+            self.sent += 1
+            future.set_result(None)
+        if self._waiting:
+            delay = max(
+                self.blocked_until - time.monotonic(),
+                (1 - self.tokens) / self.rate,
+            )
+            self._timer = asyncio.get_event_loop().call_later(delay, self._release)
+
+    def update(self, headers):
+        """
+        Adjusts the pace to Reddit's rate limit headers.
+
+        Args:
+            headers (Mapping): The headers of a response from Reddit.
+        """
+        try:
+            remaining = float(headers["x-ratelimit-remaining"])
+            reset = float(headers["x-ratelimit-reset"])
+        except (KeyError, ValueError):
+            return
+        self._refill()
+        self.remaining = remaining
+        if remaining < 1:
+            self.tokens = 0
+            self.blocked_until = time.monotonic() + reset
+        else:
+            # Spread what's left of the quota over the time left until it
+            # resets, without going faster than configured.
+            self.rate = min(self.base_rate, remaining / max(reset, 1))
+            self.tokens = min(self.tokens, remaining)
+        if self._waiting:
+            self._release()
+
+    def close(self):
+        """
+        Stops letting waiting requests go.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    @property
+    def stats(self):
+        return (
+            f"{self.calls} calls, {self.merged} merged, {self.sent} requests sent, "
+            f"{self.queued} queued, {len(self._waiting)} waiting, "
+            f"{self.rate * 60:.0f} per minute, {self.remaining} remaining"
+        )
+
+
+class PacedRequestor(Requestor):
+    """
+    An asyncprawcore Requestor that sends API requests when a
+    RequestScheduler lets it, and tells it Reddit's rate limit headers.
+    Requests for access tokens don't count against the quota, so they are
+    sent straight away.
+    """
+
+    def __init__(self, *args, scheduler, **kwargs):
+        """
+        Args:
+            scheduler (RequestScheduler): Paces the requests.
+        """
+        super().__init__(*args, **kwargs)
+        self.scheduler = scheduler
+
+    async def request(self, *args, **kwargs):
+        url = args[1] if len(args) > 1 else kwargs.get("url", "")
+        if not str(url).startswith(self.oauth_url):
+            return await super().request(*args, **kwargs)
+        await self.scheduler.acquire()
+        response = await super().request(*args, **kwargs)
+        self.scheduler.update(response.headers)
+        return response
@@ -0,0 +1,258 @@
+import asyncio
+import multiprocessing
+import os
+import signal
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+
+from PIL import Image, ImageFont
+
+# Objects each worker process builds once and keeps, by key.
+_shared = {}
+
+
+def shared(key, factory, args):
+    """
+    Returns:
+    The object factory(*args) made the first time this process asked for key.
+    """
+    if key not in _shared:
+        _shared[key] = factory(*args)
+    return _shared[key]
+
+
+@lru_cache(maxsize=512)
+def loadFont(path, size):
+    """
+    Returns:
+    PIL.ImageFont.FreeTypeFont: A font, loaded once per process and size.
+    """
+    return ImageFont.truetype(path, size)
+
+
+def loadImage(path):
+    """
+    Returns:
+    PIL.Image.Image: A copy of an image, decoded once per process.
+    """
+    return shared("image " + path, _decode, (path,)).copy()
+
+
+def _decode(path):
+    image = Image.open(path)
+    image.load()
+    return image
+
+
+def preloadFont(path, sizes):
+    for size in sizes:
+        loadFont(path, size)
+
+
+def preloadImage(path):
+    loadImage(path)
+
+
+def _initWorker(preloads):
+    # Shutting down is up to the bot, not a Ctrl+C reaching every process.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    for function, args in preloads:
+        try:
+            function(*args)
+        except Exception:
+            traceback.print_exc()
+
+
+class RenderError(Exception):
+    """
+    Raised when a render job can't be run.
+    """
+
+
+class RenderQueueFull(RenderError):
+    """
+    Raised instead of queueing a job when too many are waiting already.
+    """
+
+
+class RenderTimeout(RenderError):
+    """
+    Raised when a render job takes longer than its timeout.
+    """
+
+
+class RenderService(object):
+    """
+    Runs image rendering jobs in a pool of worker processes, so Pillow and
+    NumPy work neither blocks the event loop nor competes with it for the GIL.
+
+    At most one job per worker runs at once. Others wait in a bounded queue,
+    and jobs that would make it longer are turned away with RenderQueueFull,
+    unless they ask to wait. A job that takes longer than its timeout raises
+    RenderTimeout, but keeps its worker until it finishes, as a process can't
+    be interrupted.
+
+    Workers start with the first job, or when start is called, and run every
+    preload first, so fonts and templates are ready before the first job
+    needs them. Functions and arguments of jobs have to be picklable.
+    """
+
+    def __init__(self, workers=None, queueSize=16, timeout=30):
+        """
+        Parameters:
+        workers (int): Worker processes. One per CPU by default.
+        queueSize (int): Jobs that may wait for a worker
+        timeout (float): Seconds a job may run for by default
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.queueSize = queueSize
+        self.timeout = timeout
+        self._preloads = []
+        self._pool = None
+        self._slots = None
+        self.queued = 0
+        self.running = 0
+        self.maxQueued = 0
+        self.completed = 0
+        self.failed = 0
+        self.timedOut = 0
+        self.rejected = 0
+        self.waitTime = 0
+        # Function name -> [jobs, total seconds, longest seconds].
+        self.renderTimes = {}
+
+    def preload(self, function, *args):
+        """
+        Has every worker call a function as it starts. Workers that are
+        already running don't.
+        """
+        self._preloads.append((function, args))
+
+    def start(self):
+        """
+        Starts the workers, if they aren't running.
+        """
+        if self._pool is None:
+            # The bot has threads of its own by now, and a forked worker
+            # could inherit a lock one of them held forever. Workers are
+            # forked from a clean server process instead.
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("forkserver"),
+                initializer=_initWorker,
+                initargs=(list(self._preloads),),
+            )
+            # Workers are only started for jobs, so a no-op each starts them
+            # all now.
+            for _ in range(self.workers):
+                self._pool.submit(int)
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.workers)
+
+    async def submit(self, function, *args, timeout=None, wait=False):
+        """
+        Runs a job in a worker.
+
+        Parameters:
+        function (callable): The job
+        args: The job's arguments
+        timeout (float): Seconds the job may run for, the service's by
+            default. Time spent in the queue doesn't count.
+        wait (boolean): Whether to wait for room in a full queue rather than
+            raise RenderQueueFull, for jobs nobody is waiting on yet
+
+        Raises:
+        RenderQueueFull: If the queue is full
+        RenderTimeout: If the job takes too long
+        RenderError: If the workers crashed
+        Exception: Whatever the job raises
+
+        Returns:
+        The job's result.
+        """
+        if timeout is None:
+            timeout = self.timeout
+        if self.queued >= self.queueSize and not wait:
+            self.rejected += 1
+            raise RenderQueueFull(f"{self.queued} render jobs are waiting already")
+        self.start()
+        queuedAt = time.perf_counter()
+        self.queued += 1
+        self.maxQueued = max(self.maxQueued, self.queued)
+        try:
+            await self._slots.acquire()
+        finally:
+            self.queued -= 1
+        startedAt = time.perf_counter()
+        self.waitTime += startedAt - queuedAt
+        self.running += 1
+        try:
+            future = asyncio.wrap_future(self._submit(function, args))
+        except BaseException:
+            self.running -= 1
+            self._slots.release()
+            raise
+        # The worker is only free once the job ends, even if the caller stops
+        # waiting for it.
+        future.add_done_callback(
+            lambda future: self._finished(function, startedAt, future)
+        )
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            self.timedOut += 1
+            raise RenderTimeout(f"{function.__qualname__} took over {timeout}s")
+        except BrokenProcessPool as e:
+            raise RenderError("A render worker crashed") from e
+
+    def _submit(self, function, args):
+        try:
+            return self._pool.submit(function, *args)
+        except BrokenProcessPool:
+            # A worker died, taking the pool with it. Jobs go to a new one.
+            self._pool.shutdown(wait=False)
+            self._pool = None
+            self.start()
+            return self._pool.submit(function, *args)
+
+    def _finished(self, function, startedAt, future):
+        self.running -= 1
+        self._slots.release()
+        if future.cancelled() or future.exception() is not None:
+            self.failed += 1
+            return
+        self.completed += 1
+        elapsed = time.perf_counter() - startedAt
+        times = self.renderTimes.setdefault(function.__qualname__, [0, 0, 0])
+        times[0] += 1
+        times[1] += elapsed
+        times[2] = max(times[2], elapsed)
+
+    async def shutdown(self):
+        """
+        Stops the workers, once the jobs they are running finish. The event
+        loop keeps running meanwhile.
+        """
+        if self._pool is not None:
+            pool, self._pool = self._pool, None
+            await asyncio.get_event_loop().run_in_executor(None, pool.shutdown)
+
+    @property
+    def stats(self):
+        started = self.completed + self.failed + self.running
+        wait = self.waitTime / started if started else 0
+        text = (
+            f"{self.completed} done, {self.failed} failed, "
+            f"{self.timedOut} timed out, {self.rejected} turned away, "
+            f"{self.queued} queued (at most {self.maxQueued}), "
+            f"{self.running} running, {wait * 1000:.0f} ms mean wait"
+        )
+        for name, (jobs, total, longest) in sorted(self.renderTimes.items()):
+            text += (
+                f"\n  {name}: {jobs} jobs, {total / jobs * 1000:.0f} ms mean, "
+                f"{longest * 1000:.0f} ms longest"
+            )
+        return text
@@ -0,0 +1,164 @@
+import numpy as np
+from PIL import Image
+from utils.imageEncoder import ImageEncoder
+
+# Pixelation of each stage, as the side of a block in pixels, coarsest first.
+REVEAL_BLOCK_SIZES = (48, 24, 12)
+REVEAL_SIZE = 768
+
+
+def revealKey(url, renderer):
+    """
+    Returns:
+    string: The sprite cache key of the reveal strip a renderer draws from the
+    artwork at a URL.
+    """
+    return "reveal " + url + " " + renderer.signature
+
+
+def stageKey(key, stage):
+    """
+    Returns:
+    string: The key of one stage of a reveal strip.
+    """
+    return key + " stage " + str(stage)
+
+
+class RevealRenderer(object):
+    """
+    Draws the stages of a "Who's that Pokémon?" reveal question: the artwork
+    pixelated less and less with each hint.
+
+    Every stage is the same artwork averaged over square blocks, so they are
+    made in one pass: the artwork is averaged over the smallest blocks once,
+    and each coarser stage averages that. The stages are kept at one pixel
+    per block, side by side in a small strip, and scaled up when served.
+    """
+
+    def __init__(self, size=REVEAL_SIZE, blockSizes=REVEAL_BLOCK_SIZES, encoder=None):
+        """
+        Parameters:
+        size (int): Side of the square the artwork is fitted into
+        blockSizes (sequence): Block side of each stage, coarsest first. Each
+            must divide size and be a multiple of the smallest.
+        encoder (utils.imageEncoder.ImageEncoder): Encodes the stages cut out
+            of strips. Lossless PNG by default.
+        """
+        finest = min(blockSizes)
+        for block in blockSizes:
+            if size % block or block % finest:
+                raise ValueError(
+                    f"Block size {block} doesn't fit a {size} pixel image "
+                    f"with {finest} pixel blocks"
+                )
+        self.size = size
+        self.blockSizes = tuple(blockSizes)
+        self.encoder = encoder or ImageEncoder()
+        # Changes whenever the renderer would draw something different.
+        self.signature = f"{size} {self.blockSizes} {self.encoder.signature}"
+
+    @property
+    def stageCount(self):
+        return len(self.blockSizes)
+
+    def fit(self, sprite):
+        """
+        Crops a sprite to its visible part and centres it in a size x size
+        square.
+
+        Raises:
+        ValueError: If the sprite is completely transparent.
+
+        Returns:
+        PIL.Image.Image: The square RGBA image.
+        """
+        with Image.open(sprite) as image:
+            if image.mode != "RGBA":
+                image = image.convert("RGBA")
+            bbox = image.getchannel("A").getbbox()
+            if bbox is None:
+                raise ValueError("The sprite is empty")
+            image = image.crop(bbox)
+        scale = min(self.size / image.width, self.size / image.height)
+        width = max(1, round(image.width * scale))
+        height = max(1, round(image.height * scale))
+        image = image.resize((width, height), Image.LANCZOS)
+        square = Image.new("RGBA", (self.size, self.size), (0, 0, 0, 0))
+        square.paste(image, ((self.size - width) // 2, (self.size - height) // 2))
+        return square
+
+    def pyramid(self, sprite):
+        """
+        Pixelates a sprite for every stage.
+
+        Parameters:
+        sprite (file-like object or string): The sprite, with transparency
+
+        Returns:
+        list: A PIL.Image.Image per stage, with a pixel per block.
+        """
+        pixels = np.asarray(self.fit(sprite), dtype=np.float32)
+        # Colours are weighted by alpha, so transparent pixels don't darken
+        # the blocks at the edge of the sprite.
+        pixels[..., :3] *= pixels[..., 3:] / 255
+        finest = min(self.blockSizes)
+        n = self.size // finest
+        base = pixels.reshape(n, finest, n, finest, 4).mean(axis=(1, 3))
+        stages = []
+        for block in self.blockSizes:
+            factor = block // finest
+            m = n // factor
+            level = base.reshape(m, factor, m, factor, 4).mean(axis=(1, 3))
+            alpha = level[..., 3:] / 255
+            level[..., :3] = np.divide(
+                level[..., :3],
+                alpha,
+                out=np.zeros_like(level[..., :3]),
+                where=alpha > 0,
+            )
+            level = np.clip(np.rint(level), 0, 255).astype(np.uint8)
+            stages.append(Image.fromarray(level, "RGBA"))
+        return stages
+
+    def renderToFile(self, sprite, fileName):
+        """
+        Draws every stage of a sprite and saves them side by side as a PNG.
+        """
+        stages = self.pyramid(sprite)
+        strip = Image.new(
+            "RGBA",
+            (
+                sum(stage.width for stage in stages),
+                max(stage.height for stage in stages),
+            ),
+        )
+        offset = 0
+        for stage in stages:
+            strip.paste(stage, (offset, 0))
+            offset += stage.width
+        strip.save(fileName, "PNG")
+
+    def stages(self, stripPath, which=None):
+        """
+        Cuts stages out of a strip saved by renderToFile and scales them up.
+
+        Parameters:
+        stripPath (string): The strip
+        which (sequence): The stages to cut, all of them by default
+
+        Returns:
+        dict: Stage -> the encoded stage.
+        """
+        if which is None:
+            which = range(self.stageCount)
+        images = {}
+        with Image.open(stripPath) as strip:
+            strip.load()
+            for stage in which:
+                offset = sum(self.size // block for block in self.blockSizes[:stage])
+                side = self.size // self.blockSizes[stage]
+                image = strip.crop((offset, 0, offset + side, side)).resize(
+                    (self.size, self.size), Image.NEAREST
+                )
+                images[stage] = self.encoder.encode(image)
+        return images
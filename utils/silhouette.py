@@ -0,0 +1,117 @@
+from PIL import Image
+from utils.imageEncoder import ImageEncoder
+from utils.renderService import shared
+
+# Where the silhouette goes on the background: left, top, right, bottom.
+SILHOUETTE_BOX = (225, 220, 975, 970)
+SILHOUETTE_COLOUR = (54, 57, 63)
+
+
+def artworkKey(url):
+    """
+    Returns:
+    string: The sprite cache key of the artwork at a URL.
+    """
+    return "artwork " + url
+
+
+def silhouetteKey(url, renderer):
+    """
+    Returns:
+    string: The sprite cache key of the question image a renderer draws from
+    the artwork at a URL.
+    """
+    return "silhouette " + url + " " + renderer.signature
+
+
+class SilhouetteRenderer(object):
+    """
+    Draws "Who's that Pokémon?" question images: a sprite's silhouette on the
+    question background.
+
+    The background is decoded once. Only the sprite's alpha band is cropped
+    and resized, and the silhouette colour is painted straight onto a copy of
+    the background through it, so no full colour copy of the sprite is made.
+    """
+
+    def __init__(
+        self,
+        backgroundPath,
+        box=SILHOUETTE_BOX,
+        colour=SILHOUETTE_COLOUR,
+        encoder=None,
+    ):
+        """
+        Parameters:
+        backgroundPath (string): Path of the background image
+        box (tuple): The area of the background the silhouette is fitted into
+        colour (tuple): RGB colour of the silhouette
+        encoder (utils.imageEncoder.ImageEncoder): Encodes the saved images.
+            Lossless PNG by default.
+        """
+        self.backgroundPath = backgroundPath
+        self.background = Image.open(backgroundPath)
+        self.background.load()
+        self.box = box
+        self.colour = colour
+        self.encoder = encoder or ImageEncoder()
+        # Changes whenever the renderer would draw something different.
+        self.signature = f"{backgroundPath} {box} {colour} {self.encoder.signature}"
+
+    @property
+    def sharedArgs(self):
+        """
+        Arguments of utils.renderService.shared that make this renderer.
+        """
+        return (
+            self.signature,
+            SilhouetteRenderer,
+            (self.backgroundPath, self.box, self.colour, self.encoder),
+        )
+
+    def __reduce__(self):
+        # Render workers make the renderer once and reuse it, rather than be
+        # sent the decoded background with every job.
+        return (shared, self.sharedArgs)
+
+    def render(self, sprite):
+        """
+        Draws a question image.
+
+        Parameters:
+        sprite (file-like object or string): The sprite, with transparency
+
+        Raises:
+        ValueError: If the sprite is completely transparent.
+
+        Returns:
+        PIL.Image.Image: The question image.
+        """
+        with Image.open(sprite) as image:
+            if image.mode != "RGBA":
+                image = image.convert("RGBA")
+            alpha = image.getchannel("A")
+        bbox = alpha.getbbox()
+        if bbox is None:
+            raise ValueError("The sprite is empty")
+        alpha = alpha.crop(bbox)
+        boxWidth = self.box[2] - self.box[0]
+        boxHeight = self.box[3] - self.box[1]
+        scale = min(boxWidth / alpha.width, boxHeight / alpha.height)
+        width = max(1, round(alpha.width * scale))
+        height = max(1, round(alpha.height * scale))
+        alpha = alpha.resize((width, height), Image.LANCZOS)
+        # Centred horizontally and standing on the bottom of the box.
+        left = self.box[0] + (boxWidth - width) // 2
+        top = self.box[3] - height
+        question = self.background.copy()
+        question.paste(self.colour, (left, top, left + width, top + height), alpha)
+        return question
+
+    def renderToFile(self, sprite, fileName):
+        """
+        Draws a question image and saves it with the renderer's encoder.
+        """
+        data = self.encoder.encode(self.render(sprite))
+        with open(fileName, "wb") as fp:
+            fp.write(data)
@@ -0,0 +1,168 @@
+import asyncio
+import hashlib
+import os
+import time
+import uuid
+from collections import OrderedDict
+
+# Files used this recently aren't evicted, as a game may still be sending them.
+EVICTION_GRACE = 600
+
+
+class SpriteCache(object):
+    """
+    An on-disk cache of images, kept under a byte budget by evicting the
+    least recently used files. Files are named by a hash of their key, and
+    the last time a file was used is kept as its modification time, so the
+    cache and its LRU order survive restarts.
+    """
+
+    def __init__(self, directory, maxBytes):
+        """
+        Parameters:
+        directory (string): Directory to keep the files in. Created if it
+            doesn't exist.
+        maxBytes (int): The most the files may add up to.
+        """
+        self.directory = directory
+        self.maxBytes = maxBytes
+        os.makedirs(directory, exist_ok=True)
+        # File name -> size, least recently used first.
+        self._files = OrderedDict()
+        self.size = 0
+        self._inFlight = {}
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    def _load(self):
+        files = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.endswith(".tmp"):
+                if time.time() - os.path.getmtime(path) > EVICTION_GRACE:
+                    # Left behind by a write that never finished.
+                    os.remove(path)
+                continue
+            stat = os.stat(path)
+            files.append((stat.st_mtime, name, stat.st_size))
+        for _, name, size in sorted(files):
+            self._files[name] = size
+            self.size += size
+
+    def fileName(self, key):
+        return hashlib.sha256(key.encode("utf-8")).hexdigest() + ".png"
+
+    def path(self, key):
+        """
+        Returns:
+        string: Where the file of a key is kept, whether or not it exists.
+        """
+        return os.path.join(self.directory, self.fileName(key))
+
+    def get(self, key):
+        """
+        Looks up a file and marks it as used.
+
+        Returns:
+        string: The path of the file, or None if it isn't cached.
+        """
+        name = self.fileName(key)
+        path = os.path.join(self.directory, name)
+        if name not in self._files:
+            # Another process, like tools.renderSilhouettes, may have added it.
+            if not os.path.isfile(path):
+                return None
+            self._files[name] = os.path.getsize(path)
+            self.size += self._files[name]
+        self._files.move_to_end(name)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            self.size -= self._files.pop(name)
+            return None
+        return path
+
+    def temporaryPath(self, key):
+        """
+        Returns:
+        string: A path to write the file of a key to before adding it with
+        commit. Concurrent writers get different paths.
+        """
+        return self.path(key) + "." + uuid.uuid4().hex + ".tmp"
+
+    def commit(self, key, temporaryPath):
+        """
+        Moves a finished file into the cache, replacing any file the key had.
+        The rename is atomic, so the file is never seen half written.
+
+        Returns:
+        string: The path of the file.
+        """
+        name = self.fileName(key)
+        path = os.path.join(self.directory, name)
+        os.replace(temporaryPath, path)
+        self.size -= self._files.pop(name, 0)
+        self._files[name] = os.path.getsize(path)
+        self.size += self._files[name]
+        self.evict()
+        return path
+
+    def evict(self):
+        """
+        Removes the least recently used files until the cache is within its
+        budget, leaving the ones used in the last EVICTION_GRACE seconds.
+        """
+        cutoff = time.time() - EVICTION_GRACE
+        for name in list(self._files.keys()):
+            if self.size <= self.maxBytes:
+                return
+            path = os.path.join(self.directory, name)
+            try:
+                if os.path.getmtime(path) > cutoff:
+                    # Everything after this was used more recently still.
+                    return
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            self.size -= self._files.pop(name)
+
+    async def getOrCreate(self, key, create):
+        """
+        Gets a file, making it if it isn't cached. Concurrent calls for the
+        same key share one create.
+
+        Parameters:
+        key (string): The key
+        create (coroutine function): Called with a temporary path to write
+            the file to. Returns False if the file couldn't be made.
+
+        Returns:
+        string: The path of the file, or None if it couldn't be made.
+        """
+        path = self.get(key)
+        if path is not None:
+            self.hits += 1
+            return path
+        if key not in self._inFlight:
+            self.misses += 1
+            self._inFlight[key] = asyncio.ensure_future(self._create(key, create))
+        return await asyncio.shield(self._inFlight[key])
+
+    async def _create(self, key, create):
+        temporaryPath = self.temporaryPath(key)
+        try:
+            if await create(temporaryPath) is False:
+                return None
+            return self.commit(key, temporaryPath)
+        finally:
+            del self._inFlight[key]
+            if os.path.exists(temporaryPath):
+                os.remove(temporaryPath)
+
+    @property
+    def stats(self):
+        return (
+            f"{self.hits} hits, {self.misses} misses, "
+            f"{len(self._files)} files, {self.size / 2 ** 20:.1f} MB"
+        )
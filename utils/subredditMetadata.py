@@ -0,0 +1,109 @@
+import asyncio
+import time
+
+
+class SubredditMetadata(object):
+    """
+    Remembers, in memory and in Mongo, whether subreddits exist, their
+    display names and whether they are NSFW, so commands can reply to typos,
+    banned subreddits and NSFW gating without asking Reddit.
+
+    Subreddits that exist are remembered for ttl seconds, and those that
+    don't for missing_ttl seconds, as they may be created or unbanned.
+    """
+
+    def __init__(self, collection, ttl=86400, missing_ttl=3600):
+        """
+        Args:
+            collection (pymongo.collection.Collection): Where the metadata is kept.
+            ttl (int): Seconds a subreddit that exists is remembered for.
+            missing_ttl (int): Seconds a subreddit that doesn't is remembered for.
+        """
+        self.collection = collection
+        self.ttl = ttl
+        self.missing_ttl = missing_ttl
+        # Lowercase name -> the subreddit's document.
+        self._subreddits = {}
+        self._loading = {}
+        self.hits = 0
+        self.misses = 0
+
+    def expired(self, document):
+        ttl = self.ttl if document["exists"] else self.missing_ttl
+        return document["checked_at"] + ttl < time.time()
+
+    def get(self, name):
+        """
+        Looks up what is known about a subreddit.
+
+        Returns:
+            dict: With "name", "exists", "display_name", "over_18" and
+            "checked_at", or None if it isn't known or has expired.
+        """
+        name = name.lower()
+        document = self._subreddits.get(name)
+        if document is None:
+            document = self.collection.find_one({"name": name}, {"_id": False})
+            if document is not None:
+                self._subreddits[name] = document
+        if document is None or self.expired(document):
+            return None
+        return document
+
+    def put(self, name, exists, display_name=None, over_18=False):
+        """
+        Remembers what Reddit said about a subreddit.
+
+        Returns:
+            dict: The subreddit's document.
+        """
+        document = {
+            "name": name.lower(),
+            "exists": exists,
+            "display_name": display_name or name,
+            "over_18": over_18,
+            "checked_at": time.time(),
+        }
+        self.collection.update_one(
+            {"name": document["name"]}, {"$set": document}, upsert=True
+        )
+        self._subreddits[document["name"]] = document
+        return document
+
+    async def lookup(self, name, load):
+        """
+        Looks up a subreddit, asking Reddit if it isn't known. Concurrent
+        lookups of a subreddit share one request.
+
+        Args:
+            name (str): The subreddit's name.
+            load (coroutine function): Called with the name. Returns the
+                display name and NSFW flag, or None if the subreddit doesn't
+                exist. Raises if Reddit can't be asked.
+
+        Returns:
+            dict: The subreddit's document.
+        """
+        document = self.get(name)
+        if document is not None:
+            self.hits += 1
+            return document
+        key = name.lower()
+        if key not in self._loading:
+            self.misses += 1
+            self._loading[key] = asyncio.ensure_future(self._load(name, load))
+        return await asyncio.shield(self._loading[key])
+
+    async def _load(self, name, load):
+        try:
+            loaded = await load(name)
+        finally:
+            del self._loading[name.lower()]
+        if loaded is None:
+            return self.put(name, False)
+        display_name, over_18 = loaded
+        return self.put(name, True, display_name, over_18)
+
+    @property
+    def stats(self):
+        return f"{self.hits} hits, {self.misses} misses"
@@ -0,0 +1,117 @@
+import textwrap
+from functools import lru_cache
+
+from PIL import Image, ImageDraw
+from utils.renderService import loadFont
+
+# Portion of the image's width the text is fitted to.
+TEXT_WIDTH = 0.8
+# Text is wrapped until its block is at least this tall for its width.
+MIN_ASPECT = 0.2
+# Wrapping never makes lines so short that they'd need a bigger font than this
+# to fill the image.
+MAX_WRAP_SIZE = 80
+# The size the wrap is chosen at. A block's shape barely changes with size.
+WRAP_SIZE = 40
+
+_measure = ImageDraw.Draw(Image.new("L", (1, 1)))
+
+
+def textSize(text, font, spacing=4):
+    """
+    Returns:
+    tuple: Width and height of a block of text.
+    """
+    left, top, right, bottom = _measure.multiline_textbbox(
+        (0, 0), text, font=font, spacing=spacing
+    )
+    return right, bottom
+
+
+class _Measure(object):
+    """
+    Estimates the size of wrapped text at one font size from the length of
+    each word, measured once, rather than laying out every glyph again.
+    """
+
+    def __init__(self, font, spacing=4):
+        self.font = font
+        self.lengths = {}
+        self.space = font.getlength(" ")
+        # How ImageDraw spaces lines.
+        self.lineHeight = font.getbbox("A")[3] + spacing
+        self.spacing = spacing
+
+    def lineLength(self, line):
+        total = self.space * line.count(" ")
+        for word in line.split(" "):
+            if word not in self.lengths:
+                self.lengths[word] = self.font.getlength(word)
+            total += self.lengths[word]
+        return total
+
+    def size(self, lines):
+        width = max(self.lineLength(line) for line in lines)
+        return width, len(lines) * self.lineHeight - self.spacing
+
+
+@lru_cache(maxsize=256)
+def layout(text, fontPath, imageWidth):
+    """
+    Wraps text into a block that isn't too flat, and finds the biggest font
+    it fits the image's width at. Both are found by binary search on measured
+    sizes, with fonts cached per size, and layouts are kept for repeated text.
+
+    Parameters:
+    text (string): The text
+    fontPath (string): Path of the font
+    imageWidth (int): Width of the image the text goes on
+
+    Returns:
+    tuple: The wrapped text and its font size.
+    """
+    measure = _Measure(loadFont(fontPath, WRAP_SIZE))
+
+    def flat(lines):
+        width, height = measure.size(lines)
+        return height < MIN_ASPECT * width
+
+    lines = text.split("\n")
+    if flat(lines):
+        # Lines as long as the image is wide at the biggest wrapping size,
+        # in characters, are the shortest wrap tried.
+        widest = loadFont(fontPath, MAX_WRAP_SIZE).getlength(text)
+        low = max(1, int(len(text) * imageWidth // max(1, widest)))
+        high = len(text)
+        lines = textwrap.wrap(text, low)
+        # The longest lines whose block isn't flat. Shorter lines only make
+        # the block taller.
+        while low < high:
+            middle = (low + high + 1) // 2
+            candidate = textwrap.wrap(text, middle)
+            if flat(candidate):
+                high = middle - 1
+            else:
+                low = middle
+                lines = candidate
+
+    # Lines keep their proportions at every size, so only the widest one is
+    # measured exactly while fitting.
+    widestLine = max(lines, key=measure.lineLength)
+    maxWidth = TEXT_WIDTH * imageWidth
+
+    def fits(size):
+        return textSize(widestLine, loadFont(fontPath, size))[0] <= maxWidth
+
+    # Double the size until the text is too wide, then narrow it down to the
+    # biggest size that fits.
+    low, high = 1, 2
+    while fits(high):
+        low, high = high, high * 2
+    while high - low > 1:
+        middle = (low + high) // 2
+        if fits(middle):
+            low = middle
+        else:
+            high = middle
+    return "\n".join(lines), low
@@ -0,0 +1,40 @@
+from io import BytesIO
+
+from PIL import Image, ImageDraw
+from utils.renderService import loadFont, loadImage
+from utils.textLayout import layout, textSize
+
+
+def renderPost(background, text, fontPath, colour, encoder, top=0.4, **options):
+    """
+    Wraps text, fits it to an image and draws it on. Meant to run in a render
+    service worker, where fonts and templates are loaded once.
+
+    Parameters:
+    background (string or bytes): Path of a template, or an encoded image
+    text (string): The text
+    fontPath (string): Path of the font
+    colour (string or tuple): Colour of the text
+    encoder (utils.imageEncoder.ImageEncoder): Encodes the post
+    top (float): Where the text goes, as the portion of the space left above
+        it
+    options: Passed on to PIL.ImageDraw.ImageDraw.text
+
+    Returns:
+    bytes: The encoded post.
+    """
+    if isinstance(background, str):
+        image = loadImage(background)
+    else:
+        image = Image.open(BytesIO(background))
+    draw = ImageDraw.Draw(image)
+    txt, fontsize = layout(text, fontPath, image.width)
+    font = loadFont(fontPath, fontsize)
+    w, h = textSize(txt, font, spacing=1)
+    left = (image.width - w) * 0.5
+    top = (image.height - h) * top
+
+    draw.text(
+        (left, top), txt, colour, font=font, spacing=50, **options
+    )  # put the text on the image
+    return encoder.encode(image)
@@ -0,0 +1,62 @@
+import time
+from collections import OrderedDict
+
+
+class TTLCache(object):
+    """
+    A bounded in-memory cache whose entries also expire. Once full, the least
+    recently used entry makes room for a new one.
+    """
+
+    def __init__(self, maxSize=1024, ttl=600):
+        """
+        Parameters:
+        maxSize (int): Most entries kept
+        ttl (float): Seconds entries are kept for by default
+        """
+        self.maxSize = maxSize
+        self.ttl = ttl
+        # Key -> (expiry, value), least recently used first.
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """
+        Returns:
+        The value of a key, or None if it isn't cached or has expired.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry[0] <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key, value, ttl=None):
+        """
+        Caches a value.
+
+        Parameters:
+        key: The key
+        value: The value. Not None, which get returns for missing keys.
+        ttl (float): Seconds to keep it for, the cache's by default
+        """
+        if ttl is None:
+            ttl = self.ttl
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxSize:
+            self._entries.popitem(last=False)
+
+    @property
+    def stats(self):
+        return f"{self.hits} hits, {self.misses} misses, {len(self)} entries"
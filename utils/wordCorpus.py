@@ -0,0 +1,502 @@
+import asyncio
+import bisect
+import math
+import mmap
+import os
+import random
+import struct
+from array import array
+
+MAGIC = b"WBCORPUS"
+VERSION = 1
+HEADER = struct.Struct("<8sHHI")
+SECTION = struct.Struct("<8sQQ")
+TIERS = ("easy", "medium", "hard")
+
+
+def signature(word):
+    """
+    Returns a word's letters in sorted order. Two words are anagrams of each
+    other if and only if they have the same signature.
+    """
+    return "".join(sorted(word.casefold()))
+
+
+def difficultyScore(word, frequency=None):
+    """
+    Scores how hard a word is to unscramble. Longer words are harder, and
+    so are rarer ones if the word's frequency is known.
+
+    Parameters:
+    word (string): The word
+    frequency (float): Occurrences of the word per million words of text
+
+    Returns:
+    float: The score. Lower is easier.
+    """
+    score = len(word)
+    if frequency is not None:
+        score -= 4 * math.log10(frequency + 0.01)
+    return score
+
+
+def samplingWeight(frequency=None):
+    """
+    How often a word is drawn from its tier, relative to the others.
+
+    Word frequencies are Zipfian, so drawing in proportion to them would
+    spend most draws on the few hundred commonest words. The weight is
+    1 + log(1 + frequency) instead: a word seen once per million words is
+    drawn about 1.7 times as often as one never seen, and one seen 10,000
+    times per million (like "the") only about 10 times as often. Words of
+    unknown frequency are weighted like one seen once per million.
+
+    Parameters:
+    frequency (float): Occurrences of the word per million words of text
+
+    Returns:
+    float: The weight.
+    """
+    if frequency is None or math.isnan(frequency):
+        frequency = 1.0
+    return 1.0 + math.log1p(max(frequency, 0.0))
+
+
+def tierSections(words, frequencies):
+    """
+    Splits the words into equal thirds by difficulty score, and builds a
+    cumulative weight array for each third so that words can be drawn from
+    it by their samplingWeight.
+
+    Returns:
+    dict: Section name -> bytes.
+    """
+    scores = [difficultyScore(word, frequencies.get(word)) for word in words]
+    order = sorted(range(len(words)), key=lambda i: (scores[i], i))
+    sections = {}
+    for n, tier in enumerate(TIERS):
+        indices = order[
+            n * len(order) // len(TIERS) : (n + 1) * len(order) // len(TIERS)
+        ]
+        weights = array("d")
+        total = 0.0
+        for i in sorted(indices):
+            total += samplingWeight(frequencies.get(words[i]))
+            weights.append(total)
+        sections["t:" + tier] = array("I", sorted(indices)).tobytes()
+        sections["w:" + tier] = weights.tobytes()
+    return sections
+
+
+def buildCorpusFile(words, path, sections=None, frequencies=None):
+    """
+    Writes a binary corpus file. The words are sorted and stored as one blob of
+    UTF-8 bytes along with an array of offsets into it, so that the file can be
+    memory-mapped and read without building a Python object per word. An
+    index of the words sorted by their letter signatures and the words in each
+    difficulty tier are stored alongside.
+
+    The file is written to a temporary path and renamed into place, so a reader
+    never sees a partially written corpus.
+
+    Parameters:
+    words (iterable): The words to store. Duplicates and blank lines are dropped.
+    path (string): Path to write the corpus file to.
+    sections (dict): Extra named sections (name -> bytes) to store in the file.
+    frequencies (dict): Word -> occurrences per million words, where known.
+        Used to sort the words into difficulty tiers.
+
+    Returns:
+    list: The sorted words, in the order they were stored.
+    """
+    words = sorted({word.strip() for word in words if word.strip()})
+    encoded = [word.encode("utf-8") for word in words]
+    offsets = array("I", [0])
+    for item in encoded:
+        offsets.append(offsets[-1] + len(item))
+    signatures = [signature(word) for word in words]
+    signatureOrder = array(
+        "I", sorted(range(len(words)), key=lambda i: (signatures[i], i))
+    )
+    allSections = {
+        "offsets": offsets.tobytes(),
+        "words": b"".join(encoded),
+        "sigorder": signatureOrder.tobytes(),
+    }
+    if frequencies is None:
+        frequencies = {}
+    else:
+        allSections["freq"] = array(
+            "f", [frequencies.get(word, math.nan) for word in words]
+        ).tobytes()
+    allSections.update(tierSections(words, frequencies))
+    if sections is not None:
+        allSections.update(sections)
+
+    tableSize = HEADER.size + SECTION.size * len(allSections)
+    position = tableSize
+    table = []
+    for name, data in allSections.items():
+        table.append(SECTION.pack(name.encode("ascii"), position, len(data)))
+        position += len(data)
+
+    tempPath = path + ".tmp"
+    with open(tempPath, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(allSections), len(encoded)))
+        for entry in table:
+            f.write(entry)
+        for data in allSections.values():
+            f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tempPath, path)
+    return words
+
+
+class WordCorpus(object):
+    """
+    A read-only, memory-mapped word list with tombstone deletes.
+
+    Removed words are marked in an in-memory bitmap and appended to a removal
+    log next to the corpus file, so they survive the process being killed. The
+    log is folded back into the corpus file by compact().
+    """
+
+    def __init__(self, path, sourcePath=None, compactionThreshold=100):
+        """
+        Parameters:
+        path (string): Path to the binary corpus file.
+        sourcePath (string): Path to a plain text word list, one word per line.
+            The binary file is (re)built from it if missing or out of date.
+        compactionThreshold (int): Number of logged removals after which
+            needsCompaction becomes True.
+        """
+        self.path = path
+        self.sourcePath = sourcePath
+        self.logPath = path + ".removed"
+        self.compactionThreshold = compactionThreshold
+        self._file = None
+        self._map = None
+        self._sections = {}
+        self._compacting = False
+        self._compacted = None
+        # Bumped whenever compaction renumbers the words.
+        self.generation = 0
+        if self._isStale():
+            with open(sourcePath) as fp:
+                buildCorpusFile(fp.read().splitlines(), path)
+        self._open()
+        self._removedWords = []
+        self.removedCount = 0
+        self._tombstones = bytearray((self.wordCount + 7) // 8)
+        if os.path.isfile(self.logPath):
+            with open(self.logPath, encoding="utf-8") as fp:
+                for word in fp.read().splitlines():
+                    self._tombstone(word)
+
+    def _isStale(self):
+        if not os.path.isfile(self.path):
+            return True
+        return (
+            self.sourcePath is not None
+            and os.path.isfile(self.sourcePath)
+            and os.path.getmtime(self.sourcePath) > os.path.getmtime(self.path)
+        )
+
+    def _open(self):
+        self._file = open(self.path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, sectionCount, self.wordCount = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{self.path} is not a corpus file")
+        view = memoryview(self._map)
+        for n in range(sectionCount):
+            name, offset, length = SECTION.unpack_from(
+                self._map, HEADER.size + n * SECTION.size
+            )
+            self._sections[name.rstrip(b"\0").decode("ascii")] = view[
+                offset : offset + length
+            ]
+        view.release()
+        self._offsets = self._sections["offsets"].cast("I")
+        self._blob = self._sections["words"]
+        if "sigorder" in self._sections:
+            self._signatureOrder = self._sections["sigorder"].cast("I")
+        else:
+            self._signatureOrder = array(
+                "I",
+                sorted(
+                    range(self.wordCount),
+                    key=lambda i: (signature(self.word(i)), i),
+                ),
+            )
+
+    def _close(self):
+        self._offsets.release()
+        if isinstance(self._signatureOrder, memoryview):
+            self._signatureOrder.release()
+        for section in self._sections.values():
+            section.release()
+        self._sections = {}
+        self._map.close()
+        self._file.close()
+
+    def close(self):
+        """
+        Unmaps the corpus file.
+        """
+        if self._map is not None:
+            self._close()
+            self._map = None
+
+    def section(self, name):
+        """
+        Returns a read-only memoryview over a named section of the corpus file,
+        or None if the file doesn't have that section.
+        """
+        return self._sections.get(name)
+
+    def __len__(self):
+        return self.wordCount - self.removedCount
+
+    def __contains__(self, word):
+        index = self.indexOf(word)
+        return index is not None and not self.isRemoved(index)
+
+    def word(self, index):
+        """
+        Returns the word stored at the given index.
+        """
+        return bytes(
+            self._blob[self._offsets[index] : self._offsets[index + 1]]
+        ).decode("utf-8")
+
+    def indexOf(self, word):
+        """
+        Binary searches the corpus for a word.
+
+        Returns:
+        int: The index of the word, or None if it isn't in the corpus.
+        """
+        target = word.encode("utf-8")
+        low, high = 0, self.wordCount
+        while low < high:
+            mid = (low + high) // 2
+            current = bytes(self._blob[self._offsets[mid] : self._offsets[mid + 1]])
+            if current < target:
+                low = mid + 1
+            elif current > target:
+                high = mid
+            else:
+                return mid
+        return None
+
+    def anagramsOf(self, word):
+        """
+        Finds every word in the corpus made up of exactly the same letters as
+        the given word, by binary searching the signature index.
+
+        Returns:
+        frozenset: The casefolded anagrams, including the word itself.
+        """
+        target = signature(word)
+        order = self._signatureOrder
+        low, high = 0, self.wordCount
+        while low < high:
+            mid = (low + high) // 2
+            if signature(self.word(order[mid])) < target:
+                low = mid + 1
+            else:
+                high = mid
+        anagrams = {word.casefold()}
+        while low < self.wordCount:
+            index = order[low]
+            candidate = self.word(index)
+            if signature(candidate) != target:
+                break
+            if not self.isRemoved(index):
+                anagrams.add(candidate.casefold())
+            low += 1
+        return frozenset(anagrams)
+
+    def isRemoved(self, index):
+        return bool(self._tombstones[index >> 3] & (1 << (index & 7)))
+
+    def _tombstone(self, word):
+        index = self.indexOf(word)
+        if index is None or self.isRemoved(index):
+            return False
+        self._tombstones[index >> 3] |= 1 << (index & 7)
+        self._removedWords.append(word)
+        self.removedCount += 1
+        return True
+
+    def remove(self, word):
+        """
+        Removes a word from the corpus. The removal is appended to the removal
+        log straight away so that it isn't lost if the process is killed.
+        """
+        if self._tombstone(word):
+            with open(self.logPath, "a", encoding="utf-8") as fp:
+                fp.write(word + "\n")
+                fp.flush()
+                os.fsync(fp.fileno())
+
+    def choice(self):
+        """
+        Picks a random word that hasn't been removed.
+        """
+        return self.sample(1)[0]
+
+    def _tierPicker(self, tier):
+        """
+        Returns a function that picks a random word index from a difficulty
+        tier, weighted by the cumulative weights stored in the corpus file.
+        """
+        indices = self._sections["t:" + tier].cast("I")
+        weights = self._sections["w:" + tier].cast("d")
+        total = weights[-1]
+
+        def pick():
+            position = bisect.bisect_right(weights, random.random() * total)
+            return indices[min(position, len(indices) - 1)]
+
+        return pick
+
+    def sample(self, k, exclude=(), tier=None):
+        """
+        Picks k distinct random words that haven't been removed. Removed words
+        are skipped by rejection, so this doesn't copy the corpus.
+
+        Parameters:
+        k (int): The number of words to pick.
+        exclude (collection): Words that must not be picked.
+        tier (string): A difficulty tier from TIERS to pick the words from, or
+            None to pick uniformly from the whole corpus.
+
+        Returns:
+        list: The picked words.
+        """
+        if k > len(self) - len(exclude):
+            raise ValueError("Sample larger than the corpus")
+        pick = lambda: random.randrange(self.wordCount)
+        if tier is not None and "t:" + tier in self._sections:
+            pick = self._tierPicker(tier)
+        attempts = 0
+        picked = set()
+        words = []
+        while len(words) < k:
+            attempts += 1
+            if attempts > 100 * k:
+                # The tier is running dry. Fill up from the whole corpus.
+                pick = lambda: random.randrange(self.wordCount)
+            index = pick()
+            if index in picked or self.isRemoved(index):
+                continue
+            picked.add(index)
+            word = self.word(index)
+            if word not in exclude:
+                words.append(word)
+        return words
+
+    def liveWords(self):
+        """
+        Generates every word in the corpus that hasn't been removed.
+        """
+        for index in range(self.wordCount):
+            if not self.isRemoved(index):
+                yield self.word(index)
+
+    @property
+    def compacting(self):
+        return self._compacting
+
+    @property
+    def needsCompaction(self):
+        return len(self._removedWords) >= self.compactionThreshold
+
+    def _writeCompacted(self, snapshot):
+        """
+        Writes the corpus without the first `snapshot` removed words and
+        renames it over the corpus file. The mapped copy stays valid until
+        _swap() reopens it, so this is safe to run on a worker thread.
+        """
+        removed = set(self._removedWords[:snapshot])
+        words = [
+            word
+            for word in map(self.word, range(self.wordCount))
+            if word not in removed
+        ]
+        frequencies = None
+        if "freq" in self._sections:
+            known = self._sections["freq"].cast("f")
+            frequencies = {
+                self.word(index): known[index]
+                for index in range(self.wordCount)
+                if not math.isnan(known[index])
+            }
+            known.release()
+        if self.sourcePath is not None:
+            tempPath = self.sourcePath + ".tmp"
+            with open(tempPath, "w") as f:
+                for item in words:
+                    f.write("%s\n" % item)
+            os.replace(tempPath, self.sourcePath)
+        buildCorpusFile(words, self.path, frequencies=frequencies)
+
+    def _swap(self, snapshot):
+        """
+        Switches over to the compacted corpus file. Removals that came in while
+        it was being written are tombstoned again and kept in the log.
+        """
+        pending = self._removedWords[snapshot:]
+        self._close()
+        self._open()
+        self.generation += 1
+        self._tombstones = bytearray((self.wordCount + 7) // 8)
+        self._removedWords = []
+        self.removedCount = 0
+        for word in pending:
+            self._tombstone(word)
+        tempPath = self.logPath + ".tmp"
+        with open(tempPath, "w", encoding="utf-8") as fp:
+            for word in pending:
+                fp.write(word + "\n")
+        os.replace(tempPath, self.logPath)
+
+    def compactNow(self):
+        """
+        Folds the removal log into the corpus file.
+        """
+        snapshot = len(self._removedWords)
+        if snapshot == 0:
+            return
+        self._writeCompacted(snapshot)
+        self._swap(snapshot)
+
+    async def compact(self, loop):
+        """
+        Folds the removal log into the corpus file, doing the heavy lifting on
+        the loop's default executor.
+
+        Parameters:
+        loop (asyncio.AbstractEventLoop): The event loop to run on.
+        """
+        snapshot = len(self._removedWords)
+        if snapshot == 0 or self._compacting:
+            return
+        self._compacting = True
+        self._compacted = loop.create_future()
+        try:
+            await loop.run_in_executor(None, self._writeCompacted, snapshot)
+            self._swap(snapshot)
+        finally:
+            self._compacting = False
+            self._compacted.set_result(None)
+
+    async def waitForCompaction(self):
+        """
+        Waits for the compaction in progress, if there is one, to finish.
+        """
+        if self._compacting:
+            await asyncio.shield(self._compacted)
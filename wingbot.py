@@ -9,6 +9,7 @@ from discord.ext import commands
 from dotenv import load_dotenv
 from utils.configManager import BotConfig
 from utils.help import HelpCommand
+from utils.renderService import RenderService
 
 load_dotenv()
 TOKEN = os.getenv("DISCORD_TOKEN")
@@ -16,10 +17,11 @@ MONGODB_CONNECTION_STRING = os.getenv("MONGODB_CONNECTION_STRING")
 config = BotConfig()
 bot = commands.Bot(command_prefix=config.commandPrefix, case_insensitive=True)
 
-db_client = pymongo.MongoClient(MONGODB_CONNECTION_STRING)
-
 bot.config = config
-bot.db_client = db_client
+# Draws images for every cog, in worker processes.
+bot.renders = RenderService(
+    config.renderWorkers, config.renderQueueSize, config.renderTimeout
+)
 
 
 async def signal_handler():
@@ -35,6 +37,8 @@ async def signal_handler():
                 await cog.signal_handler()
             else:
                 cog.signal_handler()
+    print("Renders: " + bot.renders.stats)
+    await bot.renders.shutdown()
     db_client.close()
     await bot.close()
 
@@ -56,6 +60,8 @@ async def on_ready():
             bot.load_extension(cog_directory + "." + cog)
         except commands.errors.ExtensionAlreadyLoaded:
             pass
+    # Once every cog has said what to preload.
+    bot.renders.start()
     loop = asyncio.get_event_loop()
     for signame in ("SIGINT", "SIGTERM"):
         loop.add_signal_handler(
@@ -64,7 +70,13 @@ async def on_ready():
     return
 
 
-# Adding custom help command
-helpCommand = HelpCommand()
-bot.help_command = helpCommand
-bot.run(TOKEN)
+# Render workers import this module again as they start, so only the bot
+# process connects to anything.
+if __name__ == "__main__":
+    db_client = pymongo.MongoClient(MONGODB_CONNECTION_STRING)
+    bot.db_client = db_client
+
+    # Adding custom help command
+    helpCommand = HelpCommand()
+    bot.help_command = helpCommand
+    bot.run(TOKEN)